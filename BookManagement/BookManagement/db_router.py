@@ -0,0 +1,206 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+PIN_KEY = "db:primary-pin:{user_id}"
+
+# Alias reads are routed to during the current request. Unset outside requests
+# (management commands, shell, signals run from them), so those use the primary.
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def replica_aliases():
+    """
+    Return the aliases of the configured read replicas.
+
+    Returns:
+        list: Every `DATABASES` alias other than `default`.
+    """
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def pin_to_primary(user_id):
+    """
+    Send a user's reads to the primary for `DB_PRIMARY_PIN_SECONDS`.
+
+    Called after a user's successful write, so their next reads see it even while
+    the replicas lag behind.
+
+    Args:
+        user_id (int): The user's primary key.
+    """
+    cache.set(PIN_KEY.format(user_id=user_id), True, timeout=settings.DB_PRIMARY_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    """
+    Return whether a user's reads currently go to the primary.
+
+    Args:
+        user_id (int): The user's primary key.
+
+    Returns:
+        bool: True within `DB_PRIMARY_PIN_SECONDS` of the user's last write.
+    """
+    return cache.get(PIN_KEY.format(user_id=user_id), False)
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Route the reads of the block to the primary.
+
+    Used where a read fills a cache shared by every request. Data read from a
+    lagging replica right after a write would be cached under the new cache
+    versions, and served stale to everyone until it expires.
+    """
+    token = _read_alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reads_from_replica():
+    """
+    Return whether reads currently go to a replica.
+
+    Returns:
+        bool: True inside a request routed to a replica, outside `read_from_primary`.
+    """
+    return _read_alias.get() not in (None, DEFAULT_DB_ALIAS)
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending request reads to a replica and everything else to `default`.
+
+    `ReplicaRoutingMiddleware` picks the read alias of each request: a replica for
+    `SAFE_METHODS` requests of users not pinned to the primary, and the primary for
+    anything else. Writes always go to the primary, and migrations only run there;
+    the replicas are copies of it.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data, so objects read anywhere may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Choose the database alias the router reads from for each request.
+
+    The user is identified without a query, from the access token claims or the
+    session, so a user pinned by `pin_to_primary` is sent to the primary before
+    authentication runs. Successful writes (any method outside `SAFE_METHODS`
+    answered with a 2xx or 3xx status) pin their user. Without replicas configured
+    the middleware does nothing.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = replica_aliases()
+        self.jwt = JWTAuthentication()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.replicas:
+            return self.get_response(request)
+
+        user_id = self.get_user_id(request)
+        token = _read_alias.set(self.get_read_alias(request, user_id))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        self.pin_after_write(request, response, user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not self.replicas:
+            return await self.get_response(request)
+
+        # The session and cache lookups are synchronous.
+        user_id = await sync_to_async(self.get_user_id)(request)
+        alias = await sync_to_async(self.get_read_alias)(request, user_id)
+        token = _read_alias.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        await sync_to_async(self.pin_after_write)(request, response, user_id)
+        return response
+
+    def get_user_id(self, request):
+        """
+        Return the id of the requesting user, without querying the database.
+
+        A valid access token is kept on `request.validated_token` for the view's
+        authentication.
+
+        Returns:
+            int | str | None: The user id from a valid access token or the session.
+        """
+        header = self.jwt.get_header(request)
+        raw_token = self.jwt.get_raw_token(header) if header is not None else None
+        if raw_token is not None:
+            try:
+                validated_token = self.jwt.get_validated_token(raw_token)
+            except InvalidToken:
+                # Rejected by the view's authentication; nothing to pin.
+                return None
+            # Reused by `CachedJWTAuthentication`, so the token is only decoded once.
+            request.validated_token = validated_token
+            return validated_token.get(api_settings.USER_ID_CLAIM)
+        session = getattr(request, "session", None)
+        if session is not None and request.COOKIES.get(settings.SESSION_COOKIE_NAME):
+            return session.get(SESSION_KEY)
+        return None
+
+    def get_read_alias(self, request, user_id):
+        """
+        Return the alias this request reads from.
+
+        Returns:
+            str: A replica alias, or `default`.
+        """
+        if request.method not in SAFE_METHODS:
+            return DEFAULT_DB_ALIAS
+        if user_id is not None and is_pinned_to_primary(user_id):
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def pin_after_write(self, request, response, user_id):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        user = getattr(request, "user", None)
+        if user_id is None and user is not None and user.is_authenticated:
+            # Set by DRF once the view authenticated the request.
+            user_id = user.pk
+        if user_id is not None:
+            pin_to_primary(user_id)
@@ -0,0 +1,367 @@
+import atexit
+import bisect
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+# Histogram bucket upper bounds, per metric.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Request latency, from the first middleware to the response.", LATENCY_BUCKETS),
+    "http_request_db_duration_seconds": ("Time spent executing SQL per request.", LATENCY_BUCKETS),
+    "http_request_queries": ("SQL statements executed per request.", QUERY_BUCKETS),
+    "http_response_size_bytes": ("Response body size; streaming responses are not counted.", SIZE_BUCKETS),
+}
+COUNTERS = {
+    "http_requests_total": "Requests served, by status code.",
+    "http_request_phase_seconds_total": "Time spent per request phase (auth, serialize, render).",
+}
+
+# Timings of the request being served. Shared with `sync_to_async` threads, so SQL
+# run by the async read path is counted too.
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Phase durations and SQL totals of one request.
+
+    Attributes:
+        started (float): `perf_counter()` when the request entered the middleware.
+        phases (dict): Phase name mapped to seconds (`auth`, `serialize`, `render`).
+        queries (int): Number of SQL statements executed.
+        db (float): Seconds spent executing them.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = 0
+        self.db = 0.0
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+def current_timings():
+    """
+    Return the timings of the request being served.
+
+    Returns:
+        RequestTimings | None: The timings, or None outside an instrumented request.
+    """
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper adding each statement's duration to the current request.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms, optionally flushed to a shared directory.
+
+    Observations only update in-memory totals under a lock. When `directory` is
+    set, the totals are written to `<directory>/metrics-<pid>.json` at most every
+    `flush_interval` seconds and at exit; `collect()` then merges the files of
+    every worker process, so `/metrics` reports the whole server whichever
+    process answers it. Files of stopped processes are kept, so totals never go
+    backwards; clear the directory when the server is redeployed.
+
+    Attributes:
+        directory (str): Directory shared by the worker processes, or empty.
+        flush_interval (float): Minimum seconds between two flushes.
+    """
+
+    def __init__(self, directory="", flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+
+    def inc(self, name, labels, value=1.0):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # One count per bucket, then +Inf; then the sum.
+                histogram = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+
+    def flush(self, force=True):
+        """
+        Write this process's totals to its file in `directory`.
+
+        Args:
+            force (bool): Write even if the last flush is under `flush_interval` old.
+        """
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+        with self._lock:
+            data = {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, list(labels), values] for (name, labels), values in self.histograms.items()],
+            }
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(data, handle)
+        os.replace(path, os.path.join(self.directory, f"metrics-{os.getpid()}.json"))
+
+    def collect(self):
+        """
+        Return the totals of every process.
+
+        Returns:
+            tuple: The merged counters and histograms, keyed by `(name, labels)`.
+        """
+        if not self.directory:
+            with self._lock:
+                return dict(self.counters), {key: list(values) for key, values in self.histograms.items()}
+
+        self.flush()
+        counters, histograms = {}, {}
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith("metrics-") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0.0) + value
+            for name, labels, values in data["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.setdefault(key, [0] * len(values))
+                for index, value in enumerate(values):
+                    merged[index] += value
+        return counters, histograms
+
+    def render(self):
+        """
+        Render the merged totals in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        counters, histograms = self.collect()
+        lines = []
+        for name, help_text in COUNTERS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ["+Inf"], values[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _format_number(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(values[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}" if labels else ""
+
+
+def _format_number(value):
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry(
+    directory=getattr(settings, "METRICS_DIR", ""),
+    flush_interval=getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0),
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every request and record it in the Prometheus metrics.
+
+    The `total` duration covers every middleware after this one, the view and
+    rendering. SQL statements are timed by `record_query`, installed on every
+    database connection, and the `auth`, `serialize` and `render` phases by
+    `InstrumentedViewMixin`. The phases are sent back in a `Server-Timing`
+    header; the `db` entry overlaps the phases its queries ran in.
+
+    Requests are labelled with their URL name (e.g. `books-list`), so the
+    metrics stay bounded whatever ids or query strings are requested.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        for alias in connections:
+            install_query_recorder(connections[alias])
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, timings)
+        return response
+
+    def record(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        entries = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in timings.phases.items()]
+        entries.append(f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"')
+        entries.append(f"total;dur={total * 1000:.2f}")
+        response["Server-Timing"] = ", ".join(entries)
+
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.url_name == "metrics":
+            return
+        labels = (("route", match.view_name or match.route), ("method", request.method))
+        registry.inc("http_requests_total", labels + (("status", str(response.status_code)),))
+        registry.observe("http_request_duration_seconds", labels, total)
+        registry.observe("http_request_db_duration_seconds", labels, timings.db)
+        registry.observe("http_request_queries", labels, timings.queries)
+        if not response.streaming:
+            registry.observe("http_response_size_bytes", labels, len(response.content))
+        for phase, seconds in timings.phases.items():
+            registry.inc("http_request_phase_seconds_total", labels + (("phase", phase),), seconds)
+        registry.flush(force=False)
+
+
+class InstrumentedViewMixin:
+    """
+    DRF view mixin timing the `auth`, `serialize` and `render` phases of a request.
+
+    `auth` is the authentication of the request. `serialize` is the time spent in
+    the view handler (querysets, pagination and serializers), minus the SQL it ran,
+    which is reported as `db`. `render` is the renderer turning the response data
+    into bytes.
+    """
+
+    def perform_authentication(self, request):
+        timings = _current.get()
+        if timings is None:
+            return super().perform_authentication(request)
+        started = time.perf_counter()
+        try:
+            return super().perform_authentication(request)
+        finally:
+            timings.add("auth", time.perf_counter() - started)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        timings = _current.get()
+        if timings is not None:
+            self._handler_started = (time.perf_counter(), timings.db)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        timings = _current.get()
+        if timings is None:
+            return response
+        started = getattr(self, "_handler_started", None)
+        if started is not None:
+            timings.add("serialize", time.perf_counter() - started[0] - (timings.db - started[1]))
+            self._handler_started = None
+        if hasattr(response, "add_post_render_callback") and not response.is_rendered:
+            render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add("render", time.perf_counter() - render_started)
+            )
+        return response
+
+
+def metrics_view(request):
+    """
+    Expose the request metrics in the Prometheus text format.
+
+    The scraper must send `METRICS_TOKEN` as a bearer token. Without a token
+    configured the endpoint is closed, except with `DEBUG` on, where it is open
+    for local development. Route names and traffic are not for the public.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden("Metrics are disabled until METRICS_TOKEN is set.")
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        return HttpResponseForbidden("Invalid metrics token.")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
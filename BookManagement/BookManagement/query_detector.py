@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+import django
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*(?:%s|\?|\d+)(?:\s*,\s*(?:%s|\?|\d+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames from Django never identify where a query came from. Execute wrappers
+# run under the outermost frame of the cursor module, and are skipped with it.
+_DJANGO_PATH = os.path.dirname(django.__file__)
+_CURSOR_MODULE = os.path.join(_DJANGO_PATH, "db", "backends", "utils.py")
+
+# Statements of the request being sampled, or None when it is not sampled.
+_current = ContextVar("query_detector_statements", default=None)
+
+_report_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    """
+    Return the shape of a SQL statement, with its literals and value lists stripped.
+
+    Two statements have the same fingerprint when they only differ by the values
+    they use, e.g. `SELECT ... WHERE id = 1` and `SELECT ... WHERE id = 2`, or
+    `IN (%s, %s)` and `IN (%s, %s, %s)`.
+
+    Args:
+        sql (str): The statement, with parameter placeholders or inlined literals.
+
+    Returns:
+        str: The normalized statement.
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def find_origin():
+    """
+    Return the innermost project frame of the current stack as `path:line in function`.
+
+    Frames in Django and installed packages are skipped, so a query triggered from
+    a serializer or permission is attributed to it rather than to the ORM. When no
+    project frame is on the stack, the innermost frame outside Django is used.
+
+    Returns:
+        str | None: The frame description, or None if every frame is in Django.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    cursor_frames = [index for index, frame in enumerate(frames) if frame.f_code.co_filename == _CURSOR_MODULE]
+    fallback = None
+    for frame in frames[cursor_frames[-1] + 1 if cursor_frames else 0:]:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_DJANGO_PATH):
+            continue
+        location = f"{frame.f_lineno} in {frame.f_code.co_name}"
+        if filename.startswith(base_dir) and "site-packages" not in filename:
+            return f"{os.path.relpath(filename, base_dir)}:{location}"
+        if fallback is None:
+            fallback = f"{filename}:{location}"
+    return fallback
+
+
+def record_statement(execute, sql, params, many, context):
+    """
+    Execute wrapper keeping the fingerprint, parameters and origin of sampled statements.
+    """
+    statements = _current.get()
+    if statements is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        statements.append((sql, repr(params), find_origin(), time.perf_counter() - started))
+
+
+def install_statement_recorder(connection, **kwargs):
+    if record_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_statement)
+
+
+connection_created.connect(install_statement_recorder)
+
+
+def find_repeated_queries(statements, threshold):
+    """
+    Group a request's statements by fingerprint and return the repeated shapes.
+
+    Args:
+        statements (list): `(sql, params, origin, seconds)` tuples, in execution order.
+        threshold (int): Minimum number of executions of a shape to report it.
+
+    Returns:
+        list: One dict per shape run at least `threshold` times, most repeated first,
+            with the `fingerprint`, a `sql` sample, the `count`, the number of
+            `distinct_params`, the total `duration_ms` and the `origin` of its first
+            execution. `kind` is `duplicate` when every execution used the same
+            parameters, and `n+1` otherwise.
+    """
+    groups = {}
+    for sql, params, origin, seconds in statements:
+        key = fingerprint(sql)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"sql": sql, "count": 0, "params": set(), "seconds": 0.0, "origin": origin}
+        group["count"] += 1
+        group["params"].add(params)
+        group["seconds"] += seconds
+
+    findings = []
+    for key, group in groups.items():
+        if group["count"] < threshold:
+            continue
+        distinct = len(group["params"])
+        findings.append({
+            "kind": "duplicate" if distinct == 1 else "n+1",
+            "fingerprint": key,
+            "sql": group["sql"],
+            "count": group["count"],
+            "distinct_params": distinct,
+            "duration_ms": round(group["seconds"] * 1000, 3),
+            "origin": group["origin"],
+        })
+    findings.sort(key=lambda finding: finding["count"], reverse=True)
+    return findings
+
+
+def write_report(path, entries):
+    """
+    Append findings to a JSON lines report.
+
+    Each line is written with a single `write` on a file opened in append mode, so
+    worker processes can share the report.
+
+    Args:
+        path (str): The report file.
+        entries (list): JSON serializable dicts, one per line.
+    """
+    data = "".join(json.dumps(entry, sort_keys=True) + "\n" for entry in entries)
+    with _report_lock, open(path, "a", encoding="utf-8") as handle:
+        handle.write(data)
+
+
+class QueryDetectorMiddleware:
+    """
+    Flag SQL statement shapes repeated within a request (N+1 and duplicate queries).
+
+    A `QUERY_DETECTOR_SAMPLE_RATE` fraction of requests is sampled while
+    `QUERY_DETECTOR_ENABLED` is set. Their statements are fingerprinted, and
+    every shape run `QUERY_DETECTOR_THRESHOLD` times or more is logged with the
+    route, the repeat count and the project frame that ran it first. Findings are
+    also appended to `QUERY_DETECTOR_REPORT_PATH` when set; the `query_report`
+    command aggregates that file.
+
+    Finding the origin walks the stack on every statement, so keep the sample
+    rate low in production.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "QUERY_DETECTOR_ENABLED", False)
+        self.sample_rate = getattr(settings, "QUERY_DETECTOR_SAMPLE_RATE", 1.0)
+        self.threshold = getattr(settings, "QUERY_DETECTOR_THRESHOLD", 3)
+        self.report_path = getattr(settings, "QUERY_DETECTOR_REPORT_PATH", "")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+        for alias in connections:
+            install_statement_recorder(connections[alias])
+        statements = []
+        token = _current.set(statements)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, statements)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+        statements = []
+        token = _current.set(statements)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, statements)
+        return response
+
+    def is_sampled(self):
+        return self.enabled and random.random() < self.sample_rate
+
+    def report(self, request, response, statements):
+        findings = find_repeated_queries(statements, self.threshold)
+        if not findings:
+            return
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match is not None else request.path
+        for finding in findings:
+            logger.warning(
+                "%s query on %s %s: %d executions of %s (from %s)",
+                finding["kind"], request.method, route, finding["count"], finding["fingerprint"], finding["origin"],
+            )
+        if self.report_path:
+            timestamp = timezone.now().isoformat()
+            write_report(self.report_path, [
+                dict(finding, timestamp=timestamp, route=route, method=request.method,
+                     status=response.status_code, queries=len(statements))
+                for finding in findings
+            ])
@@ -0,0 +1,79 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by `orjson`, falling back to `JSONRenderer` without it.
+
+    `orjson` serializes dicts, lists, strings, numbers, UUIDs, dates, datetimes
+    and times natively and returns the UTF-8 bytes directly, instead of building a
+    `str` and encoding it afterwards. Its output matches `JSONRenderer` with the
+    default `COMPACT_JSON` and `UNICODE_JSON` settings: UTC datetimes end with `Z`,
+    `\\u2028`/`\\u2029` are escaped, and types `orjson` does not know (Decimal,
+    lazy translation strings, querysets, ...) are converted by DRF's encoder. Data
+    `orjson` rejects, such as timezone-aware times, is handed to `JSONRenderer`,
+    which renders it or raises its own error.
+
+    Two kinds of values are written differently, though they parse to the same or nearly
+    the same value: floats in exponent notation (`1e16`, where the standard
+    library writes `1e+16`), and UTC offsets that are not whole minutes (local
+    mean time, before a zone adopted standard time), which `orjson` rounds to
+    the minute.
+
+    Indented output (the browsable API, or `Accept: application/json; indent=4`)
+    and non-default `COMPACT_JSON`/`UNICODE_JSON` settings use `JSONRenderer`.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, like JSONRenderer.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by `orjson`, falling back to `JSONParser` without it.
+
+    The request body is parsed straight from bytes. Like `JSONParser` in strict
+    mode, `NaN` and `Infinity` are rejected.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        data = stream.read() if stream is not None else b""
+        try:
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (orjson.JSONDecodeError, UnicodeDecodeError, LookupError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'corsheaders',
@@ -53,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'BookManagement.instrumentation.RequestMetricsMiddleware',
+    'BookManagement.query_detector.QueryDetectorMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 
     'django.middleware.security.SecurityMiddleware',
@@ -62,6 +65,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    'BookManagement.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'BookManagement.urls'
@@ -94,6 +99,48 @@ DATABASES = {
         "USER": config('DB_USER'),
         "PASSWORD": config('DB_PASSWORD'),
         "HOST": config('DB_HOST'),
+        "PORT": config('DB_PORT', default=''),
+        # Persistent connections, reused by each worker thread for this many seconds.
+        "CONN_MAX_AGE": config('DB_CONN_MAX_AGE', default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Read replicas as a comma separated list of `host` or `host:port`. Each one gets
+# a `replica<N>` alias with the primary's credentials; reads of safe requests are
+# routed to them (see BookManagement.db_router). For local runs, point it at the
+# same server and set DB_REPLICA_NAME to a second database. Tests mirror the
+# replicas onto the test database of `default`.
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+
+for index, replica in enumerate(DB_REPLICA_HOSTS, start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        "NAME": config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        "HOST": host,
+        "PORT": port or DATABASES['default']['PORT'],
+        "CONN_MAX_AGE": config('DB_REPLICA_CONN_MAX_AGE', default=DATABASES['default']['CONN_MAX_AGE'], cast=int),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ['BookManagement.db_router.PrimaryReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write, so they never see
+# a replica that has not caught up yet. Pins live in the Django cache, which must
+# be shared between workers for them to apply across processes.
+DB_PRIMARY_PIN_SECONDS = config('DB_PRIMARY_PIN_SECONDS', default=5, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a file-based,
+# Redis or Memcached cache to share it between worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='book-management'),
     }
 }
 
@@ -143,20 +190,51 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed JSON, identical to DRF's output (see BookManagement.renderers).
+    'DEFAULT_RENDERER_CLASSES': [
+        'BookManagement.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'BookManagement.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
-    ]
+    ],
+    # Sliding window rate limits per route and per user (or IP), kept in the Django
+    # cache (see BookManagement.throttling). Login, refresh and registration use the
+    # `auth` (per IP) and `auth_account` (per email) rates instead of read/write.
+    # An empty rate disables its throttle.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'BookManagement.throttling.ReadRateThrottle',
+        'BookManagement.throttling.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'read': config('THROTTLE_READ_RATE', default='600/min'),
+        'write': config('THROTTLE_WRITE_RATE', default='120/min'),
+        'auth': config('THROTTLE_AUTH_RATE', default='20/min'),
+        'auth_account': config('THROTTLE_AUTH_ACCOUNT_RATE', default='5/min'),
+    },
+    # Reverse proxies in front of the app. Per-IP throttles trust that many
+    # X-Forwarded-For entries; with 0 they use REMOTE_ADDR, as the header can be forged.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+# Counters are shared between worker processes only through a shared cache
+# (see CACHE_BACKEND); with the default local memory cache each process counts alone.
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
@@ -166,6 +244,82 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': False,
 }
 
+# Process-local cache of the user flags read on every authenticated request
+# (see accounts.authentication). Entries changed in another process expire after the TTL.
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+# Shared (Django cache) set of blocked user ids checked on token refresh.
+BLOCKED_USERS_CACHE_TTL = config('BLOCKED_USERS_CACHE_TTL', default=60, cast=int)
+
+
+# Versioned response cache for anonymous catalog reads (see books.cache).
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=True, cast=bool)
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+
+# Bulk book create/update (see BookViewSet.bulk_create and bulk_update).
+BOOKS_BULK_BATCH_SIZE = config('BOOKS_BULK_BATCH_SIZE', default=500, cast=int)
+BOOKS_BULK_MAX_ITEMS = config('BOOKS_BULK_MAX_ITEMS', default=10000, cast=int)
+
+# Bulk user registration (see accounts.provisioning). The provision_users command
+# hashes passwords in USER_PROVISIONING_WORKERS processes; leave it at 0 to use one
+# per CPU. The HTTP endpoint hashes in the web worker, so it accepts at most
+# USER_PROVISIONING_MAX_ITEMS users per request.
+USER_PROVISIONING_BATCH_SIZE = config('USER_PROVISIONING_BATCH_SIZE', default=500, cast=int)
+USER_PROVISIONING_MAX_ITEMS = config('USER_PROVISIONING_MAX_ITEMS', default=20, cast=int)
+USER_PROVISIONING_WORKERS = config('USER_PROVISIONING_WORKERS', default=0, cast=int)
+
+# Maximum values returned per facet by `?facets=` on the book list (see books.facets).
+BOOK_FACETS_LIMIT = config('BOOK_FACETS_LIMIT', default=100, cast=int)
+
+# Paginated lists and admin changelists (see books.pagination.EstimatedCountPaginator).
+# Exact counts are cached per query for COUNT_CACHE_TIMEOUT seconds. On PostgreSQL,
+# queries the planner expects to return COUNT_ESTIMATE_THRESHOLD rows or more
+# report that estimate instead, flagged with `count_is_approximate`.
+COUNT_CACHE_TIMEOUT = config('COUNT_CACHE_TIMEOUT', default=60, cast=int)
+COUNT_ESTIMATE_THRESHOLD = config('COUNT_ESTIMATE_THRESHOLD', default=10000, cast=int)
+
+
+# Book search (see books.search). Leave BOOK_SEARCH_BACKEND empty to pick the
+# Postgres backend on PostgreSQL and the in-memory backend elsewhere. The
+# in-memory index is per process, so it only suits tests and single-process
+# development servers.
+BOOK_SEARCH_BACKEND = config('BOOK_SEARCH_BACKEND', default='')
+BOOK_SEARCH_CONFIG = 'simple'
+BOOK_SEARCH_TRIGRAM_THRESHOLD = 0.3
+
+
+# Maximum SQL queries per endpoint are declared on the viewsets (see books.query_budget).
+# Overruns are always logged; with this enabled they also raise, which fails tests.
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=DEBUG, cast=bool)
+
+# Render book and reading list pages from .values() rows instead of model
+# serializers (see books.fastpath). The output is the same either way.
+FAST_PATH_LIST_ENABLED = config('FAST_PATH_LIST_ENABLED', default=True, cast=bool)
+
+# Serve book, author and genre list/retrieve requests with the async ORM when
+# running under ASGI (see books.async_views).
+ASYNC_CATALOG_READS = config('ASYNC_CATALOG_READS', default=False, cast=bool)
+
+# Per-request phase timings, sent as a Server-Timing header and aggregated per
+# route at /metrics (see BookManagement.instrumentation). With several worker
+# processes, set METRICS_DIR to a directory they share so /metrics covers all
+# of them. Scrapers must send METRICS_TOKEN as a bearer token; while it is empty,
+# /metrics answers 403 unless DEBUG is on.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# N+1 and duplicate query detection (see BookManagement.query_detector). A
+# sampled request logs every SQL shape it runs QUERY_DETECTOR_THRESHOLD times or
+# more, and appends it to QUERY_DETECTOR_REPORT_PATH when set; summarize that
+# file with `manage.py query_report`. Keep the sample rate low in production.
+QUERY_DETECTOR_ENABLED = config('QUERY_DETECTOR_ENABLED', default=DEBUG, cast=bool)
+QUERY_DETECTOR_SAMPLE_RATE = config('QUERY_DETECTOR_SAMPLE_RATE', default=1.0, cast=float)
+QUERY_DETECTOR_THRESHOLD = config('QUERY_DETECTOR_THRESHOLD', default=3, cast=int)
+QUERY_DETECTOR_REPORT_PATH = config('QUERY_DETECTOR_REPORT_PATH', default='')
+
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWS_CREDENTIALS = True
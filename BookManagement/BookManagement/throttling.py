@@ -0,0 +1,170 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Rate throttle counting requests over a sliding window in the Django cache.
+
+    DRF's `SimpleRateThrottle` stores the timestamp of every request in the
+    window and rewrites the whole list on each request, so a check costs O(rate)
+    and concurrent workers overwrite each other's history. Here each window is a
+    single counter incremented with `cache.incr`, which is atomic on the shared
+    backends (Redis, Memcached, database). The request count over the last
+    `duration` seconds is the current window's counter plus the previous one's,
+    weighted by how much of it still overlaps the sliding window: two reads and
+    one increment per check, whatever the rate.
+
+    Rates come from `REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope]`, read on
+    every request; a missing or empty rate, or `THROTTLE_ENABLED = False`,
+    disables the throttle. Requests are counted per route and per identity
+    (`get_ident_key`), and a rejected request gets a `Retry-After` header with the
+    number of seconds until it would be accepted.
+
+    Attributes:
+        scope (str): The key of the throttle's rate.
+        cache_format (str): Format of the counter keys.
+    """
+    cache_format = "throttle:{scope}:{route}:{ident}:{window}"
+
+    def __init__(self):
+        # The rate is parsed on each request, so rate changes apply without a restart.
+        pass
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope) or None
+
+    def get_ident_key(self, request, view):
+        """
+        Return who the request is counted against, or None to not throttle it.
+
+        Returns:
+            str | None: The identity.
+        """
+        raise NotImplementedError(".get_ident_key() must be overridden")
+
+    def get_user_or_ip(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def get_route(self, request, view):
+        match = getattr(request._request, "resolver_match", None)
+        return match.view_name if match is not None else view.__class__.__name__
+
+    def allow_request(self, request, view):
+        if not getattr(settings, "THROTTLE_ENABLED", True):
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        # Hashed, so keys stay short and valid for Memcached whatever the identity holds.
+        digest = hashlib.md5(str(ident).encode("utf-8"), usedforsecurity=False).hexdigest()
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key, previous_key = (
+            self.cache_format.format(scope=self.scope, route=self.get_route(request, view), ident=digest, window=w)
+            for w in (window, window - 1)
+        )
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+        self.elapsed = self.now - window * self.duration
+
+        if self.previous * (1 - self.elapsed / self.duration) + self.current >= self.num_requests:
+            return self.throttle_failure()
+
+        # The counter outlives its window by one, while it is the previous window.
+        if not self.cache.add(current_key, 1, timeout=self.duration * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr().
+                self.cache.add(current_key, 1, timeout=self.duration * 2)
+        return True
+
+    def wait(self):
+        """
+        Return the number of seconds until the identity's next request is accepted.
+
+        Returns:
+            float: The delay, used for the `Retry-After` header.
+        """
+        limit, duration = self.num_requests, self.duration
+        if self.current < limit:
+            # The previous window's weight decays until the count falls below the limit.
+            return max(duration * (1 - (limit - self.current) / self.previous) - self.elapsed, 0.0)
+        # This window is full: wait for it to become the previous one and decay in turn.
+        return duration - self.elapsed + duration * (1 - limit / max(self.current, 1))
+
+
+class ReadRateThrottle(SlidingWindowThrottle):
+    """
+    Throttle `SAFE_METHODS` requests per route, per user or per IP when anonymous.
+    """
+    scope = "read"
+
+    def get_ident_key(self, request, view):
+        if request.method not in SAFE_METHODS:
+            return None
+        return self.get_user_or_ip(request)
+
+
+class WriteRateThrottle(SlidingWindowThrottle):
+    """
+    Throttle requests outside `SAFE_METHODS` per route, per user or per IP when anonymous.
+    """
+    scope = "write"
+
+    def get_ident_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        return self.get_user_or_ip(request)
+
+
+class AuthIPRateThrottle(SlidingWindowThrottle):
+    """
+    Throttle login, token refresh and registration attempts per route and IP.
+
+    Checked before the request's password is hashed, so a burst of attempts is
+    rejected without spending CPU on it.
+    """
+    scope = "auth"
+
+    def get_ident_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        return f"ip:{self.get_ident(request)}"
+
+
+class AuthAccountRateThrottle(SlidingWindowThrottle):
+    """
+    Throttle login and registration attempts per route and account, from any IP.
+
+    The account is the username field (the email) of the payload, so a
+    credential-stuffing run spread over many IPs is still limited per account.
+    Requests without one, such as token refreshes, are not counted.
+    """
+    scope = "auth_account"
+
+    def get_ident_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        try:
+            account = request.data.get(get_user_model().USERNAME_FIELD)
+        except AttributeError:
+            # A list or scalar payload, rejected by the serializer.
+            return None
+        if not isinstance(account, str) or not account.strip():
+            return None
+        return f"account:{account.strip().lower()}"
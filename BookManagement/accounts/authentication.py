@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+# The columns needed to authenticate and authorize a request. Everything else on
+# the user (password, profile fields, ...) is loaded lazily if a view touches it.
+SNAPSHOT_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in {
+        "id", "email", "username", "first_name", "last_name",
+        "is_superuser", "is_staff", "is_active", "is_blocked",
+    }
+)
+
+
+class UserSnapshotCache:
+    """
+    Process-local, TTL-bounded LRU cache of user snapshots.
+
+    A snapshot is the tuple of `SNAPSHOT_FIELDS` values of a user. Entries expire
+    after `ttl` seconds, so a change made through another process is picked up
+    within that window; changes made in this process invalidate the entry at once
+    through the `User` signals in `accounts.signals`.
+
+    Attributes:
+        ttl (float): Seconds a snapshot stays valid.
+        max_size (int): Maximum number of cached users; the least recently used is evicted.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Return the cached snapshot of a user.
+
+        Args:
+            user_id (int): The user's primary key.
+
+        Returns:
+            tuple | None: The snapshot values, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        """
+        Store the snapshot of a user.
+
+        Args:
+            user_id (int): The user's primary key.
+            values (tuple): The snapshot values, in `SNAPSHOT_FIELDS` order.
+        """
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, tuple(values))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        """
+        Drop the snapshot of one user, or of every user when no id is given.
+
+        Args:
+            user_id (int, optional): The user's primary key.
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+user_snapshots = UserSnapshotCache(
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+    max_size=getattr(settings, "AUTH_USER_CACHE_SIZE", 10000),
+)
+
+
+def get_user_snapshot(user_id):
+    """
+    Return the snapshot of a user, loading it from the database on a cache miss.
+
+    Args:
+        user_id (int): The user's primary key.
+
+    Returns:
+        tuple | None: The snapshot values, or None if the user does not exist.
+    """
+    values = user_snapshots.get(user_id)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values_list(*SNAPSHOT_FIELDS).first()
+        if values is not None:
+            user_snapshots.set(user_id, values)
+    return values
+
+
+def user_from_snapshot(values):
+    """
+    Build a `User` instance from a snapshot.
+
+    The instance behaves like one loaded with `.only(*SNAPSHOT_FIELDS)`: it can be
+    assigned to foreign keys and compared with other users, and any other field is
+    fetched on first access. Each call returns a new instance, so changes made by a
+    request never leak into the cache.
+
+    Args:
+        values (tuple): The snapshot values, in `SNAPSHOT_FIELDS` order.
+
+    Returns:
+        User: The partially loaded user.
+    """
+    return User.from_db(router.db_for_read(User), SNAPSHOT_FIELDS, values)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user without a per-request query.
+
+    The user id comes from the validated token claims and the flags needed for
+    authorization (`is_active`, `is_staff`, `is_superuser`, `is_blocked`) come from
+    `user_snapshots`. Only a cache miss runs a single narrow `SELECT`.
+    """
+
+    def authenticate(self, request):
+        """
+        Authenticate a request from its access token.
+
+        The token validated by `ReplicaRoutingMiddleware` is reused when present,
+        instead of decoding and verifying it again.
+
+        Returns:
+            tuple | None: The user and the validated token, or None without a token.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = getattr(request, "validated_token", None)
+        if validated_token is None or validated_token.token != raw_token:
+            validated_token = self.get_validated_token(raw_token)
+
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Return the user identified by a validated token.
+
+        Args:
+            validated_token (Token): The validated access token.
+
+        Raises:
+            InvalidToken: If the token has no user id claim.
+            AuthenticationFailed: If the user does not exist or is inactive.
+
+        Returns:
+            User: The partially loaded user.
+        """
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            # Revocation needs the password hash, which is never cached.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        values = get_user_snapshot(user_id)
+        if values is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        user = user_from_snapshot(values)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+
+
+BLOCKED_USERS_CACHE_KEY = "accounts:blocked-user-ids"
+
+
+def get_blocked_user_ids():
+    """
+    Return the ids of all blocked users.
+
+    The set is stored in Django's cache, so every worker process shares it and a
+    block takes effect everywhere as soon as the key is invalidated. Blocked
+    accounts are rare, which keeps the cached value small.
+
+    Returns:
+        frozenset: Primary keys of the users with `is_blocked` set.
+    """
+    blocked = cache.get(BLOCKED_USERS_CACHE_KEY)
+    if blocked is None:
+        blocked = frozenset(User.objects.filter(is_blocked=True).values_list("id", flat=True))
+        cache.set(
+            BLOCKED_USERS_CACHE_KEY,
+            blocked,
+            timeout=getattr(settings, "BLOCKED_USERS_CACHE_TTL", 60),
+        )
+    return blocked
+
+
+def is_user_blocked(user_id):
+    """
+    Check whether a user is blocked without loading the user row.
+
+    Args:
+        user_id (int): The user's primary key.
+
+    Returns:
+        bool: True if the user is blocked.
+    """
+    return user_id in get_blocked_user_ids()
+
+
+def invalidate_blocked_users():
+    """
+    Drop the cached blocked-user set so the next check reloads it.
+    """
+    cache.delete(BLOCKED_USERS_CACHE_KEY)
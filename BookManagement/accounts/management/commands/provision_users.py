@@ -0,0 +1,67 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import UserProvisioner
+from books.importer import read_rows
+
+
+class Command(BaseCommand):
+    """
+    Register the users listed in a CSV or JSON Lines file.
+
+    Each row takes the fields of the registration endpoint: `email`, `username`,
+    `first_name`, `last_name`, `password` and optionally `phone_number` and
+    `confirm_password`. The whole file is validated first, with one uniqueness
+    query for every row; if any row is invalid its errors are printed and nothing
+    is created. Passwords are then hashed in `--workers` processes and the users
+    inserted in batches (see accounts.provisioning).
+    """
+    help = "Register users in bulk from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file path.")
+        parser.add_argument(
+            "--format", dest="input_format", choices=("csv", "jsonl"),
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: one per CPU).")
+        parser.add_argument("--batch-size", type=int, help="Users per INSERT.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate the file without creating users.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["input_format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        try:
+            items = list(read_rows(path, input_format))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        if not items:
+            raise CommandError(f"{path} has no rows.")
+
+        provisioner = UserProvisioner(workers=options["workers"], batch_size=options["batch_size"])
+        started = time.monotonic()
+        rows, errors = provisioner.validate(items)
+        if errors:
+            self.write_errors(errors)
+            raise CommandError(f"{len(errors)} of {len(items)} rows are invalid; no user was created.")
+        self.stdout.write(f"Validated {len(rows)} rows in {time.monotonic() - started:.2f}s.")
+        if options["dry_run"]:
+            return
+
+        started = time.monotonic()
+        users, errors = provisioner.save(rows)
+        if errors:
+            self.write_errors(errors)
+            raise CommandError(f"{len(errors)} rows conflict with existing users; no user was created.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users in {time.monotonic() - started:.2f}s with {provisioner.workers} workers."
+        ))
+
+    def write_errors(self, errors):
+        for error in errors[:50]:
+            # Row numbers count from 1, after the CSV header.
+            self.stderr.write(f"Row {error['index'] + 1}: {json.dumps(error['errors'])}")
+        if len(errors) > 50:
+            self.stderr.write(f"... and {len(errors) - 50} more.")
@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import User
+from .serializers import BulkUserSerializer
+
+
+def get_provisioning_max_items():
+    """
+    Return the maximum number of users accepted by a single bulk registration request.
+
+    Every password is a deliberately slow hash computed while the request waits,
+    so the limit is kept small; the `provision_users` command has none.
+
+    Returns:
+        int: The item limit.
+    """
+    return getattr(settings, "USER_PROVISIONING_MAX_ITEMS", 20)
+
+
+class UserProvisioner:
+    """
+    Validate and create a batch of users with as little per-row work as possible.
+
+    Compared to registering the same users one by one through `RegisterUserView`:
+
+    - rows are validated by `BulkUserSerializer`, without its per-row uniqueness
+      queries; the emails and usernames of the whole batch are checked against
+      each other in memory and against the table in one query;
+    - passwords are hashed in a pool of `workers` processes, as each hash is a
+      deliberately slow, CPU-bound key derivation;
+    - users are inserted with `bulk_create`, `batch_size` rows per statement.
+
+    Nothing is written unless every row is valid. No `post_save` signals are
+    sent; the user caches they invalidate hold nothing for new users.
+
+    Attributes:
+        workers (int): Processes hashing passwords; 1 hashes in this process.
+        batch_size (int): Rows per `INSERT`.
+    """
+
+    # Below this many passwords, starting the pool costs more than it saves.
+    min_parallel_passwords = 8
+
+    def __init__(self, workers=None, batch_size=None):
+        self.workers = workers or getattr(settings, "USER_PROVISIONING_WORKERS", None) or os.cpu_count() or 1
+        self.batch_size = batch_size or getattr(settings, "USER_PROVISIONING_BATCH_SIZE", 500)
+
+    def validate(self, items):
+        """
+        Validate a batch of user rows.
+
+        Args:
+            items (list): The rows, as dicts of `BulkUserSerializer` fields.
+
+        Returns:
+            tuple: The validated data of every row, and the errors of the invalid
+                rows as `{"index": ..., "errors": ...}` dicts.
+        """
+        rows, errors = [], []
+        for index, item in enumerate(items):
+            serializer = BulkUserSerializer(data=item)
+            if serializer.is_valid():
+                data = dict(serializer.validated_data)
+                data.pop("confirm_password", None)
+                data["email"] = User.objects.normalize_email(data["email"])
+                rows.append(data)
+            else:
+                rows.append(None)
+                errors.append({"index": index, "errors": serializer.errors})
+
+        errors.extend(self.check_uniqueness(rows))
+        errors.sort(key=lambda error: error["index"])
+        return rows, errors
+
+    def check_uniqueness(self, rows):
+        """
+        Find emails and usernames repeated within the batch or already taken.
+
+        Args:
+            rows (list): The validated rows, None for invalid ones.
+
+        Returns:
+            list: One error per conflicting row.
+        """
+        emails = {row["email"] for row in rows if row}
+        usernames = {row["username"] for row in rows if row}
+        taken_emails, taken_usernames = set(), set()
+        if emails:
+            for email, username in User.objects.filter(
+                Q(email__in=emails) | Q(username__in=usernames)
+            ).values_list("email", "username"):
+                taken_emails.add(email)
+                taken_usernames.add(username)
+
+        errors, seen_emails, seen_usernames = [], set(), set()
+        for index, row in enumerate(rows):
+            if row is None:
+                continue
+            row_errors = {}
+            if row["email"] in taken_emails:
+                row_errors["email"] = ["user with this email already exists."]
+            elif row["email"] in seen_emails:
+                row_errors["email"] = ["Duplicate email in this request."]
+            if row["username"] in taken_usernames:
+                row_errors["username"] = ["user with this username already exists."]
+            elif row["username"] in seen_usernames:
+                row_errors["username"] = ["Duplicate username in this request."]
+            seen_emails.add(row["email"])
+            seen_usernames.add(row["username"])
+            if row_errors:
+                errors.append({"index": index, "errors": row_errors})
+        return errors
+
+    def hash_passwords(self, passwords):
+        """
+        Hash passwords with the configured hasher, in parallel when worthwhile.
+
+        Args:
+            passwords (list): The raw passwords.
+
+        Returns:
+            list: The encoded hashes, in the same order.
+        """
+        workers = min(self.workers, len(passwords))
+        if workers <= 1 or len(passwords) < self.min_parallel_passwords:
+            return [make_password(password) for password in passwords]
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        chunksize = max(1, len(passwords) // (workers * 4))
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as executor:
+            return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+    def create(self, rows):
+        """
+        Hash the passwords of validated rows and insert the users.
+
+        Args:
+            rows (list): The validated rows from `validate`.
+
+        Raises:
+            IntegrityError: If another request took an email or username meanwhile.
+
+        Returns:
+            list: The created users.
+        """
+        hashes = self.hash_passwords([row["password"] for row in rows])
+        users = [User(**dict(row, password=encoded)) for row, encoded in zip(rows, hashes)]
+        with transaction.atomic():
+            return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def provision(self, items):
+        """
+        Validate a batch of rows and create the users if every row is valid.
+
+        Args:
+            items (list): The rows, as dicts of `BulkUserSerializer` fields.
+
+        Returns:
+            tuple: The created users (empty on errors), and the per-row errors.
+        """
+        rows, errors = self.validate(items)
+        if errors:
+            return [], errors
+        return self.save(rows)
+
+    def save(self, rows):
+        """
+        Create the users of validated rows, reporting rows taken in the meantime.
+
+        Args:
+            rows (list): The validated rows from `validate`.
+
+        Returns:
+            tuple: The created users (empty on errors), and the per-row errors.
+        """
+        try:
+            return self.create(rows), []
+        except IntegrityError:
+            # Rows taken since the uniqueness check; report them like it would.
+            errors = self.check_uniqueness(rows)
+            if not errors:
+                raise
+            return [], errors
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it set up.
+    django.setup()
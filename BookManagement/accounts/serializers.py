@@ -1,11 +1,43 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
-from .models import User
-from rest_framework_simplejwt.tokens import RefreshToken
+from .models import User, username_validator
+from .authentication import get_user_snapshot, user_from_snapshot
+from .blocked_users import is_user_blocked
 import re
 
 
+PASSWORD_MIN_LENGTH = 8
+
+# Strength rules, compiled once and checked in order; the first failure is reported.
+PASSWORD_RULES = [
+    (re.compile(r"[A-Z]"), "Password must contain at least one uppercase letter"),
+    (re.compile(r"[a-z]"), "Password must contain at least one lowercase letter"),
+    (re.compile(r"\d"), "Password must contain at least one number"),
+    (re.compile(r"[^\w\s]"), "Password must contain at least one special character"),
+]
+
+
+def check_password_strength(password):
+    """
+    Check a password against the length and character class rules.
+
+    Args:
+        password (str): The password.
+
+    Returns:
+        str | None: The message of the first failed rule, or None if it is strong enough.
+    """
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return f"Password must be at least {PASSWORD_MIN_LENGTH} characters long"
+    for pattern, message in PASSWORD_RULES:
+        if not pattern.search(password):
+            return message
+    return None
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom serializer for obtaining JWT tokens.
@@ -62,7 +94,9 @@ class CustomTokenRefreshSerializer(TokenRefreshSerializer):
     Custom serializer for refreshing JWT tokens.
 
     This serializer extends the default `TokenRefreshSerializer` to prevent blocked users
-    from refreshing their tokens.
+    from refreshing their tokens. The refresh token is decoded and verified once, and
+    the user checks read the cached blocked-user set and user snapshot instead of
+    fetching the `User` row.
 
     Methods:
         validate(attrs): Validates the refresh token and checks if the user is blocked.
@@ -78,24 +112,56 @@ class CustomTokenRefreshSerializer(TokenRefreshSerializer):
         Raises:
             PermissionDenied: If the user's account is blocked.
             serializers.ValidationError: If the user does not exist.
+            AuthenticationFailed: If the user's account is not active.
 
         Returns:
             dict: The validated data.
         """
-        refresh_token = attrs["refresh"]
-        refresh = RefreshToken(refresh_token)
-        user_id = refresh.payload.get("user_id")
-
-        try:
-            user = User.objects.get(id=user_id)
-            if user.is_blocked:
-                raise PermissionDenied(
-                    "Your account has been blocked. Please contact support."
-                )
-        except User.DoesNotExist:
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+
+        if api_settings.USER_ID_FIELD == "id":
+            blocked = is_user_blocked(user_id)
+            snapshot = None if blocked else get_user_snapshot(user_id)
+            user = user_from_snapshot(snapshot) if snapshot is not None else None
+        else:
+            # The caches are keyed on primary keys; look other id fields up like
+            # `CachedJWTAuthentication.get_user` does.
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            blocked = user is not None and user.is_blocked
+
+        if blocked:
+            raise PermissionDenied(
+                "Your account has been blocked. Please contact support."
+            )
+
+        if user is None:
             raise serializers.ValidationError({"error": "User does not exist"})
 
-        return super().validate(attrs)
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # The token blacklist app is not installed.
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -153,20 +219,9 @@ class UserSerializer(serializers.ModelSerializer):
         if password != confirm_password:
             raise serializers.ValidationError({"password": "Passwords do not match"})
 
-        if len(password) < 8:
-            raise serializers.ValidationError({"password": "Password must be at least 8 characters long"})
-        
-        if not re.search(r"[A-Z]", password):
-            raise serializers.ValidationError({"password": "Password must contain at least one uppercase letter"})
-        
-        if not re.search(r"[a-z]", password):
-            raise serializers.ValidationError({"password": "Password must contain at least one lowercase letter"})
-        
-        if not re.search(r"\d", password):
-            raise serializers.ValidationError({"password": "Password must contain at least one number"})
-
-        if not re.search(r"[^\w\s]", password):
-            raise serializers.ValidationError({"password": "Password must contain at least one special character"})
+        error = check_password_strength(password)
+        if error:
+            raise serializers.ValidationError({"password": error})
 
         return data
 
@@ -196,6 +251,29 @@ class UserSerializer(serializers.ModelSerializer):
         return user
     
 
+class BulkUserSerializer(UserSerializer):
+    """
+    Serializer validating one row of a bulk user registration.
+
+    Uniqueness of `email` and `username` is checked for the whole batch at once
+    by `accounts.provisioning`, so the per-row unique validators, one query each,
+    are dropped. `confirm_password` is optional; when given it must match.
+    """
+
+    confirm_password = serializers.CharField(write_only=True, required=False)
+
+    class Meta(UserSerializer.Meta):
+        extra_kwargs = {
+            **UserSerializer.Meta.extra_kwargs,
+            "email": {"validators": []},
+            "username": {"validators": [username_validator]},
+        }
+
+    def validate(self, data):
+        data.setdefault("confirm_password", data.get("password"))
+        return super().validate(data)
+
+
 class UserProfileListSerializer(serializers.ModelSerializer):
     """
     Serializer for the User model's profile.
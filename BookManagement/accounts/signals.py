@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_snapshots
+from .blocked_users import invalidate_blocked_users
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """
+    Drop the cached authentication snapshot of a changed or deleted user.
+
+    The snapshot is dropped once the transaction commits: a request loading it
+    before that would cache the old flags again.
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: user_snapshots.invalidate(user_id))
+
+
+@receiver(post_save, sender=User)
+def invalidate_blocked_user_set(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached blocked-user set when a user's `is_blocked` flag may have changed.
+
+    The set is dropped once the transaction commits: a refresh reloading it
+    before that would cache it without the block.
+    """
+    if update_fields is None or "is_blocked" in update_fields:
+        transaction.on_commit(invalidate_blocked_users)
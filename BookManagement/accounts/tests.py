@@ -1,3 +1,212 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from BookManagement.throttling import SlidingWindowThrottle
+from . import serializers
+from .authentication import CachedJWTAuthentication, SNAPSHOT_FIELDS, get_user_snapshot, user_snapshots
+from .blocked_users import BLOCKED_USERS_CACHE_KEY
+from .models import User
+
+
+def throttle_rates(**rates):
+    """
+    Return a `REST_FRAMEWORK` setting with the given throttle rates.
+    """
+    return {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+
+
+class AuthThrottleTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # A fixed clock, so the requests of a test never straddle two windows.
+        patcher = mock.patch.object(SlidingWindowThrottle, "timer", return_value=1_000_000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attempt_login(self, email, **headers):
+        return self.client.post("/api/v1/accounts/login/", {"email": email, "password": "wrong"}, **headers)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(auth="2/min"))
+    def test_forged_forwarded_for_does_not_reset_the_ip_limit(self):
+        for index in range(2):
+            response = self.attempt_login(f"user{index}@example.com", HTTP_X_FORWARDED_FOR=f"10.0.0.{index}")
+            self.assertNotEqual(response.status_code, 429)
+
+        response = self.attempt_login("user2@example.com", HTTP_X_FORWARDED_FOR="10.0.0.2")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(REST_FRAMEWORK={**throttle_rates(auth="2/min"), "NUM_PROXIES": 1})
+    def test_forwarded_for_is_trusted_behind_a_proxy(self):
+        for index in range(3):
+            response = self.attempt_login(f"user{index}@example.com", HTTP_X_FORWARDED_FOR=f"10.0.0.{index}")
+            self.assertNotEqual(response.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(auth_account="2/min"))
+    def test_account_limit_applies_across_ips(self):
+        for index in range(2):
+            self.attempt_login("victim@example.com", REMOTE_ADDR=f"10.0.0.{index}")
+
+        response = self.attempt_login("Victim@example.com", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BulkRegisterTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        admin = User.objects.create_user(
+            first_name="Admin", last_name="User", username="admin", email="admin@example.com", password="x",
+            is_staff=True,
+        )
+        self.client.force_authenticate(admin)
+
+    def register(self, count):
+        users = [
+            {
+                "email": f"user{index}@example.com", "username": f"user{index}", "first_name": "New",
+                "last_name": "User", "password": "Correct-Horse-9",
+            }
+            for index in range(count)
+        ]
+        return self.client.post("/api/v1/accounts/register/bulk/", users, format="json")
+
+    @override_settings(USER_PROVISIONING_MAX_ITEMS=10, USER_PROVISIONING_WORKERS=4)
+    def test_passwords_are_hashed_without_a_process_pool(self):
+        with mock.patch("accounts.provisioning.ProcessPoolExecutor") as pool:
+            response = self.register(10)
+
+        self.assertEqual(response.status_code, 201, response.data)
+        pool.assert_not_called()
+        self.assertTrue(User.objects.get(email="user9@example.com").check_password("Correct-Horse-9"))
+
+    @override_settings(USER_PROVISIONING_MAX_ITEMS=3)
+    def test_requests_over_the_item_limit_are_rejected(self):
+        response = self.register(4)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(email__endswith="@example.com", is_staff=False).exists())
+
+
+class TokenRefreshTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            first_name="Ada", last_name="Reader", username="reader", email="reader@example.com", password="x",
+        )
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def refresh_token(self, refresh=None):
+        return self.client.post("/api/v1/accounts/token/refresh/", {"refresh": refresh or self.refresh})
+
+    def block(self):
+        self.user.is_blocked = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["is_blocked"])
+
+    def test_refresh_fails_once_the_user_is_blocked(self):
+        self.assertEqual(self.refresh_token().status_code, 200)
+
+        self.block()
+
+        self.assertEqual(self.refresh_token().status_code, 403)
+
+    def test_set_reloaded_before_the_block_commits_is_dropped(self):
+        self.user.is_blocked = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["is_blocked"])
+            # A concurrent refresh reloads the set, without the uncommitted block.
+            cache.set(BLOCKED_USERS_CACHE_KEY, frozenset())
+
+        self.assertEqual(self.refresh_token().status_code, 403)
+
+    def test_refresh_with_another_user_id_field(self):
+        with mock.patch.object(tokens.api_settings, "USER_ID_FIELD", "email"), \
+                mock.patch.object(serializers.api_settings, "USER_ID_FIELD", "email"):
+            refresh = str(RefreshToken.for_user(self.user))
+            self.assertEqual(self.refresh_token(refresh).status_code, 200)
+
+            self.block()
+            self.assertEqual(self.refresh_token(refresh).status_code, 403)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user_snapshots.invalidate()
+        self.addCleanup(user_snapshots.invalidate)
+        self.user = User.objects.create_user(
+            first_name="Ada", last_name="Reader", username="reader", email="reader@example.com", password="x",
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def authenticate(self):
+        return CachedJWTAuthentication().authenticate(self.request)[0]
+
+    def update_user(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=list(fields))
+
+    def test_warm_requests_run_no_auth_queries(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "reader@example.com")
+
+    def test_warm_get_runs_no_auth_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=self.request.META["HTTP_AUTHORIZATION"])
+        self.client.get("/api/v1/reading-list/")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/api/v1/reading-list/").status_code, 200)
+
+        self.assertEqual([query["sql"] for query in queries if User._meta.db_table in query["sql"]], [])
+
+    def test_flag_changes_invalidate_the_snapshot(self):
+        self.authenticate()
+
+        self.update_user(is_staff=True)
+        self.assertTrue(self.authenticate().is_staff)
+
+        self.update_user(is_blocked=True)
+        self.assertTrue(self.authenticate().is_blocked)
+
+        self.update_user(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_snapshot_reloaded_before_the_change_commits_is_dropped(self):
+        self.authenticate()
+        stale = get_user_snapshot(self.user.pk)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["is_active"])
+            # A concurrent request reloads the snapshot, without the uncommitted change.
+            user_snapshots.set(self.user.pk, stale)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(dict(zip(SNAPSHOT_FIELDS, get_user_snapshot(self.user.pk)))["is_active"], False)
@@ -1,10 +1,17 @@
 from django.urls import path
-from .views import CustomTokenObtainPairView, CustomTokenRefreshView, RegisterUserView, UserProfileView
+from .views import (
+    BulkRegisterUserView,
+    CustomTokenObtainPairView,
+    CustomTokenRefreshView,
+    RegisterUserView,
+    UserProfileView,
+)
 
 
 urlpatterns = [
     path("login/", CustomTokenObtainPairView.as_view(), name="login"),
     path("token/refresh/", CustomTokenRefreshView.as_view(), name="token_refresh"),
     path("register/", RegisterUserView.as_view(), name="register"),
+    path("register/bulk/", BulkRegisterUserView.as_view(), name="register_bulk"),
     path("profile/", UserProfileView.as_view(), name="user_profile"),
 ]
@@ -4,26 +4,35 @@ from .serializers import (
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from .serializers import UserSerializer, UserProfileListSerializer
+from .models import User
+from .provisioning import UserProvisioner, get_provisioning_max_items
+from BookManagement.instrumentation import InstrumentedViewMixin
+from BookManagement.throttling import AuthAccountRateThrottle, AuthIPRateThrottle
 
 # Create your views here.
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(InstrumentedViewMixin, TokenObtainPairView):
     """
     API endpoint for user login.
 
     This view allows users to obtain a pair of JWT tokens (access and refresh tokens)
     by providing valid credentials (email and password).
 
+    Attempts are throttled per IP and per email before the password is checked.
+
     Attributes:
         serializer_class (CustomTokenObtainPairSerializer): The serializer used for token generation.
+        throttle_classes (list): The `auth` and `auth_account` rate throttles.
     """
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [AuthIPRateThrottle, AuthAccountRateThrottle]
 
 
-class CustomTokenRefreshView(TokenRefreshView):
+class CustomTokenRefreshView(InstrumentedViewMixin, TokenRefreshView):
     """
     API endpoint for refreshing access tokens.
 
@@ -32,11 +41,13 @@ class CustomTokenRefreshView(TokenRefreshView):
 
     Attributes:
         serializer_class (CustomTokenRefreshSerializer): The serializer used for token refresh.
+        throttle_classes (list): The `auth` rate throttle, per IP.
     """
     serializer_class = CustomTokenRefreshSerializer
+    throttle_classes = [AuthIPRateThrottle]
 
 
-class RegisterUserView(generics.CreateAPIView):
+class RegisterUserView(InstrumentedViewMixin, generics.CreateAPIView):
     """
     API endpoint for user registration.
 
@@ -46,12 +57,15 @@ class RegisterUserView(generics.CreateAPIView):
         serializer_class (UserSerializer): The serializer used for user creation.
         permission_classes (tuple): Permissions required to access this view. 
                                     Default is `AllowAny`, meaning no authentication is required.
+        throttle_classes (list): The `auth` and `auth_account` rate throttles, as
+                                 registering hashes the password too.
 
     Methods:
         create(request, *args, **kwargs): Handles the creation of a new user.
     """
     serializer_class = UserSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = [AuthIPRateThrottle, AuthAccountRateThrottle]
 
     def create(self, request, *args, **kwargs):
         """
@@ -82,7 +96,56 @@ class RegisterUserView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class BulkRegisterUserView(InstrumentedViewMixin, generics.GenericAPIView):
+    """
+    API endpoint for registering a list of users at once, for admins.
+
+    Each item takes the fields of `RegisterUserView` (`confirm_password` is
+    optional). The batch is checked for uniqueness in one query and the users are
+    inserted in bulk (see accounts.provisioning). Nothing is created unless every
+    item is valid. Passwords are hashed in the worker serving the request, so a
+    batch is limited to `USER_PROVISIONING_MAX_ITEMS` users; larger imports go
+    through the `provision_users` command, which hashes them in a process pool.
+
+    Attributes:
+        permission_classes (list): Only staff users may provision users.
+
+    Methods:
+        post(request): Validates and creates the users.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Validate and create a list of users.
+
+        Args:
+            request (Request): The HTTP request object containing a list of users.
+
+        Returns:
+            Response: The `id`, `email` and `username` of the created users with a
+                      status of 201, or the errors of the invalid items, by index,
+                      with a status of 400.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list of users."]})
+        if len(items) > get_provisioning_max_items():
+            raise ValidationError(
+                {"non_field_errors": [f"A bulk request accepts at most {get_provisioning_max_items()} users."]}
+            )
+
+        # A process pool per request would compete with the other web workers for the CPUs.
+        users, errors = UserProvisioner(workers=1).provision(items)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            [{"id": user.pk, "email": user.email, "username": user.username} for user in users],
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class UserProfileView(InstrumentedViewMixin, generics.RetrieveUpdateAPIView):
     """
     API endpoint for retrieving and updating the authenticated user's profile.
 
@@ -104,9 +167,10 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         """
         Retrieve the authenticated user's profile.
 
-        This method returns the user instance associated with the current request.
+        The user attached to the request only carries the fields cached for
+        authentication, so the full row is loaded here in a single query.
 
         Returns:
             User: The authenticated user instance.
         """
-        return self.request.user
+        return User.objects.get(pk=self.request.user.pk)
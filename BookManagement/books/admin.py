@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 from .models import Books, Generes, Authors, ReadingLists
+from .pagination import EstimatedCountPaginator
 
 # Register your models here.
 
@@ -20,6 +21,9 @@ class CustomBookAdmin(admin.ModelAdmin):
     search_fields = ("title", "author__first_name", "author__last_name")
     list_filter = ("genre", "language", "publication_date")
     ordering = ("-created_at",)
+    # Large changelists are counted from planner estimates, and the unfiltered total is not counted.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 class CustomAuthorAdmin(admin.ModelAdmin):
     list_display = ("first_name", "last_name", "full_name")
@@ -35,6 +39,8 @@ class CustomReadingListAdmin(admin.ModelAdmin):
     list_display = ("book", "position", "date_added", "user")
     search_fields = ("book__title", "book__author__first_name", "book__author__last_name")
     ordering = ("position", "date_added")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(Books, CustomBookAdmin)
@@ -0,0 +1,167 @@
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+from BookManagement.db_router import read_from_primary
+from .query_budget import QueryCounter, check_query_budget
+
+
+class AsyncReadHandler:
+    """
+    Serve a viewset's `list` or `retrieve` action with Django's async ORM.
+
+    The request goes through the viewset's own machinery: authentication,
+    permissions, throttling, filtering, search, ordering, `?fields=`, the
+    response cache, pagination and serialization are the viewset's methods.
+    The parts that may touch the database synchronously (authentication, the
+    permission checks, a search probe, cache lookups, `?facets=` counts) run
+    together in one `sync_to_async` call. The page count, the page rows and the retrieved object
+    are then fetched with `acount()`, async iteration and `aget()`, so the worker
+    is not held by a thread while waiting on the database for them.
+
+    The SQL of the whole request is counted against the viewset's query budget
+    (see books.query_budget), like `QueryBudgetMixin.dispatch` does for the sync path.
+
+    Attributes:
+        viewset_class (type): The viewset whose action is served.
+        action (str): Either `list` or `retrieve`.
+        initkwargs (dict): The keyword arguments the router passes to `as_view()`.
+    """
+
+    def __init__(self, viewset_class, action, initkwargs):
+        self.viewset_class = viewset_class
+        self.action = action
+        self.initkwargs = initkwargs
+
+    def prepare(self, request, args, kwargs):
+        """
+        Run the synchronous part of the request and build the filtered queryset.
+
+        Returns:
+            tuple: The view, and either the filtered queryset or a finished response.
+        """
+        view = self.viewset_class(**self.initkwargs)
+        view.action_map = {"get": self.action}
+        view.args, view.kwargs = args, kwargs
+        view.request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        try:
+            view.initial(view.request, *args, **kwargs)
+            view.cache_key = None
+            if hasattr(view, "is_response_cacheable") and view.is_response_cacheable(view.request):
+                view.cache_key = view.get_response_cache_key(view.request)
+                cached = view.get_cached_response(view.cache_key)
+                if cached is not None:
+                    return view, cached
+            view.field_plan = view.get_field_plan() if self.action == "list" and hasattr(view, "get_field_plan") else None
+            queryset = view.filter_queryset(view.get_queryset())
+            view.facet_counts = view.get_facets(queryset) if self.action == "list" and hasattr(view, "get_facets") else None
+            return view, queryset
+        except Exception as exc:
+            return view, view.handle_exception(exc)
+
+    def finalize(self, view, response):
+        if getattr(view, "cache_key", None) is not None:
+            view.store_response(view.cache_key, response)
+        return view.finalize_response(view.request, response, *view.args, **view.kwargs)
+
+    async def __call__(self, request, *args, **kwargs):
+        counter = QueryCounter()
+        # Installed in the thread the async ORM runs its queries in.
+        await sync_to_async(counter.install)()
+        try:
+            view, response = await self.handle(request, args, kwargs)
+        finally:
+            await sync_to_async(counter.uninstall)()
+        if hasattr(view, "get_query_budget"):
+            check_query_budget(f"{self.viewset_class.__name__}.{self.action}", view.get_query_budget(), counter)
+        return response
+
+    async def handle(self, request, args, kwargs):
+        """
+        Serve the request.
+
+        Returns:
+            tuple: The view and the finalized response.
+        """
+        view, result = await sync_to_async(self.prepare)(request, args, kwargs)
+        if isinstance(result, Response):
+            return view, view.finalize_response(view.request, result, *args, **kwargs)
+
+        try:
+            # A response stored in the cache is built from the primary, like in
+            # `CachedResponseMixin.cached_response`.
+            with read_from_primary() if getattr(view, "cache_key", None) is not None else nullcontext():
+                if self.action == "list":
+                    response = await self.list(view, result)
+                else:
+                    response = await self.retrieve(view, result)
+        except Exception as exc:
+            response = await sync_to_async(view.handle_exception)(exc)
+        return view, await sync_to_async(self.finalize)(view, response)
+
+    async def list(self, view, queryset):
+        plan = view.field_plan
+        if plan is not None:
+            # Same `.values()` rows as `FastPathListMixin.list`.
+            ordering = list(getattr(view, "ordering_fields", None) or []) + list(getattr(view, "ordering", None) or [])
+            extra = [term.lstrip("-") for term in ordering if isinstance(term, str)]
+            queryset = queryset.values(*dict.fromkeys(plan.lookups + extra))
+
+        paginator = view.paginator
+        page = None
+        if hasattr(paginator, "apaginate_queryset"):
+            page = await paginator.apaginate_queryset(queryset, view.request, view=view)
+        elif paginator is not None:
+            # Paginators without an async path (e.g. DRF's own) run in a thread;
+            # the catalog viewsets all use one with `apaginate_queryset`.
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, view.request, view=view)
+        rows = page if page is not None else [row async for row in queryset]
+
+        data = plan.render_many(rows) if plan is not None else view.get_serializer(rows, many=True).data
+        if page is not None:
+            response = view.get_paginated_response(data)
+            if view.facet_counts is not None:
+                response.data["facets"] = view.facet_counts
+            return response
+        return Response(data)
+
+    async def retrieve(self, view, queryset):
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, DjangoValidationError, TypeError, ValueError):
+            raise Http404("No %s matches the given query." % queryset.model._meta.object_name)
+        # The catalog's read permissions do not query the database.
+        view.check_object_permissions(view.request, instance)
+        return Response(view.get_serializer(instance).data)
+
+
+def async_catalog_view(viewset_class, actions, **initkwargs):
+    """
+    Build a view serving `GET` asynchronously and every other method with the viewset.
+
+    Args:
+        viewset_class (type): The viewset.
+        actions (dict): HTTP method mapped to action, as passed to `as_view()`.
+        **initkwargs: The router's `as_view()` keyword arguments (basename, detail, ...).
+
+    Returns:
+        Callable: An async view function.
+    """
+    sync_view = sync_to_async(viewset_class.as_view(actions, **initkwargs))
+    read = AsyncReadHandler(viewset_class, actions["get"], initkwargs)
+
+    async def view(request, *args, **kwargs):
+        if request.method == "GET":
+            return await read(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    view.cls = viewset_class
+    view.initkwargs = initkwargs
+    view.actions = actions
+    return csrf_exempt(view)
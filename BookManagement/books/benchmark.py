@@ -0,0 +1,536 @@
+import fnmatch
+import http.client
+import itertools
+import json
+import math
+import threading
+import time
+import urllib.parse
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+from .bulk import books_written_in_bulk
+from .models import Authors, Books, Generes, ReadingLists
+from .positions import POSITION_GAP
+
+
+# Benchmark users (and users registered by the benchmark) use this email domain.
+BENCH_EMAIL_DOMAIN = "bench.invalid"
+BENCH_PASSWORD = "Bench#Passw0rd"
+BENCH_GENRE_PREFIX = "Bench Genre"
+
+
+class Scenario:
+    """
+    One benchmarked request.
+
+    `path` and `body` are either constants or callables taking the fixtures and
+    the per-request item. Items come from `prepare(fixtures, count)` when given
+    (for example books created for a `DELETE` scenario, one per request), and
+    are the request indexes otherwise.
+
+    Attributes:
+        name (str): Label used in reports and baselines.
+        method (str): HTTP method.
+        path (str | Callable): Request path, including the query string.
+        body (object | Callable): JSON body, or None.
+        auth (str | None): `user`, `admin`, or None for an anonymous request.
+        prepare (Callable | None): Builds one item per request before the run.
+        expect (tuple): Status codes counted as successful.
+    """
+
+    def __init__(self, name, method, path, body=None, auth="user", prepare=None, expect=(200,)):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.auth = auth
+        self.prepare = prepare
+        self.expect = expect
+
+    def build_requests(self, fixtures, count):
+        """
+        Return the `(path, body)` of each request.
+
+        Args:
+            fixtures (BenchmarkFixtures): The benchmark fixtures.
+            count (int): Number of requests, warm-up included.
+
+        Returns:
+            list: One `(path, body)` tuple per request.
+        """
+        items = self.prepare(fixtures, count) if self.prepare else range(count)
+        return [
+            (
+                self.path(fixtures, item) if callable(self.path) else self.path,
+                self.body(fixtures, item) if callable(self.body) else self.body,
+            )
+            for item in items
+        ]
+
+
+class BenchmarkFixtures:
+    """
+    Users, tokens and catalog ids the scenarios send requests with.
+
+    Reads use a sample of the existing catalog, which must have been imported or
+    seeded beforehand. Writes only touch rows created for the benchmark by its
+    own users, and `teardown()` deletes all of them.
+
+    Attributes:
+        sample_size (int): Number of catalog books, authors and genres sampled for reads.
+    """
+
+    def __init__(self, sample_size=500):
+        self.sample_size = sample_size
+        self.run_id = str(time.time_ns())
+        # Numbers the rows the fixtures create, so their names never collide.
+        self.sequence = itertools.count()
+
+    def setup(self):
+        """
+        Create the benchmark users and sample the catalog.
+
+        Raises:
+            ValueError: If the catalog is empty.
+        """
+        self.teardown()
+        self.book_ids = list(Books.objects.order_by("pk").values_list("pk", flat=True)[: self.sample_size])
+        self.author_ids = list(Authors.objects.order_by("pk").values_list("pk", flat=True)[: self.sample_size])
+        self.genre_ids = list(Generes.objects.order_by("pk").values_list("pk", flat=True)[: self.sample_size])
+        if not (self.book_ids and self.author_ids and self.genre_ids):
+            raise ValueError("The catalog is empty; seed or import some books first.")
+        title = Books.objects.filter(pk=self.book_ids[0]).values_list("title", flat=True).first()
+        self.search_term = max(title.split(), key=len)
+
+        self.user = User.objects.create_user(
+            first_name="Bench", last_name="User", username=f"bench_user_{self.run_id}",
+            email=f"user@{BENCH_EMAIL_DOMAIN}", password=BENCH_PASSWORD,
+        )
+        self.admin = User.objects.create_user(
+            first_name="Bench", last_name="Admin", username=f"bench_admin_{self.run_id}",
+            email=f"admin@{BENCH_EMAIL_DOMAIN}", password=BENCH_PASSWORD, is_staff=True,
+        )
+        self.tokens = {"user": RefreshToken.for_user(self.user), "admin": RefreshToken.for_user(self.admin)}
+        self.reading_list_entries(min(20, len(self.book_ids)), self.book_ids)
+
+    def teardown(self):
+        """
+        Delete every row created by the benchmark.
+        """
+        User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+        Generes.objects.filter(name__startswith=BENCH_GENRE_PREFIX).delete()
+
+    def headers(self, auth):
+        """
+        Return the headers authenticating a request.
+
+        Args:
+            auth (str | None): `user`, `admin`, or None.
+
+        Returns:
+            dict: The `Authorization` header, if any.
+        """
+        if auth is None:
+            return {}
+        return {"Authorization": f"Bearer {self.tokens[auth].access_token}"}
+
+    def own_books(self, count):
+        numbers = [next(self.sequence) for _ in range(count)]
+        books = Books.objects.bulk_create(
+            Books(
+                created_by=self.user,
+                title=f"Bench book {self.run_id} {number}",
+                author_id=self.author_ids[n % len(self.author_ids)],
+                genre_id=self.genre_ids[n % len(self.genre_ids)],
+            )
+            for n, number in enumerate(numbers)
+        )
+        books_written_in_bulk([book.pk for book in books])
+        return [book.pk for book in books]
+
+    def own_authors(self, count):
+        names = [f"Author {self.run_id} {next(self.sequence)}" for _ in range(count)]
+        Authors.objects.bulk_create(
+            Authors(first_name="Bench", last_name=name, created_by=self.user) for name in names
+        )
+        return list(
+            Authors.objects.filter(first_name="Bench", last_name__in=names).order_by("pk").values_list("pk", flat=True)
+        )
+
+    def bench_genres(self, count):
+        names = [f"{BENCH_GENRE_PREFIX} {self.run_id} {next(self.sequence)}" for _ in range(count)]
+        Generes.objects.bulk_create(Generes(name=name) for name in names)
+        return list(Generes.objects.filter(name__in=names).order_by("pk").values_list("pk", flat=True))
+
+    def reading_list_entries(self, count, book_ids=None):
+        book_ids = book_ids[:count] if book_ids is not None else self.own_books(count)
+        start = ReadingLists.objects.filter(user=self.user).count() + 1
+        entries = ReadingLists.objects.bulk_create(
+            ReadingLists(user=self.user, book_id=book_id, position=(start + n) * POSITION_GAP)
+            for n, book_id in enumerate(book_ids)
+        )
+        return [entry.pk for entry in entries]
+
+    def reading_list_ids(self, count=None):
+        ids = list(ReadingLists.objects.filter(user=self.user).order_by("pk").values_list("pk", flat=True))
+        return ids if count is None else [_pick(ids, n) for n in range(count)]
+
+
+def _pick(ids, item):
+    return ids[item % len(ids)]
+
+
+def build_scenarios():
+    """
+    Return a scenario for every route of `books.urls` and `accounts.urls`.
+
+    Returns:
+        list: The scenarios, in run order.
+    """
+    accounts, api = "/api/v1/accounts", "/api/v1"
+    return [
+        Scenario(
+            "accounts.login", "POST", f"{accounts}/login/",
+            body={"email": f"user@{BENCH_EMAIL_DOMAIN}", "password": BENCH_PASSWORD}, auth=None,
+        ),
+        Scenario(
+            "accounts.token_refresh", "POST", f"{accounts}/token/refresh/",
+            body=lambda f, i: {"refresh": str(f.tokens["user"])}, auth=None,
+        ),
+        Scenario(
+            "accounts.register", "POST", f"{accounts}/register/", auth=None, expect=(201,),
+            body=lambda f, i: {
+                "email": f"register-{f.run_id}-{i}@{BENCH_EMAIL_DOMAIN}", "username": f"bench_{f.run_id}_{i}",
+                "first_name": "Bench", "last_name": "Register",
+                "password": BENCH_PASSWORD, "confirm_password": BENCH_PASSWORD,
+            },
+        ),
+        Scenario("accounts.profile", "GET", f"{accounts}/profile/"),
+        Scenario("accounts.profile_update", "PATCH", f"{accounts}/profile/", body={"first_name": "Bench"}),
+
+        Scenario("books.list", "GET", f"{api}/books/"),
+        Scenario("books.list_anonymous", "GET", f"{api}/books/", auth=None),
+        Scenario("books.list_search", "GET", lambda f, i: f"{api}/books/?search={urllib.parse.quote(f.search_term)}"),
+        Scenario("books.list_filtered", "GET", lambda f, i: f"{api}/books/?genre={_pick(f.genre_ids, i)}&ordering=title"),
+        Scenario("books.list_cursor", "GET", f"{api}/books/?pagination=cursor"),
+        Scenario("books.list_sparse", "GET", f"{api}/books/?fields=id,title,author&expand=author"),
+        Scenario("books.retrieve", "GET", lambda f, i: f"{api}/books/{_pick(f.book_ids, i)}/"),
+        Scenario("books.export", "GET", lambda f, i: f"{api}/books/export/?format=ndjson&author={_pick(f.author_ids, i)}"),
+        Scenario(
+            "books.create", "POST", f"{api}/books/", expect=(201,),
+            body=lambda f, i: {
+                "title": f"Bench created {i}", "author_id": _pick(f.author_ids, i), "genre_id": _pick(f.genre_ids, i),
+            },
+        ),
+        Scenario(
+            "books.bulk_create", "POST", f"{api}/books/", expect=(201,),
+            body=lambda f, i: [
+                {"title": f"Bench bulk {i}.{n}", "author_id": _pick(f.author_ids, i + n), "genre_id": _pick(f.genre_ids, n)}
+                for n in range(10)
+            ],
+        ),
+        Scenario(
+            "books.update", "PUT", lambda f, pk: f"{api}/books/{pk}/", prepare=lambda f, n: f.own_books(n),
+            body=lambda f, pk: {"title": f"Bench updated {pk}", "author_id": f.author_ids[0], "genre_id": f.genre_ids[0]},
+        ),
+        Scenario(
+            "books.partial_update", "PATCH", lambda f, pk: f"{api}/books/{pk}/", prepare=lambda f, n: f.own_books(n),
+            body={"subtitle": "Bench subtitle"},
+        ),
+        Scenario(
+            "books.bulk_update", "PATCH", f"{api}/books/bulk/",
+            prepare=lambda f, n: [f.own_books(10) for _ in range(n)],
+            body=lambda f, pks: [{"id": pk, "subtitle": "Bench bulk subtitle"} for pk in pks],
+        ),
+        Scenario(
+            "books.destroy", "DELETE", lambda f, pk: f"{api}/books/{pk}/", prepare=lambda f, n: f.own_books(n),
+            expect=(204,),
+        ),
+
+        Scenario("authors.list", "GET", f"{api}/authors/"),
+        Scenario("authors.retrieve", "GET", lambda f, i: f"{api}/authors/{_pick(f.author_ids, i)}/"),
+        Scenario(
+            "authors.create", "POST", f"{api}/authors/", expect=(201,),
+            body=lambda f, i: {"first_name": "Bench", "last_name": f"Created {f.run_id} {i}"},
+        ),
+        Scenario(
+            "authors.partial_update", "PATCH", lambda f, pk: f"{api}/authors/{pk}/",
+            prepare=lambda f, n: f.own_authors(n), body={"date_of_birth": "1900-01-01"},
+        ),
+        Scenario(
+            "authors.destroy", "DELETE", lambda f, pk: f"{api}/authors/{pk}/",
+            prepare=lambda f, n: f.own_authors(n), expect=(204,),
+        ),
+
+        Scenario("genres.list", "GET", f"{api}/genres/"),
+        Scenario("genres.retrieve", "GET", lambda f, i: f"{api}/genres/{_pick(f.genre_ids, i)}/"),
+        Scenario(
+            "genres.create", "POST", f"{api}/genres/", auth="admin", expect=(201,),
+            body=lambda f, i: {"name": f"{BENCH_GENRE_PREFIX} created {f.run_id} {i}"},
+        ),
+        Scenario(
+            "genres.update", "PUT", lambda f, pk: f"{api}/genres/{pk}/", auth="admin",
+            prepare=lambda f, n: f.bench_genres(n), body=lambda f, pk: {"name": f"{BENCH_GENRE_PREFIX} renamed {pk}"},
+        ),
+        Scenario(
+            "genres.destroy", "DELETE", lambda f, pk: f"{api}/genres/{pk}/", auth="admin",
+            prepare=lambda f, n: f.bench_genres(n), expect=(204,),
+        ),
+
+        Scenario("reading_list.list", "GET", f"{api}/reading-list/"),
+        Scenario(
+            "reading_list.retrieve", "GET", lambda f, pk: f"{api}/reading-list/{pk}/",
+            prepare=lambda f, n: f.reading_list_ids(n),
+        ),
+        Scenario(
+            "reading_list.create", "POST", f"{api}/reading-list/", expect=(201,),
+            prepare=lambda f, n: f.own_books(n), body=lambda f, pk: {"book_id": pk},
+        ),
+        Scenario(
+            "reading_list.partial_update", "PATCH", lambda f, pk: f"{api}/reading-list/{pk}/",
+            prepare=lambda f, n: f.reading_list_ids(n),
+            body=lambda f, pk: {"position": pk * POSITION_GAP},
+        ),
+        Scenario(
+            "reading_list.move", "POST", lambda f, pk: f"{api}/reading-list/{pk}/move/",
+            prepare=lambda f, n: f.reading_list_ids(n), body={"position": "top"},
+        ),
+        Scenario(
+            "reading_list.reorder", "POST", f"{api}/reading-list/reorder/", expect=(204,),
+            prepare=lambda f, n: [f.reading_list_ids()] * n,
+            body=lambda f, ids: {"ids": ids[::-1]},
+        ),
+        Scenario(
+            "reading_list.destroy", "DELETE", lambda f, pk: f"{api}/reading-list/{pk}/",
+            prepare=lambda f, n: f.reading_list_entries(n), expect=(204,),
+        ),
+    ]
+
+
+class InProcessTransport:
+    """
+    Send requests through Django's test `Client`, counting the SQL queries of each.
+
+    Each worker thread gets its own client and, as Django connections are
+    thread-local, its own database connections; `close()` releases them.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def send(self, method, path, body, headers):
+        """
+        Send one request.
+
+        Returns:
+            tuple: The status code, the response body and the number of SQL queries.
+        """
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        data = json.dumps(body) if body is not None else ""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count))
+            response = client.generic(method, path, data, content_type="application/json", headers=headers)
+            # Streaming responses run their queries while the body is consumed.
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, content, queries
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """
+    Send requests to a running server over keep-alive HTTP connections.
+
+    The server must use the same database as this process, which creates the
+    fixtures. Query counts are not available and are reported as None.
+
+    Attributes:
+        base_url (str): Scheme, host and port of the server, e.g. `http://127.0.0.1:8000`.
+        timeout (float): Socket timeout in seconds.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        url = urllib.parse.urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def send(self, method, path, body, headers):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json", **headers}
+        for attempt in range(2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = self.local.connection = self.connection_class(self.netloc, timeout=self.timeout)
+            try:
+                connection.request(method, self.prefix + path, data, headers)
+                response = connection.getresponse()
+                return response.status, response.read(), None
+            except (http.client.HTTPException, OSError):
+                # The server closed the kept-alive connection; reconnect once.
+                connection.close()
+                self.local.connection = None
+                if attempt:
+                    raise
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    Args:
+        values (list): The values, in any order.
+        fraction (float): The percentile, between 0 and 1.
+
+    Returns:
+        float | None: The percentile, or None for an empty list.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_scenario(transport, scenario, fixtures, requests, concurrency, warmup=0):
+    """
+    Send a scenario's requests from `concurrency` threads and summarize them.
+
+    Args:
+        transport (InProcessTransport | HTTPTransport): Sends the requests.
+        scenario (Scenario): The scenario.
+        fixtures (BenchmarkFixtures): The benchmark fixtures.
+        requests (int): Number of measured requests.
+        concurrency (int): Number of threads sending requests.
+        warmup (int): Requests sent, unmeasured, before the measured ones.
+
+    Returns:
+        dict: Request and error counts, throughput (requests/s), p50/p95/p99
+              latencies (ms), mean SQL queries per successful request and a
+              sample error.
+    """
+    pending = scenario.build_requests(fixtures, warmup + requests)
+    headers = fixtures.headers(scenario.auth)
+    lock = threading.Lock()
+    latencies, query_counts, errors = [], [], []
+
+    def worker(batch, measured):
+        try:
+            while True:
+                with lock:
+                    if not batch:
+                        return
+                    path, body = batch.pop()
+                started = time.perf_counter()
+                status, content, queries = transport.send(scenario.method, path, body, headers)
+                elapsed = time.perf_counter() - started
+                if not measured:
+                    continue
+                with lock:
+                    latencies.append(elapsed * 1000)
+                    if status not in scenario.expect:
+                        errors.append((status, content[:300]))
+                    elif queries is not None:
+                        query_counts.append(queries)
+        finally:
+            transport.close()
+
+    def run(batch, measured):
+        batch = batch[::-1]
+        threads = [threading.Thread(target=worker, args=(batch, measured)) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run(pending[:warmup], measured=False)
+    started = time.perf_counter()
+    run(pending[warmup:], measured=True)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput": len(latencies) / elapsed if elapsed else None,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "queries": sum(query_counts) / len(query_counts) if query_counts else None,
+        "sample_error": f"{errors[0][0]} {errors[0][1]!r}" if errors else None,
+    }
+
+
+def select_scenarios(scenarios, patterns):
+    """
+    Return the scenarios whose name matches one of the `fnmatch` patterns.
+
+    Args:
+        scenarios (list): The scenarios.
+        patterns (list | None): Patterns such as `books.*`; None selects every scenario.
+
+    Returns:
+        list: The selected scenarios, in run order.
+    """
+    if not patterns:
+        return scenarios
+    return [s for s in scenarios if any(fnmatch.fnmatchcase(s.name, pattern) for pattern in patterns)]
+
+
+def compare_to_baseline(results, baseline, threshold, min_delta_ms=1.0):
+    """
+    Return the regressions of a run against a saved baseline.
+
+    A scenario regresses when its p95 latency grows, or its throughput drops, by
+    more than `threshold` (a fraction), or when it runs more SQL queries per
+    request. Latency changes under `min_delta_ms` are ignored as noise.
+
+    Args:
+        results (dict): Scenario summaries of this run, by name.
+        baseline (dict): Scenario summaries of the baseline, by name.
+        threshold (float): Allowed relative change, e.g. 0.2 for 20%.
+        min_delta_ms (float): Smallest p95 increase reported, in milliseconds.
+
+    Returns:
+        list: One message per regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p95"] is not None and previous.get("p95") is not None:
+            if current["p95"] > previous["p95"] * (1 + threshold) and current["p95"] - previous["p95"] >= min_delta_ms:
+                regressions.append(f"{name}: p95 {previous['p95']:.2f} ms -> {current['p95']:.2f} ms")
+        if current["throughput"] is not None and previous.get("throughput"):
+            if current["throughput"] < previous["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{name}: throughput {previous['throughput']:.1f}/s -> {current['throughput']:.1f}/s"
+                )
+        if current["queries"] is not None and previous.get("queries") is not None:
+            if round(current["queries"], 2) > round(previous["queries"], 2):
+                regressions.append(f"{name}: queries {previous['queries']:.2f} -> {current['queries']:.2f}")
+    return regressions
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .cache import bump_version
+from .models import Books
+from .search import get_search_backend
+
+
+def get_bulk_batch_size():
+    """
+    Return the number of rows written per `INSERT`/`UPDATE` statement in bulk writes.
+
+    Returns:
+        int: The batch size.
+    """
+    return getattr(settings, "BOOKS_BULK_BATCH_SIZE", 500)
+
+
+def get_bulk_max_items():
+    """
+    Return the maximum number of items accepted by a single bulk request.
+
+    Returns:
+        int: The item limit.
+    """
+    return getattr(settings, "BOOKS_BULK_MAX_ITEMS", 10000)
+
+
+def to_pk(model, value):
+    """
+    Convert a payload value to a primary key of a model, like the serializer fields do.
+
+    Args:
+        model (type): The model class.
+        value: The payload value, e.g. `5` or `"5"`.
+
+    Returns:
+        The primary key, or None if the value is not a valid one.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except (TypeError, ValueError, ValidationError):
+        return None
+
+
+def prefetch_related_instances(items, related_fields):
+    """
+    Load every object referenced by a list of payload items with one query per model.
+
+    Values that are not valid primary keys are skipped here; the serializer field
+    reports them against the right item.
+
+    Args:
+        items (list): The payload items.
+        related_fields (dict): Payload key mapped to the related model class,
+            e.g. `{"author_id": Authors}`.
+
+    Returns:
+        dict: Model class mapped to `{pk: instance}`, suitable for the
+        `related_instances` serializer context key.
+    """
+    wanted = {model: set() for model in related_fields.values()}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for key, model in related_fields.items():
+            pk = to_pk(model, item.get(key))
+            if pk is not None:
+                wanted[model].add(pk)
+    return {model: model.objects.in_bulk(ids) if ids else {} for model, ids in wanted.items()}
+
+
+def books_written_in_bulk(pks):
+    """
+    Run the side effects that `post_save` signals handle for single saves.
+
+    `bulk_create` and `bulk_update` send no signals, so the search index and the
+    catalog response cache are refreshed here instead.
+
+    Args:
+        pks (list): Primary keys of the created or updated books.
+    """
+    if not pks:
+        return
+    get_search_backend().index_books(Books.objects.filter(pk__in=pks))
+    bump_version(Books)
@@ -0,0 +1,219 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from BookManagement.db_router import read_from_primary
+
+
+VERSION_KEY = "catalog:version:{label}"
+RESPONSE_KEY = "catalog:response:{view}:{versions}:{digest}"
+STATS_KEY = "catalog:stats:{view}:{outcome}"
+
+
+def _initial_version():
+    # A fresh counter starts from the clock, so a version lost to cache eviction
+    # never comes back as a value that earlier (stale) response keys were built with.
+    return time.time_ns() // 1000
+
+
+def get_versions(models):
+    """
+    Return the current cache version of each model.
+
+    Args:
+        models (Iterable[type]): The model classes.
+
+    Returns:
+        list: One version number per model, in the same order.
+    """
+    keys = [VERSION_KEY.format(label=model._meta.label_lower) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """
+    Invalidate every cached response depending on a model.
+
+    Responses are keyed on the versions of the models they depend on, so bumping
+    the version is O(1) and old entries are simply never read again; they age out
+    through the cache timeout.
+
+    Args:
+        model (type): The model class whose rows changed.
+    """
+    key = VERSION_KEY.format(label=model._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def record_outcome(view, outcome):
+    """
+    Count a cache hit or miss for a view.
+
+    Args:
+        view (str): The view label.
+        outcome (str): Either `hit` or `miss`.
+    """
+    key = STATS_KEY.format(view=view, outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cache_stats(views):
+    """
+    Return the hit and miss counters of the given views.
+
+    Args:
+        views (Iterable[str]): The view labels.
+
+    Returns:
+        dict: View label mapped to its `hits`, `misses` and `hit_ratio`.
+    """
+    stats = {}
+    for view in views:
+        hits = cache.get(STATS_KEY.format(view=view, outcome="hit"), 0)
+        misses = cache.get(STATS_KEY.format(view=view, outcome="miss"), 0)
+        total = hits + misses
+        stats[view] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Viewset mixin caching anonymous `list` and `retrieve` responses.
+
+    The cache key covers the view, the object id, the host and the full query
+    string (filters, search, ordering and page), plus the current version of every
+    model in `cache_dependencies`. The versions are bumped by the signals in
+    `books.signals`, so any write to those models makes the old entries unreachable.
+    Responses are built from the primary on a miss, as a replica may not have the
+    write behind the new versions yet. Authenticated requests are never cached.
+    Responses carry an `X-Cache` header and hits and misses are counted per view
+    (see `get_cache_stats`).
+
+    Attributes:
+        cache_dependencies (tuple): Models whose changes invalidate the cached responses.
+        cached_actions (tuple): Viewset actions that are cached.
+    """
+    cache_dependencies = ()
+    cached_actions = ("list", "retrieve")
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_label(self):
+        """
+        Return the label used for this view in cache keys and statistics.
+
+        Returns:
+            str: The view's basename and action.
+        """
+        return f"{self.basename}.{self.action}"
+
+    def get_response_cache_key(self, request):
+        """
+        Build the cache key of the current request.
+
+        Args:
+            request (Request): The current request.
+
+        Returns:
+            str: The cache key.
+        """
+        query = sorted(request.query_params.lists())
+        raw = repr((request.scheme, request.get_host(), self.kwargs, query))
+        return RESPONSE_KEY.format(
+            view=self.get_cache_label(),
+            versions=".".join(str(v) for v in get_versions(self.cache_dependencies)),
+            digest=hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest(),
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """
+        Serve the response from the cache, or build and store it.
+
+        Args:
+            handler (Callable): The uncached action implementation.
+            request (Request): The current request.
+
+        Returns:
+            Response: The cached or freshly built response.
+        """
+        if not self.is_response_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        response = self.get_cached_response(key)
+        if response is None:
+            # Cached for every anonymous reader, so never built from a lagging replica.
+            with read_from_primary():
+                response = handler(request, *args, **kwargs)
+            self.store_response(key, response)
+        return response
+
+    def is_response_cacheable(self, request):
+        """
+        Return whether the current request is served through the response cache.
+
+        Args:
+            request (Request): The current request.
+
+        Returns:
+            bool: True for anonymous requests to a cached action.
+        """
+        return (
+            self.action in self.cached_actions
+            and not request.user.is_authenticated
+            and getattr(settings, "CATALOG_CACHE_ENABLED", True)
+        )
+
+    def get_cached_response(self, key):
+        """
+        Return the cached response stored under a key, counting the hit or miss.
+
+        Args:
+            key (str): The key from `get_response_cache_key`.
+
+        Returns:
+            Response | None: The cached response, or None on a miss.
+        """
+        data = cache.get(key)
+        if data is None:
+            record_outcome(self.get_cache_label(), "miss")
+            return None
+        record_outcome(self.get_cache_label(), "hit")
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def store_response(self, key, response):
+        """
+        Cache a freshly built response if it succeeded.
+
+        Args:
+            key (str): The key from `get_response_cache_key`.
+            response (Response): The response built by the action.
+        """
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+        response["X-Cache"] = "MISS"
@@ -0,0 +1,155 @@
+import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BaseRenderer
+
+from .filters import BookFilterSet
+from .models import Books
+
+
+# Output column mapped to the `values_list()` lookup it is read from.
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("title", "title"),
+    ("subtitle", "subtitle"),
+    ("book_url", "book_url"),
+    ("language", "language"),
+    ("description", "description"),
+    ("publication_date", "publication_date"),
+    ("thumbnail", "thumbnail"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+    ("author_id", "author_id"),
+    ("author_first_name", "author__first_name"),
+    ("author_last_name", "author__last_name"),
+    ("genre_id", "genre_id"),
+    ("genre_name", "genre__name"),
+)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Rows are fetched from a server-side cursor this many at a time.
+EXPORT_CHUNK_SIZE = 2000
+
+# Encoded rows are grouped into chunks of roughly this many bytes before being sent.
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def get_export_rows(params, request=None):
+    """
+    Return the filtered catalog rows to export.
+
+    Filters are validated with the same `BookFilterSet` as `BookViewSet`. Rows are
+    ordered by primary key and read with `iterator()`, which uses a server-side
+    cursor on PostgreSQL, so memory stays flat regardless of the table size.
+
+    The rows are read lazily, once the response has left the request (and its
+    replica routing, see BookManagement.db_router), so the database they are read
+    from is chosen here, when the rows are requested.
+
+    Args:
+        params (QueryDict | dict): The filter parameters.
+        request (Request | None): The request, whose user `?mine=` refers to.
+
+    Raises:
+        ValidationError: If a filter value is invalid.
+
+    Returns:
+        Iterator[tuple]: One tuple of column values per book.
+    """
+    filterset = BookFilterSet(data=params, queryset=Books.objects.all(), request=request)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    queryset = filterset.qs.order_by("pk").values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    return queryset.using(queryset.db).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _format_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(rows):
+    """
+    Encode rows as newline-delimited JSON objects.
+
+    Args:
+        rows (Iterable[tuple]): The rows from `get_export_rows`.
+
+    Yields:
+        str: One JSON line per row.
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, map(_format_value, row)))) + "\n"
+
+
+class _Echo:
+    # Lets csv.writer hand back each encoded line instead of writing it to a file.
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Encode rows as CSV with a header line.
+
+    Args:
+        rows (Iterable[tuple]): The rows from `get_export_rows`.
+
+    Yields:
+        str: The header line, then one CSV line per row.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def iter_export(rows, export_format):
+    """
+    Encode rows in the given format, grouped into chunks of about `EXPORT_BUFFER_SIZE`.
+
+    Args:
+        rows (Iterable[tuple]): The rows from `get_export_rows`.
+        export_format (str): Either `ndjson` or `csv`.
+
+    Yields:
+        bytes: UTF-8 encoded chunks of the export.
+    """
+    lines = iter_csv(rows) if export_format == "csv" else iter_ndjson(rows)
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+class _ExportRenderer(BaseRenderer):
+    # Only used for content negotiation: the export itself is streamed directly and
+    # never goes through a renderer. Error responses are rendered as JSON.
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+class NDJSONExportRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVExportRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
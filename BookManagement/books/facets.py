@@ -0,0 +1,151 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from BookManagement.db_router import read_from_primary
+
+from .cache import get_versions
+
+
+FACET_KEY = "catalog:facets:{facet}:{versions}:{digest}"
+
+
+class Facet:
+    """
+    A grouped count of the books matching a request, by one of their fields.
+
+    Attributes:
+        fields (tuple): The `.values()` lookups the books are grouped by; the first
+            one is the facet value the filters accept.
+        output (tuple): The key of each lookup in the returned rows.
+    """
+
+    def __init__(self, *fields, output=None):
+        self.fields = fields
+        self.output = output or fields
+
+    def count(self, queryset, limit):
+        """
+        Count the books of a queryset per value, in one grouped query.
+
+        Args:
+            queryset (QuerySet): The filtered books.
+            limit (int): Maximum number of values returned, most frequent first.
+
+        Returns:
+            list: One dict per value, with the `output` keys and a `count`.
+        """
+        rows = (
+            queryset.order_by()
+            .values(*self.fields)
+            .annotate(facet_count=Count("pk"))
+            .order_by("-facet_count", self.fields[0])[:limit]
+        )
+        return [
+            {**{key: row[field] for key, field in zip(self.output, self.fields)}, "count": row["facet_count"]}
+            for row in rows
+        ]
+
+
+class FacetedListMixin:
+    """
+    Viewset mixin adding `?facets=` counts to paginated `list` responses.
+
+    `?facets=genre,language` adds a `facets` object to the page, mapping each
+    requested facet to the number of books per value across every page of the
+    current filters and search. Each facet is one grouped `COUNT` query. Counts
+    are cached on the filter signature (the filter and search parameters, not
+    the page, ordering or fields) and the catalog versions of `cache_dependencies`,
+    so any write to the catalog invalidates them.
+
+    Attributes:
+        facets (dict): Facet name mapped to its `Facet`.
+        facets_query_param (str): Query parameter listing the requested facets.
+    """
+    facets = {}
+    facets_query_param = "facets"
+
+    def get_requested_facets(self):
+        """
+        Return the facets requested with `?facets=`.
+
+        Raises:
+            ValidationError: If an unknown facet is requested.
+
+        Returns:
+            list: The facet names, without duplicates.
+        """
+        raw = self.request.query_params.get(self.facets_query_param, "")
+        names = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.facets]
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param: [
+                    f"Unknown facet: {', '.join(unknown)}. Available facets: {', '.join(self.facets)}."
+                ]
+            })
+        return names
+
+    def get_filter_signature(self):
+        """
+        Return the request parameters the facet counts depend on.
+
+        Returns:
+            list: Sorted `(parameter, values)` pairs of the filter and search parameters.
+        """
+        names = set(self.filterset_class.base_filters) if getattr(self, "filterset_class", None) else set()
+        names.add(api_settings.SEARCH_PARAM)
+        return sorted((key, values) for key, values in self.request.query_params.lists() if key in names)
+
+    def get_facets(self, queryset):
+        """
+        Return the counts of the requested facets, from the cache when possible.
+
+        Args:
+            queryset (QuerySet): The filtered queryset of the list.
+
+        Returns:
+            dict | None: Facet name mapped to its counts, or None if none are requested.
+        """
+        names = self.get_requested_facets()
+        if not names:
+            return None
+
+        versions = ".".join(str(version) for version in get_versions(getattr(self, "cache_dependencies", ())))
+        digest = hashlib.md5(repr(self.get_filter_signature()).encode("utf-8"), usedforsecurity=False).hexdigest()
+        keys = {name: FACET_KEY.format(facet=name, versions=versions, digest=digest) for name in names}
+        cached = cache.get_many(list(keys.values()))
+
+        limit = getattr(settings, "BOOK_FACETS_LIMIT", 100)
+        facets, missing = {}, {}
+        for name, key in keys.items():
+            if key in cached:
+                facets[name] = cached[key]
+                continue
+            # Shared by every reader of these filters, so counted on the primary.
+            with read_from_primary():
+                facets[name] = missing[key] = self.facets[name].count(queryset, limit)
+        if missing:
+            cache.set_many(missing, timeout=getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+        return facets
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Kept for `list`, so the facets reuse the filters and search already run.
+        self.filtered_queryset = queryset
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # Reject unknown facets before running the list queries.
+        self.get_requested_facets()
+        response = super().list(request, *args, **kwargs)
+        queryset = getattr(self, "filtered_queryset", None)
+        if queryset is not None and isinstance(response.data, dict):
+            facets = self.get_facets(queryset)
+            if facets is not None:
+                response.data["facets"] = facets
+        return response
@@ -0,0 +1,237 @@
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+
+class NotCompilable(Exception):
+    """
+    Raised when a serializer uses a field the fast path cannot reproduce.
+    """
+
+
+class FieldPlan:
+    """
+    Precompiled rendering plan turning `.values()` rows into serializer output.
+
+    A plan is compiled once from a serializer instance. Each entry maps an output
+    key to the `values()` lookup it is read from and an optional converter that
+    reproduces the DRF field's `to_representation`. Nested model serializers
+    become nested plans over prefixed lookups, so a whole list is rendered from one
+    joined `values()` query without building model instances or serializer fields.
+
+    Attributes:
+        lookups (list): Every `values()` lookup needed by the plan, nested ones included.
+    """
+
+    def __init__(self, serializer, prefix=""):
+        model = serializer.Meta.model
+        self.pk_lookup = prefix + model._meta.pk.name
+        self.entries = []
+        self.lookups = [self.pk_lookup]
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ModelSerializer):
+                nested = FieldPlan(field, prefix=f"{prefix}{field.source}__")
+                self.entries.append((name, None, None, nested))
+                self.lookups += nested.lookups
+            else:
+                lookups, convert = self.compile_field(serializer, model, field, prefix)
+                self.entries.append((name, lookups, convert, None))
+                self.lookups += lookups
+        self.lookups = list(dict.fromkeys(self.lookups))
+
+    @staticmethod
+    def compile_field(serializer, model, field, prefix):
+        """
+        Return the lookups and converter reproducing one serializer field.
+
+        Raises:
+            NotCompilable: If the field type or source is not supported.
+        """
+        source = field.source
+        if isinstance(field, serializers.ReadOnlyField):
+            prop = getattr(model, source, None)
+            dependencies = getattr(serializer, "field_dependencies", {}).get(field.field_name)
+            if isinstance(prop, property) and dependencies:
+                # Evaluate the model property itself, so the output cannot drift from it.
+                lookups = [prefix + column for column in dependencies]
+
+                def compute(values, fget=prop.fget, names=dependencies):
+                    return fget(SimpleNamespace(**dict(zip(names, values))))
+
+                return lookups, compute
+
+        if source in getattr(serializer, "annotated_fields", ()):
+            # Computed by the database under the field's name, already in its output type.
+            return [prefix + source], None
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise NotCompilable(f"{serializer.__class__.__name__}.{field.field_name}")
+        if not model_field.concrete or model_field.many_to_many:
+            raise NotCompilable(f"{serializer.__class__.__name__}.{field.field_name}")
+
+        lookups = [prefix + model_field.attname]
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return lookups, None
+        if isinstance(field, serializers.DateTimeField):
+            return lookups, field.to_representation
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+            if output_format is None:
+                return lookups, None
+            if output_format.lower() == ISO_8601:
+                return lookups, lambda value: value.isoformat()
+            return lookups, lambda value: value.strftime(output_format)
+        if isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.BooleanField)):
+            # Values come from columns of the same type, so DRF's str()/int() is a no-op.
+            return lookups, None
+        raise NotCompilable(f"{serializer.__class__.__name__}.{field.field_name}")
+
+    def render(self, row):
+        """
+        Render one `values()` row.
+
+        Args:
+            row (dict): The row, keyed by lookup.
+
+        Returns:
+            dict | None: The serialized object, or None for a missing related object.
+        """
+        if row[self.pk_lookup] is None:
+            return None
+        data = {}
+        for name, lookups, convert, nested in self.entries:
+            if nested is not None:
+                data[name] = nested.render(row)
+            elif len(lookups) > 1:
+                data[name] = convert([row[lookup] for lookup in lookups])
+            else:
+                value = row[lookups[0]]
+                data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def render_many(self, rows):
+        """
+        Render a list of `values()` rows.
+
+        Args:
+            rows (Iterable[dict]): The rows.
+
+        Returns:
+            list: The serialized objects.
+        """
+        render = self.render
+        return [render(row) for row in rows]
+
+
+# Compiled plans keyed by serializer class and rendered shape, least recently used first.
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+# Plans kept in `_plans`; each distinct `?fields=`/`?expand=` shape compiles one.
+PLAN_CACHE_SIZE = 256
+
+
+def get_field_shape(serializer):
+    """
+    Return a hashable description of the fields a serializer renders.
+
+    Two selections naming the same fields in another order or repeating them, or
+    expanding relations they do not select, render the same shape.
+
+    Args:
+        serializer (Serializer): The serializer, with its selection applied.
+
+    Returns:
+        tuple: `(name, shape)` pairs, where the shape of a nested serializer is its
+            own field shape and that of any other field its class.
+    """
+    return tuple(
+        (name, get_field_shape(field) if isinstance(field, serializers.ModelSerializer) else type(field))
+        for name, field in serializer.fields.items()
+        if not field.write_only
+    )
+
+
+def get_field_plan(serializer_class, selection, build_serializer):
+    """
+    Return the compiled plan of a serializer, compiling it on first use.
+
+    With a selection the serializer is built first, which validates the selection
+    and keys the plan on the fields it actually renders, so client input never
+    adds more than one plan per shape. At most `PLAN_CACHE_SIZE` plans are kept.
+
+    Args:
+        serializer_class (type): The serializer class.
+        selection (tuple | None): The `?fields=`/`?expand=` selection, if any.
+        build_serializer (callable): Returns a serializer instance to compile from.
+
+    Raises:
+        ValidationError: If the selection names fields the serializer cannot render.
+
+    Returns:
+        FieldPlan | None: The plan, or None if the serializer cannot be compiled.
+    """
+    serializer = build_serializer() if selection is not None else None
+    key = (serializer_class, get_field_shape(serializer) if serializer is not None else None)
+    with _plans_lock:
+        if key in _plans:
+            _plans.move_to_end(key)
+            return _plans[key]
+    try:
+        plan = FieldPlan(serializer or build_serializer())
+    except NotCompilable:
+        plan = None
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+class FastPathListMixin:
+    """
+    Viewset mixin rendering `list` responses from `.values()` rows with a `FieldPlan`.
+
+    The output is identical to the viewset's serializer, but no model instances or
+    serializer fields are built per row. Serializers the plan cannot reproduce fall
+    back to the regular `list`. The `FAST_PATH_LIST_ENABLED` setting switches the
+    fast path off.
+    """
+
+    def get_field_plan(self):
+        """
+        Return the fast path plan for this request.
+
+        Returns:
+            FieldPlan | None: The plan, or None to use the regular `list`.
+        """
+        if not getattr(settings, "FAST_PATH_LIST_ENABLED", True):
+            return None
+        get_selection = getattr(self, "get_field_selection", None)
+        selection = get_selection() if get_selection else None
+        return get_field_plan(self.get_serializer_class(), selection, self.get_serializer)
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_field_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # Ordering columns are read by keyset pagination even when they are not rendered.
+        ordering = list(getattr(self, "ordering_fields", None) or []) + list(getattr(self, "ordering", None) or [])
+        extra = [term.lstrip("-") for term in ordering if isinstance(term, str)]
+        rows = self.filter_queryset(self.get_queryset()).values(*dict.fromkeys(plan.lookups + extra))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render_many(page))
+        return Response(plan.render_many(rows))
@@ -0,0 +1,79 @@
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+
+from .models import Authors, Books
+from .search import get_search_backend
+
+
+class OwnedFilterSet(django_filters.FilterSet):
+    """
+    Filter set base adding `?mine=`, for models with a `created_by` owner.
+
+    `?mine=true` keeps the rows created by the requesting user and `?mine=false`
+    the others. Anonymous users own nothing, so `?mine=true` matches no rows.
+    """
+    mine = django_filters.BooleanFilter(method="filter_mine")
+
+    def filter_mine(self, queryset, name, value):
+        user = getattr(self.request, "user", None)
+        if not user or not user.is_authenticated:
+            return queryset.none() if value else queryset
+        if value:
+            return queryset.filter(created_by_id=user.pk)
+        return queryset.exclude(created_by_id=user.pk)
+
+
+class BookFilterSet(OwnedFilterSet):
+    """
+    Exact-match filters for books.
+
+    Shared by `BookViewSet` and the catalog export so both accept the same
+    `?genre=`, `?author=`, `?language=` and `?mine=` parameters.
+    """
+
+    class Meta:
+        model = Books
+        fields = ["genre", "author", "language"]
+
+
+class AuthorFilterSet(OwnedFilterSet):
+    """
+    Filters for authors: `?mine=` only.
+    """
+
+    class Meta:
+        model = Authors
+        fields = []
+
+
+class BookSearchFilter(filters.SearchFilter):
+    """
+    Search filter delegating `?search=` to the configured book search backend.
+
+    It replaces the `icontains` clauses of `SearchFilter` with an indexed, ranked
+    search. Matching rows are annotated with `search_rank`, which
+    `RankedOrderingFilter` uses as the default ordering.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").replace("\x00", "").strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter that sorts search results by relevance by default.
+
+    An explicit `?ordering=` still wins. Without one, searched querysets are
+    ordered by `search_rank` first and the view's default ordering second.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param):
+            return ordering
+        if "search_rank" in queryset.query.annotations:
+            return ["-search_rank", *(ordering or [])]
+        return ordering
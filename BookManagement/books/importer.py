@@ -0,0 +1,357 @@
+import csv
+import io
+import json
+import os
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils.dateparse import parse_date
+
+from .bulk import books_written_in_bulk
+from .cache import bump_version
+from .models import Authors, Books, Generes
+
+
+# Columns read from every input row, in staging table order. They match the
+# column names written by the catalog export, so an export can be re-imported.
+IMPORT_COLUMNS = (
+    "title",
+    "subtitle",
+    "book_url",
+    "language",
+    "description",
+    "publication_date",
+    "thumbnail",
+    "author_first_name",
+    "author_last_name",
+    "genre_name",
+)
+
+REQUIRED_COLUMNS = ("title", "author_first_name", "author_last_name", "genre_name")
+
+
+class RowError(ValueError):
+    """
+    Raised when an input row cannot be imported.
+    """
+
+
+def read_rows(path, input_format):
+    """
+    Stream raw rows from a CSV or JSON Lines file.
+
+    Args:
+        path (str): The input file path.
+        input_format (str): Either `csv` or `jsonl`.
+
+    Yields:
+        dict: One mapping of column name to raw value per input row.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if input_format == "csv":
+            yield from csv.DictReader(handle)
+            return
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _max_length(model, field_name):
+    return model._meta.get_field(field_name).max_length
+
+
+FIELD_LIMITS = {
+    "title": _max_length(Books, "title"),
+    "subtitle": _max_length(Books, "subtitle"),
+    "book_url": _max_length(Books, "book_url"),
+    "language": _max_length(Books, "language"),
+    "thumbnail": _max_length(Books, "thumbnail"),
+    "author_first_name": _max_length(Authors, "first_name"),
+    "author_last_name": _max_length(Authors, "last_name"),
+    "genre_name": _max_length(Generes, "name"),
+}
+
+
+def clean_row(raw):
+    """
+    Validate and normalize a raw input row.
+
+    Args:
+        raw (dict): The raw row.
+
+    Raises:
+        RowError: If a required column is missing or a value is invalid.
+
+    Returns:
+        tuple: The row values in `IMPORT_COLUMNS` order.
+    """
+    if not isinstance(raw, dict):
+        raise RowError("Expected an object.")
+
+    values = {}
+    for column in IMPORT_COLUMNS:
+        value = raw.get(column)
+        value = None if value is None else str(value).strip() or None
+        limit = FIELD_LIMITS.get(column)
+        if value is not None and limit and len(value) > limit:
+            raise RowError(f"{column} is longer than {limit} characters.")
+        values[column] = value
+
+    for column in REQUIRED_COLUMNS:
+        if values[column] is None:
+            raise RowError(f"{column} is required.")
+
+    if values["language"] is None:
+        values["language"] = Books._meta.get_field("language").default
+    if values["publication_date"] is not None:
+        try:
+            parsed = parse_date(values["publication_date"])
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise RowError("publication_date must be a YYYY-MM-DD date.")
+        values["publication_date"] = parsed
+
+    return tuple(values[column] for column in IMPORT_COLUMNS)
+
+
+class CatalogImporter:
+    """
+    Batched importer for books together with their authors and genres.
+
+    Authors (matched on the `unique_author_full_name` pair) and genres are upserted
+    once per batch instead of one `get_or_create` per row. On PostgreSQL every batch
+    is sent with `COPY` into a temporary staging table and moved into the catalog
+    tables with three set-based `INSERT ... SELECT` statements. On other databases
+    the same work is done with `bulk_create`.
+
+    Attributes:
+        created_by (User): The user recorded as creator of new books and authors.
+        batch_size (int): Number of rows written per batch (and per transaction).
+        use_copy (bool): Whether the PostgreSQL `COPY` path is used.
+    """
+
+    def __init__(self, created_by, batch_size=5000, use_copy=None):
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.using = router.db_for_write(Books)
+        self.connection = connections[self.using]
+        if use_copy is None:
+            use_copy = self.connection.vendor == "postgresql"
+        self.use_copy = use_copy
+        self._authors = {}
+        self._genres = {}
+        self._staging_ready = False
+
+    def import_batch(self, rows):
+        """
+        Write one batch of cleaned rows in a single transaction.
+
+        Args:
+            rows (list): Cleaned rows from `clean_row`.
+
+        Returns:
+            int: The number of books inserted.
+        """
+        if not rows:
+            return 0
+        with transaction.atomic(using=self.using):
+            if self.use_copy:
+                return self._import_batch_copy(rows)
+            return self._import_batch_orm(rows)
+
+    def finish(self):
+        """
+        Invalidate the catalog caches once the import is done.
+
+        Bulk writes send no signals, so this replaces the per-row `post_save` work.
+        """
+        for model in (Books, Authors, Generes):
+            bump_version(model)
+
+    def _import_batch_orm(self, rows):
+        genre_ids = self._resolve_genres({row[9] for row in rows})
+        author_ids = self._resolve_authors({(row[7], row[8]) for row in rows})
+        books = [
+            Books(
+                created_by=self.created_by,
+                title=row[0],
+                subtitle=row[1],
+                book_url=row[2],
+                language=row[3],
+                description=row[4],
+                publication_date=row[5],
+                thumbnail=row[6],
+                author_id=author_ids[(row[7], row[8])],
+                genre_id=genre_ids[row[9]],
+            )
+            for row in rows
+        ]
+        Books.objects.using(self.using).bulk_create(books, batch_size=1000)
+        pks = [book.pk for book in books]
+        transaction.on_commit(lambda: books_written_in_bulk(pks), using=self.using)
+        return len(books)
+
+    def _resolve_genres(self, names):
+        missing = [name for name in names if name not in self._genres]
+        if missing:
+            manager = Generes.objects.using(self.using)
+            found = dict(manager.filter(name__in=missing).values_list("name", "id"))
+            new = [Generes(name=name) for name in missing if name not in found]
+            if new:
+                manager.bulk_create(new, ignore_conflicts=True)
+                found.update(manager.filter(name__in=[g.name for g in new]).values_list("name", "id"))
+            self._genres.update(found)
+        return self._genres
+
+    def _resolve_authors(self, pairs):
+        missing = [pair for pair in pairs if pair not in self._authors]
+        if missing:
+            manager = Authors.objects.using(self.using)
+            found = self._fetch_authors(manager, missing)
+            new = [
+                Authors(first_name=first, last_name=last, created_by=self.created_by)
+                for first, last in missing
+                if (first, last) not in found
+            ]
+            if new:
+                manager.bulk_create(new, ignore_conflicts=True)
+                found.update(self._fetch_authors(manager, [(a.first_name, a.last_name) for a in new]))
+            self._authors.update(found)
+        return self._authors
+
+    @staticmethod
+    def _fetch_authors(manager, pairs):
+        wanted = set(pairs)
+        rows = manager.filter(
+            first_name__in={first for first, _ in pairs},
+            last_name__in={last for _, last in pairs},
+        ).values_list("first_name", "last_name", "id")
+        return {(first, last): pk for first, last, pk in rows if (first, last) in wanted}
+
+    def _import_batch_copy(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+
+        config = getattr(settings, "BOOK_SEARCH_CONFIG", "simple")
+        with self.connection.cursor() as cursor:
+            self._ensure_staging_table(cursor)
+            copy_sql = (
+                f"COPY import_books_staging ({', '.join(IMPORT_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)"
+            )
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(copy_sql, buffer)
+            else:
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+
+            cursor.execute(
+                """
+                INSERT INTO books_generes (name)
+                SELECT DISTINCT genre_name FROM import_books_staging
+                ON CONFLICT (name) DO NOTHING
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO books_authors (first_name, last_name, created_by_id)
+                SELECT DISTINCT author_first_name, author_last_name, %s FROM import_books_staging
+                ON CONFLICT ON CONSTRAINT unique_author_full_name DO NOTHING
+                """,
+                [self.created_by.pk],
+            )
+            cursor.execute(
+                """
+                INSERT INTO books_books (
+                    created_by_id, title, subtitle, book_url, author_id, genre_id, language,
+                    description, publication_date, thumbnail, created_at, updated_at, search_vector
+                )
+                SELECT
+                    %s, s.title, s.subtitle, s.book_url, a.id, g.id, s.language,
+                    s.description, s.publication_date, s.thumbnail, now(), now(),
+                    setweight(to_tsvector(%s::regconfig, coalesce(s.title, '')), 'A')
+                    || setweight(to_tsvector(%s::regconfig, coalesce(s.subtitle, '')), 'B')
+                    || setweight(to_tsvector(%s::regconfig, a.first_name || ' ' || a.last_name), 'B')
+                FROM import_books_staging AS s
+                JOIN books_authors AS a
+                    ON a.first_name = s.author_first_name AND a.last_name = s.author_last_name
+                JOIN books_generes AS g ON g.name = s.genre_name
+                """,
+                [self.created_by.pk, config, config, config],
+            )
+            return cursor.rowcount
+
+    def _ensure_staging_table(self, cursor):
+        if self._staging_ready:
+            return
+        # Rows are dropped at the end of every batch transaction.
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE IF NOT EXISTS import_books_staging (
+                title text, subtitle text, book_url text, language text, description text,
+                publication_date date, thumbnail text,
+                author_first_name text, author_last_name text, genre_name text
+            ) ON COMMIT DELETE ROWS
+            """
+        )
+        self._staging_ready = True
+
+
+class ImportCheckpoint:
+    """
+    Progress file allowing an interrupted import to resume after the last committed batch.
+
+    The file records how many input rows have been consumed, together with the
+    size and modification time of the input so a checkpoint is never applied to a
+    different file.
+
+    Attributes:
+        path (str): Location of the checkpoint file.
+    """
+
+    def __init__(self, path, input_path):
+        self.path = path
+        stat = os.stat(input_path)
+        self.fingerprint = {"input": os.path.abspath(input_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def load(self):
+        """
+        Return the number of input rows already imported.
+
+        Raises:
+            ValueError: If the checkpoint belongs to a different input file.
+
+        Returns:
+            int: The number of rows to skip.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as handle:
+            state = json.load(handle)
+        if state.get("fingerprint") != self.fingerprint:
+            raise ValueError(f"Checkpoint {self.path} was written for a different input file.")
+        return state["rows_done"]
+
+    def save(self, rows_done):
+        """
+        Atomically record the number of input rows consumed so far.
+
+        Args:
+            rows_done (int): Rows consumed, including skipped invalid rows.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"fingerprint": self.fingerprint, "rows_done": rows_done}, handle)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """
+        Remove the checkpoint after a completed import.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,190 @@
+import json
+from itertools import product
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from books.models import ReadingLists
+from books.views import BookViewSet, ReadingListViewSet
+
+
+class StatementRecorder:
+    """
+    Execute wrapper keeping the SQL and parameters of every `SELECT` run by a request.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            self.statements.append((context["connection"].alias, sql, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """
+    Run `EXPLAIN` on the list queries of the catalog viewsets and flag costly plans.
+
+    Every combination of exact-match filter (or none), ordering and pagination
+    style of `BookViewSet` and `ReadingListViewSet` is requested in-process. Filters
+    use the most common value in the table, which is the worst case for an index.
+    Each `SELECT` the request runs is explained. Sequential scans and sorts over
+    more than `--rows` rows are reported.
+
+    On PostgreSQL the row estimates come from the planner. On SQLite, which has no
+    estimates, a full scan is measured by the size of the scanned table.
+    """
+    help = "EXPLAIN the catalog list queries and flag sequential scans and sorts over a row threshold."
+
+    viewsets = (("books", BookViewSet), ("reading-list", ReadingListViewSet))
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Row threshold for flagging a plan node.")
+        parser.add_argument("--user", help="Email of the user whose reading list is audited.")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only flagged ones.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when a plan is flagged.")
+
+    def handle(self, *args, **options):
+        self.threshold = options["rows"]
+        self.table_sizes = {}
+        user = self.get_user(options["user"])
+        factory = APIRequestFactory()
+
+        flagged = 0
+        for basename, viewset in self.viewsets:
+            view = viewset.as_view({"get": "list"})
+            for params in self.get_combinations(viewset, user):
+                request = factory.get(f"/api/v1/{basename}/", params)
+                force_authenticate(request, user=user)
+                recorder = StatementRecorder()
+                with connections["default"].execute_wrapper(recorder):
+                    response = view(request)
+                label = f"{basename} ?{request.META['QUERY_STRING']}"
+                if response.status_code != 200:
+                    self.stderr.write(f"{label}: HTTP {response.status_code}, skipped")
+                    continue
+                for alias, sql, sql_params in recorder.statements:
+                    problems, plan = self.explain(alias, sql, sql_params)
+                    if not options["verbose_plans"] and len(sql) > 160:
+                        sql = f"{sql[:160]}..."
+                    if problems:
+                        flagged += 1
+                        self.stdout.write(self.style.WARNING(f"{label}\n  {sql}"))
+                        for problem in problems:
+                            self.stdout.write(f"  - {problem}")
+                    elif options["verbose_plans"]:
+                        self.stdout.write(f"{label}\n  {sql}\n  ok")
+                    if options["verbose_plans"]:
+                        self.stdout.write(plan)
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{flagged} queries with flagged plans.")
+        self.stdout.write(self.style.SUCCESS(f"Audit finished, {flagged} queries flagged."))
+
+    def get_user(self, email):
+        User = get_user_model()
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f"User {email!r} does not exist.")
+        # The user with the longest reading list exercises the reading list indexes most.
+        top = (
+            ReadingLists.objects.values("user_id")
+            .annotate(entries=Count("pk"))
+            .order_by("-entries")
+            .first()
+        )
+        user = User.objects.filter(pk=top["user_id"]).first() if top else User.objects.first()
+        if user is None:
+            raise CommandError("No users exist; create one or pass --user.")
+        return user
+
+    def get_combinations(self, viewset, user):
+        """
+        Yield the query parameters of every filter, ordering and pagination combination.
+        """
+        queryset = viewset.queryset
+        if queryset is None:
+            queryset = ReadingLists.objects.filter(user=user)
+        filterset_class = getattr(viewset, "filterset_class", None)
+        filter_fields = filterset_class._meta.fields if filterset_class else viewset.filterset_fields
+
+        filters = [{}]
+        for field in filter_fields or []:
+            common = queryset.values(field).annotate(n=Count("pk")).order_by("-n").first()
+            if common and common[field] is not None:
+                filters.append({field: common[field]})
+
+        orderings = [None]
+        for field in viewset.ordering_fields or []:
+            orderings += [field, f"-{field}"]
+
+        for filters_, ordering, pagination in product(filters, orderings, (None, "cursor")):
+            params = dict(filters_)
+            if ordering:
+                params["ordering"] = ordering
+            if pagination:
+                params["pagination"] = pagination
+            yield params
+
+    def explain(self, alias, sql, params):
+        """
+        Explain one statement and return the flagged plan nodes and the printable plan.
+        """
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return self.check_postgresql(plan[0]["Plan"]), json.dumps(plan, indent=2)
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                rows = cursor.fetchall()
+                return self.check_sqlite(connection, rows), "\n".join(f"  {row[-1]}" for row in rows)
+        raise CommandError(f"EXPLAIN is not supported for {connection.vendor}.")
+
+    def check_postgresql(self, node):
+        problems = []
+        rows = node.get("Plan Rows", 0)
+        if node["Node Type"] == "Seq Scan" and rows >= self.threshold:
+            problems.append(f"Seq Scan on {node.get('Relation Name')} (~{rows} rows)")
+        if node["Node Type"] in ("Sort", "Incremental Sort") and rows >= self.threshold:
+            problems.append(f"{node['Node Type']} on {', '.join(node.get('Sort Key', []))} (~{rows} rows)")
+        for child in node.get("Plans", []):
+            problems += self.check_postgresql(child)
+        return problems
+
+    def check_sqlite(self, connection, rows):
+        problems = []
+        largest = 0
+        for row in rows:
+            detail = row[-1]
+            if not detail.startswith(("SCAN ", "SEARCH ")):
+                continue
+            size = self.get_table_size(connection, detail.split()[1])
+            largest = max(largest, size)
+            if detail.startswith("SCAN ") and " INDEX " not in detail and size >= self.threshold:
+                problems.append(f"{detail} ({size} rows)")
+        # SQLite reports sorts without a row count; judge them by the largest table read.
+        for row in rows:
+            if row[-1].startswith("USE TEMP B-TREE") and largest >= self.threshold:
+                problems.append(f"{row[-1]} (table of {largest} rows)")
+        return problems
+
+    def get_table_size(self, connection, table):
+        if table not in self.table_sizes:
+            size = 0
+            # Subqueries are reported under their alias, which is not a table.
+            if table in connection.introspection.table_names():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+                    size = cursor.fetchone()[0]
+            self.table_sizes[table] = size
+        return self.table_sizes[table]
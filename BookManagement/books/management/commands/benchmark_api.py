@@ -0,0 +1,162 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from books.benchmark import (
+    BenchmarkFixtures,
+    HTTPTransport,
+    InProcessTransport,
+    build_scenarios,
+    compare_to_baseline,
+    run_scenario,
+    select_scenarios,
+)
+from books.seeding import DatasetSeeder
+
+
+class Command(BaseCommand):
+    """
+    Load test every API route and report throughput, latency percentiles and queries.
+
+    Requests are sent from `--concurrency` threads, either in-process through
+    Django's test client (the default, which also counts SQL queries per request)
+    or to a running server given with `--url`. The server must use the same
+    database as this command, which creates the benchmark users and rows and
+    deletes them afterwards. `--seed` first writes a synthetic catalog with
+    `books.seeding`, so runs on fresh databases are comparable.
+
+    `--save-baseline` writes the results to a JSON file; `--baseline` compares
+    the run against one and fails when a scenario regresses past `--threshold`,
+    so CI can gate on it.
+
+    Rate throttling (see BookManagement.throttling) is switched off in-process
+    unless `--throttle` is given; start a server benchmarked with `--url` with
+    `THROTTLE_ENABLED=False`.
+    """
+    help = "Benchmark the API routes under concurrency and compare against a saved baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Base URL of a running server; in-process when omitted.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Threads sending requests.")
+        parser.add_argument("--requests", type=int, default=100, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario.")
+        parser.add_argument(
+            "--scenario", action="append", dest="scenarios",
+            help="Only run scenarios matching this pattern, e.g. 'books.*'. May be repeated.",
+        )
+        parser.add_argument("--list", action="store_true", help="List the scenarios and exit.")
+        parser.add_argument("--throttle", action="store_true", help="Keep rate throttling on in-process.")
+        parser.add_argument("--seed", action="store_true", help="Replace the synthetic catalog before the run.")
+        parser.add_argument("--seed-books", type=int, default=5000)
+        parser.add_argument("--seed-authors", type=int, default=500)
+        parser.add_argument("--seed-users", type=int, default=50)
+        parser.add_argument("--seed-value", type=int, default=0, help="Random seed of the synthetic catalog.")
+        parser.add_argument("--save-baseline", help="Write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare the results against this JSON file.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Allowed relative p95/throughput change against the baseline (default 0.2).",
+        )
+        parser.add_argument(
+            "--min-delta-ms", type=float, default=1.0,
+            help="Ignore p95 increases smaller than this many milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = select_scenarios(build_scenarios(), options["scenarios"])
+        if options["list"]:
+            for scenario in scenarios:
+                self.stdout.write(f"{scenario.name:<30} {scenario.method:<6} auth={scenario.auth}")
+            return
+        if not scenarios:
+            raise CommandError("No scenario matches the given patterns.")
+
+        if options["seed"]:
+            DatasetSeeder.clear()
+            counts = DatasetSeeder(
+                users=options["seed_users"],
+                authors=options["seed_authors"],
+                books=options["seed_books"],
+                seed=options["seed_value"],
+            ).run()
+            self.stdout.write("Seeded " + ", ".join(f"{count} {label}" for label, count in counts.items()))
+
+        # Only applies in-process; the settings of a server given with --url are its own.
+        with override_settings(THROTTLE_ENABLED=options["throttle"]):
+            results = self.run_scenarios(scenarios, options)
+
+        errors = {name: summary for name, summary in results.items() if summary["errors"]}
+        for name, summary in errors.items():
+            self.stdout.write(self.style.ERROR(f"{name}: {summary['errors']} errors, e.g. {summary['sample_error']}"))
+
+        if options["save_baseline"]:
+            self.save_baseline(options["save_baseline"], results, options)
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = compare_to_baseline(
+                results, baseline["scenarios"], options["threshold"], options["min_delta_ms"]
+            )
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {message}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
+        if errors:
+            raise CommandError(f"{len(errors)} scenarios returned unexpected status codes.")
+
+    def run_scenarios(self, scenarios, options):
+        transport = HTTPTransport(options["url"]) if options["url"] else InProcessTransport()
+        fixtures = BenchmarkFixtures()
+        try:
+            fixtures.setup()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<30} {'reqs':>5} {'errs':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>8}"
+        )
+        try:
+            for scenario in scenarios:
+                summary = run_scenario(
+                    transport, scenario, fixtures, options["requests"], options["concurrency"], options["warmup"]
+                )
+                results[scenario.name] = summary
+                self.write_summary(scenario.name, summary)
+        finally:
+            fixtures.teardown()
+        return results
+
+    def write_summary(self, name, summary):
+        def number(value, digits):
+            return "-" if value is None else f"{value:.{digits}f}"
+
+        self.stdout.write(
+            f"{name:<30} {summary['requests']:>5} {summary['errors']:>5} {number(summary['throughput'], 1):>9} "
+            f"{number(summary['p50'], 2):>8} {number(summary['p95'], 2):>8} {number(summary['p99'], 2):>8} "
+            f"{number(summary['queries'], 1):>8}"
+        )
+
+    def save_baseline(self, path, results, options):
+        data = {
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "mode": "http" if options["url"] else "in-process",
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+            },
+            "scenarios": {
+                name: {key: value for key, value in summary.items() if key != "sample_error"}
+                for name, summary in results.items()
+            },
+        }
+        Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+        self.stdout.write(f"Baseline written to {path}.")
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from books.fastpath import FieldPlan
+from books.models import Books
+from books.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the fast path list renderer against the serializers.
+
+    The same `--rows` books are rendered with `BookSerializer` and with the
+    compiled plan, and rows per second are reported both for rendering alone and
+    including the database fetch. Output parity is covered by the test suite
+    (`books.tests.FastPathParityTests`).
+    """
+    help = "Benchmark fast path list rendering against the serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Number of books rendered per benchmark round.")
+        parser.add_argument("--repeat", type=int, default=5, help="Benchmark rounds; the best round is reported.")
+
+    def handle(self, *args, **options):
+        self.benchmark(options["rows"], options["repeat"])
+
+    def benchmark(self, rows, repeat):
+        queryset = Books.objects.select_related("author", "genre").defer("search_vector").order_by("pk")[:rows]
+        plan = FieldPlan(BookSerializer())
+        values = Books.objects.order_by("pk").values(*plan.lookups)[:rows]
+        renderer = JSONRenderer()
+
+        instances = list(queryset)
+        value_rows = list(values)
+        if not instances:
+            raise CommandError("No books to benchmark; import or seed some first.")
+        count = len(instances)
+
+        results = {
+            "serializer, render only": lambda: renderer.render(BookSerializer(instances, many=True).data),
+            "fast path, render only": lambda: renderer.render(plan.render_many(value_rows)),
+            "serializer, fetch + render": lambda: renderer.render(BookSerializer(list(queryset.all()), many=True).data),
+            "fast path, fetch + render": lambda: renderer.render(plan.render_many(list(values.all()))),
+        }
+        self.stdout.write(f"\n{count} books, best of {repeat} rounds:")
+        for label, func in results.items():
+            best = min(self.time_call(func) for _ in range(repeat))
+            self.stdout.write(f"  {label:<28} {count / best:>12,.0f} rows/s")
+
+    @staticmethod
+    def time_call(func):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
@@ -0,0 +1,76 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from BookManagement.renderers import ORJSONParser, ORJSONRenderer, orjson
+from books.models import Books
+from books.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the orjson renderer and parser against DRF's stdlib JSON classes.
+
+    Book pages are built from real rows with `BookSerializer`, repeated up to each
+    page size, with descriptions padded to `--description-length` characters to
+    model long descriptions. Before timing, the two renderers' outputs are
+    compared byte for byte.
+    """
+    help = "Benchmark JSON rendering and parsing of book pages across page sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", default="10,100,500,1000", help="Comma separated page sizes.")
+        parser.add_argument("--description-length", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=20, help="Rounds per measurement; the best is reported.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; ORJSONRenderer falls back to JSONRenderer.")
+
+        sizes = [int(size) for size in options["page_sizes"].split(",")]
+        books = list(Books.objects.select_related("author", "genre").defer("search_vector")[: max(sizes)])
+        if not books:
+            raise CommandError("No books to benchmark; import or seed some first.")
+        items = BookSerializer(books, many=True).data
+        padding = "Lorem ipsum dolor sit amet — ünïcödé. " * (options["description_length"] // 38 + 1)
+        for item in items:
+            item["description"] = ((item["description"] or "") + padding)[: options["description_length"]]
+
+        stdlib, fast = JSONRenderer(), ORJSONRenderer()
+        self.stdout.write(f"{'page size':>9} {'bytes':>10} {'render json':>13} {'render orjson':>14} "
+                          f"{'parse json':>12} {'parse orjson':>13}")
+        for size in sizes:
+            page = {
+                "count": size,
+                "next": None,
+                "previous": None,
+                "results": [items[i % len(items)] for i in range(size)],
+            }
+            body = stdlib.render(page)
+            if fast.render(page) != body:
+                raise CommandError(f"Renderer output differs for a page of {size} books.")
+
+            timings = [
+                self.best(lambda: stdlib.render(page), options["repeat"]),
+                self.best(lambda: fast.render(page), options["repeat"]),
+                self.best(lambda: JSONParser().parse(io.BytesIO(body)), options["repeat"]),
+                self.best(lambda: ORJSONParser().parse(io.BytesIO(body)), options["repeat"]),
+            ]
+            self.stdout.write(
+                f"{size:>9} {len(body):>10} " + " ".join(
+                    f"{seconds * 1000:>{width - 3}.2f} ms"
+                    for seconds, width in zip(timings, (13, 14, 12, 13))
+                )
+            )
+
+    @staticmethod
+    def best(func, repeat):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return min(times)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from books.cache import CachedResponseMixin, bump_version, get_cache_stats
+from books.models import Authors, Books, Generes
+
+
+class Command(BaseCommand):
+    """
+    Report hit/miss statistics of the catalog response cache, or invalidate it.
+
+    The statistics live in Django's cache, so they cover every worker process
+    when a shared cache backend (file-based, Redis, Memcached) is configured.
+    """
+    help = "Show catalog response cache statistics, or invalidate the cached responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--invalidate",
+            action="store_true",
+            help="Bump the version of every catalog model, dropping all cached responses.",
+        )
+
+    def handle(self, *args, **options):
+        if options["invalidate"]:
+            for model in (Books, Authors, Generes):
+                bump_version(model)
+            self.stdout.write(self.style.SUCCESS("Catalog response cache invalidated."))
+            return
+
+        labels = [
+            f"{basename}.{action}"
+            for basename in ("books", "authors", "genres")
+            for action in CachedResponseMixin.cached_actions
+        ]
+        for label, stats in get_cache_stats(labels).items():
+            self.stdout.write(
+                f"{label:<20} hits={stats['hits']:<8} misses={stats['misses']:<8} "
+                f"hit_ratio={stats['hit_ratio']:.1%}"
+            )
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Aggregate the findings written by `QueryDetectorMiddleware`.
+
+    Findings are grouped by route and statement fingerprint. Each group reports
+    how many sampled requests ran the shape repeatedly, the total and largest
+    number of executions per request, the time those executions took and the
+    frames that ran them. Groups are sorted by total executions, so the N+1
+    queries costing the most come first.
+    """
+    help = "Summarize the repeated queries recorded by the query detector, worst first."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default=None,
+            help="Report file; defaults to the QUERY_DETECTOR_REPORT_PATH setting.",
+        )
+        parser.add_argument("--route", help="Only report findings of this route, e.g. 'books-list'.")
+        parser.add_argument("--kind", choices=("n+1", "duplicate"), help="Only report findings of this kind.")
+        parser.add_argument("--limit", type=int, default=20, help="Number of groups to print (default 20).")
+        parser.add_argument("--json", action="store_true", help="Print the groups as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["path"] or getattr(settings, "QUERY_DETECTOR_REPORT_PATH", "")
+        if not path:
+            raise CommandError("No report path given and QUERY_DETECTOR_REPORT_PATH is not set.")
+        if not Path(path).exists():
+            raise CommandError(f"{path} does not exist.")
+
+        groups = {}
+        with open(path, encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                try:
+                    finding = json.loads(line)
+                except ValueError:
+                    self.stderr.write(f"Skipping malformed line {line_number}.")
+                    continue
+                if options["route"] and finding["route"] != options["route"]:
+                    continue
+                if options["kind"] and finding["kind"] != options["kind"]:
+                    continue
+                key = (finding["method"], finding["route"], finding["fingerprint"])
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {
+                        "method": finding["method"],
+                        "route": finding["route"],
+                        "kind": finding["kind"],
+                        "fingerprint": finding["fingerprint"],
+                        "sql": finding["sql"],
+                        "requests": 0,
+                        "executions": 0,
+                        "max_executions": 0,
+                        "duration_ms": 0.0,
+                        "origins": {},
+                        "last_seen": finding["timestamp"],
+                    }
+                group["requests"] += 1
+                group["executions"] += finding["count"]
+                group["max_executions"] = max(group["max_executions"], finding["count"])
+                group["duration_ms"] += finding["duration_ms"]
+                group["origins"][finding["origin"]] = group["origins"].get(finding["origin"], 0) + 1
+                group["last_seen"] = max(group["last_seen"], finding["timestamp"])
+                if finding["kind"] == "n+1":
+                    # A shape repeated with varying parameters in any request is an N+1.
+                    group["kind"] = "n+1"
+
+        ranked = sorted(groups.values(), key=lambda group: group["executions"], reverse=True)[:options["limit"]]
+        if options["json"]:
+            self.stdout.write(json.dumps(ranked, indent=2))
+            return
+        if not ranked:
+            self.stdout.write("No repeated queries recorded.")
+            return
+        for group in ranked:
+            self.stdout.write(self.style.WARNING(
+                f"{group['kind']} {group['method']} {group['route']}: {group['executions']} executions "
+                f"in {group['requests']} requests (max {group['max_executions']}/request, "
+                f"{group['duration_ms']:.1f} ms)"
+            ))
+            self.stdout.write(f"  {group['fingerprint']}")
+            for origin, count in sorted(group["origins"].items(), key=lambda item: item[1], reverse=True):
+                self.stdout.write(f"  from {origin} ({count} requests)")
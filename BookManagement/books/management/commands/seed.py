@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from books.seeding import DatasetSeeder, Distribution
+
+
+class Command(BaseCommand):
+    """
+    Generate a large deterministic synthetic dataset for scaling and load tests.
+
+    Users, authors, books and reading list entries are generated in chunks by
+    parallel worker processes and inserted with `COPY` on PostgreSQL and
+    multi-row `INSERT`s elsewhere (see books.seeding). Every synthetic user shares one
+    password hash, `Seed#Passw0rd`, and an email ending in `@seed.invalid`;
+    `--clear` deletes them together with everything they created.
+    """
+    help = "Generate a deterministic synthetic catalog with users and reading lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--authors", type=int, default=1000)
+        parser.add_argument("--genres", type=int, default=18)
+        parser.add_argument("--books", type=int, default=50000)
+        parser.add_argument(
+            "--reading-lists-per-user", type=int, default=20,
+            help="Mean number of reading list entries per user.",
+        )
+        parser.add_argument(
+            "--author-distribution", default="zipf:1.1",
+            help="How books pick their author: 'uniform' or 'zipf:<exponent>'.",
+        )
+        parser.add_argument("--genre-distribution", default="zipf:0.8", help="How books pick their genre.")
+        parser.add_argument(
+            "--book-distribution", default="zipf:1.1",
+            help="How reading list entries pick their book.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same rows.")
+        parser.add_argument("--chunk-size", type=int, default=20000, help="Rows per chunk and transaction.")
+        parser.add_argument(
+            "--workers", type=int,
+            help="Worker processes. Defaults to the CPU count on PostgreSQL and 1 elsewhere.",
+        )
+        parser.add_argument("--no-copy", action="store_true", help="Use multi-row INSERTs instead of COPY on PostgreSQL.")
+        parser.add_argument("--clear", action="store_true", help="Delete the existing synthetic data first.")
+        parser.add_argument("--clear-only", action="store_true", help="Delete the synthetic data and exit.")
+
+    def handle(self, *args, **options):
+        if options["clear"] or options["clear_only"]:
+            DatasetSeeder.clear()
+            self.stdout.write("Deleted the existing synthetic data.")
+            if options["clear_only"]:
+                return
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        try:
+            seeder = DatasetSeeder(
+                users=options["users"],
+                authors=options["authors"],
+                genres=options["genres"],
+                books=options["books"],
+                reading_lists_per_user=options["reading_lists_per_user"],
+                author_distribution=Distribution.parse(options["author_distribution"]),
+                genre_distribution=Distribution.parse(options["genre_distribution"]),
+                book_distribution=Distribution.parse(options["book_distribution"]),
+                seed=options["seed"],
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                use_copy=False if options["no_copy"] else None,
+            )
+            self.stdout.write(
+                f"Seeding with {seeder.workers} worker(s), {'COPY' if seeder.use_copy else 'INSERT'} statements."
+            )
+            counts = seeder.run(progress=self.report)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded " + ", ".join(f"{count} {table}" for table, count in counts.items()) + "."
+        ))
+
+    def report(self, table, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(f"  {table:<14} {rows:>12,} rows in {seconds:8.1f}s ({rate:,.0f} rows/s)")
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:25
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+SEARCH_INDEXES = [
+    ('authors', django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('first_name', name='gin_trgm_ops'), name='author_first_name_trgm')),
+    ('authors', django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('last_name', name='gin_trgm_ops'), name='author_last_name_trgm')),
+    ('books', django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='book_search_vector_gin')),
+    ('books', django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('title', name='gin_trgm_ops'), name='book_title_trgm')),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN and trigram indexes only exist on PostgreSQL; other databases use the
+    # in-memory search backend and need neither the indexes nor the vectors.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.add_index(apps.get_model('books', model_name), index)
+
+    schema_editor.execute(
+        """
+        UPDATE books_books AS b
+        SET search_vector =
+            setweight(to_tsvector('simple', coalesce(b.title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(b.subtitle, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(a.first_name || ' ' || a.last_name, '')), 'B')
+        FROM books_authors AS a
+        WHERE a.id = b.author_id
+        """
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.remove_index(apps.get_model('books', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_rename_user_books_created_by'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='books',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+    ]
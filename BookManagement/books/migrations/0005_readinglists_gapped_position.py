@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+POSITION_GAP = 1024
+
+
+def spread_positions(apps, schema_editor):
+    """
+    Renumber every reading list to gapped positions, keeping the current order.
+    """
+    ReadingLists = apps.get_model("books", "ReadingLists")
+    db_alias = schema_editor.connection.alias
+    entries = ReadingLists.objects.using(db_alias).order_by("user_id", "position", "-date_added", "pk")
+    batch, user_id, index = [], None, 0
+    for entry in entries.only("pk", "user_id", "position").iterator(chunk_size=2000):
+        if entry.user_id != user_id:
+            user_id, index = entry.user_id, 0
+        index += 1
+        entry.position = index * POSITION_GAP
+        batch.append(entry)
+        if len(batch) >= 2000:
+            ReadingLists.objects.using(db_alias).bulk_update(batch, ["position"])
+            batch = []
+    if batch:
+        ReadingLists.objects.using(db_alias).bulk_update(batch, ["position"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_books_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='readinglists',
+            name='position',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(spread_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_readinglists_gapped_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['genre', '-created_at', '-id'], name='book_genre_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='book_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['language', '-created_at', '-id'], name='book_language_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['-created_at', '-id'], name='book_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['publication_date', 'id'], name='book_pubdate_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='readinglists',
+            index=models.Index(fields=['user', 'position', '-date_added'], name='readinglist_user_pos_idx'),
+        ),
+    ]
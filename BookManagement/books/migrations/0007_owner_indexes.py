@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0006_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='authors',
+            index=models.Index(fields=['created_by', 'first_name', 'last_name'], name='author_created_by_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='books',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='book_created_by_created_idx'),
+        ),
+    ]
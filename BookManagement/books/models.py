@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -29,6 +31,13 @@ class Authors(models.Model):
                 name="unique_author_full_name"
             )
         ]
+        indexes = [
+            # Typo-tolerant author search (PostgreSQL only, see books.search).
+            GinIndex(OpClass("first_name", name="gin_trgm_ops"), name="author_first_name_trgm"),
+            GinIndex(OpClass("last_name", name="gin_trgm_ops"), name="author_last_name_trgm"),
+            # `?mine=true` lists, in the default order.
+            models.Index(fields=["created_by", "first_name", "last_name"], name="author_created_by_name_idx"),
+        ]
 
 class Generes(models.Model):
     """
@@ -61,6 +70,8 @@ class Books(models.Model):
     thumbnail = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title/subtitle/author tsvector, maintained by books.search.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return f"{self.title} by {self.author.full_name}"
@@ -68,6 +79,22 @@ class Books(models.Model):
     class Meta:
         ordering = ["-created_at"]
         verbose_name_plural = "Books"
+        indexes = [
+            # Full-text and typo-tolerant title search (PostgreSQL only, see books.search).
+            GinIndex(fields=["search_vector"], name="book_search_vector_gin"),
+            GinIndex(OpClass("title", name="gin_trgm_ops"), name="book_title_trgm"),
+            # Filtered catalog pages in the default (newest first) order, with the primary key
+            # as the keyset pagination tiebreaker. Other orderings of a filtered page sort
+            # the (usually small) filtered set.
+            models.Index(fields=["genre", "-created_at", "-id"], name="book_genre_created_idx"),
+            models.Index(fields=["author", "-created_at", "-id"], name="book_author_created_idx"),
+            models.Index(fields=["language", "-created_at", "-id"], name="book_language_created_idx"),
+            models.Index(fields=["created_by", "-created_at", "-id"], name="book_created_by_created_idx"),
+            # Unfiltered pages for each ordering.
+            models.Index(fields=["-created_at", "-id"], name="book_created_id_idx"),
+            models.Index(fields=["publication_date", "id"], name="book_pubdate_id_idx"),
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ]
 
 
 class ReadingLists(models.Model):
@@ -77,7 +104,8 @@ class ReadingLists(models.Model):
 
     user = models.ForeignKey("accounts.User", on_delete=models.CASCADE)
     book = models.ForeignKey(Books, on_delete=models.CASCADE)
-    position = models.IntegerField(default=0)
+    # Gapped sort key, see books.positions.
+    position = models.BigIntegerField(default=0)
     date_added = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -91,4 +119,8 @@ class ReadingLists(models.Model):
             )
         ]
         ordering = ["position", "-date_added"]
-        verbose_name_plural = "Reading Lists"
\ No newline at end of file
+        verbose_name_plural = "Reading Lists"
+        indexes = [
+            # A user's list in display order; also serves the position lookups of books.positions.
+            models.Index(fields=["user", "position", "-date_added"], name="readinglist_user_pos_idx"),
+        ]
\ No newline at end of file
@@ -0,0 +1,50 @@
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+
+
+def user_can_edit(user, obj):
+    """
+    Tell whether a user may edit an object with a `created_by` owner.
+
+    Staff may edit every object and other authenticated users the objects they
+    created. Keys are compared, so the owner row is never loaded.
+
+    Args:
+        user (User | AnonymousUser | None): The requesting user.
+        obj (Model): The object, with a `created_by` foreign key.
+
+    Returns:
+        bool: Whether the user may edit the object.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    return user.is_staff or obj.created_by_id == user.pk
+
+
+def can_edit_expression(user):
+    """
+    Return the SQL counterpart of `user_can_edit`, to annotate whole querysets.
+
+    Args:
+        user (User | AnonymousUser | None): The requesting user.
+
+    Returns:
+        Expression: A boolean expression over the `created_by` column.
+    """
+    if not user or not user.is_authenticated:
+        return Value(False)
+    if user.is_staff:
+        return Value(True)
+    return ExpressionWrapper(Q(created_by_id=user.pk), output_field=BooleanField())
+
+
+class CanEditAnnotationMixin:
+    """
+    Viewset mixin annotating every row with the requesting user's `can_edit` flag.
+
+    The flag is computed by the database in the same query as the rows, so a
+    client learns which objects of a page it may edit without one request per
+    object, and the server without loading any owner.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().annotate(can_edit=can_edit_expression(self.request.user))
@@ -0,0 +1,620 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from BookManagement.db_router import read_from_primary, reads_from_replica
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset (seek) pagination over a single ordering field plus the primary key.
+
+    Unlike DRF's `CursorPagination`, which stores an offset to skip rows sharing
+    the same ordering value, the cursor here holds the full `(value, pk)` position
+    of the boundary row. Every page is fetched with a `WHERE (key, pk) > (...)`
+    predicate and a `LIMIT`, so it never runs a `COUNT(*)` or an `OFFSET` scan and
+    costs the same on any page, even when many rows share the same key.
+
+    The ordering comes from the view's `OrderingFilter`, so every value allowed by
+    `ordering_fields` works. Only the first ordering term is used as the key; the
+    primary key is always appended as a tie-breaker in the same direction.
+    Nullable keys sort their NULLs last in both directions.
+
+    Attributes:
+        ordering (str): Fallback ordering when the view does not provide one.
+        cursor_query_param (str): Query parameter carrying the encoded cursor.
+    """
+    ordering = "-pk"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return one page of results starting after (or before) the request cursor.
+
+        Args:
+            queryset (QuerySet): The filtered queryset to paginate.
+            request (Request): The current request.
+            view (APIView, optional): The view being paginated.
+
+        Returns:
+            list | None: The rows of the page, or None if pagination is disabled.
+        """
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of `paginate_queryset`, fetching the page with the async ORM.
+        """
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Build the query fetching the requested page plus one row to detect more pages.
+
+        Args:
+            queryset (QuerySet): The filtered queryset to paginate.
+            request (Request): The current request.
+            view (APIView, optional): The view being paginated.
+
+        Returns:
+            QuerySet | None: The sliced page query, or None if pagination is disabled.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.key_name, self.descending = self.get_key(request, queryset, view)
+        self.key_field = queryset.model._meta.get_field(self.key_name)
+        self.pk_name = queryset.model._meta.pk.attname
+        self.ordering_token = ("-" if self.descending else "") + self.key_name
+
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor["r"])
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(self.cursor))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        """
+        Record the fetched page and which neighbouring pages exist.
+
+        Args:
+            rows (list): The rows fetched by the query from `get_page_queryset`.
+
+        Returns:
+            list: The rows of the page.
+        """
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.cursor and self.cursor["r"]:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = rows
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return rows
+
+    def get_key(self, request, queryset, view):
+        """
+        Resolve the keyset column and direction from the view's ordering.
+
+        Args:
+            request (Request): The current request.
+            queryset (QuerySet): The queryset being paginated.
+            view (APIView): The view being paginated.
+
+        Returns:
+            tuple: The field name and whether it is sorted descending.
+        """
+        candidates = list(self.get_ordering(request, queryset, view))
+        candidates += list(getattr(view, "ordering", None) or []) + [self.ordering]
+
+        for term in candidates:
+            if not isinstance(term, str):
+                continue
+            name = term.lstrip("-")
+            if name == "pk":
+                name = queryset.model._meta.pk.name
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Annotations (e.g. a search rank) cannot be used as a keyset column.
+                continue
+            if field.concrete and not field.is_relation:
+                return field.name, term.startswith("-")
+
+        return queryset.model._meta.pk.name, True
+
+    def get_order_by(self, reverse):
+        """
+        Build the `order_by` expressions for the keyset column and the primary key.
+
+        Args:
+            reverse (bool): Whether the page is being fetched backwards.
+
+        Returns:
+            list: The ordering expressions.
+        """
+        descending = self.descending != reverse
+        nulls = {}
+        if self.key_field.null:
+            # NULLs sort last going forward, hence first when walking backwards.
+            nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        key = F(self.key_name).desc(**nulls) if descending else F(self.key_name).asc(**nulls)
+        pk = F(self.pk_name).desc() if descending else F(self.pk_name).asc()
+        return [key, pk]
+
+    def get_seek_filter(self, cursor):
+        """
+        Build the predicate selecting rows strictly after (or before) the cursor.
+
+        Args:
+            cursor (dict): The decoded cursor.
+
+        Returns:
+            Q: The seek predicate.
+        """
+        value, pk, reverse = cursor["v"], cursor["p"], cursor["r"]
+        # Comparison towards the end of the forward ordering, or towards its start.
+        towards_end = self.descending == reverse
+        op = "gt" if towards_end else "lt"
+        key, nullable = self.key_name, self.key_field.null
+
+        if value is None:
+            rest = Q(**{f"{key}__isnull": True, f"{self.pk_name}__{op}": pk})
+            if reverse:
+                # Walking backwards from a NULL key also reaches every non-NULL key.
+                return Q(**{f"{key}__isnull": False}) | rest
+            return rest
+
+        seek = Q(**{f"{key}__{op}": value}) | Q(**{key: value, f"{self.pk_name}__{op}": pk})
+        if nullable and not reverse:
+            seek |= Q(**{f"{key}__isnull": True})
+        return seek
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor query parameter.
+
+        Args:
+            request (Request): The current request.
+
+        Raises:
+            NotFound: If the cursor is malformed or belongs to another ordering.
+
+        Returns:
+            dict | None: The cursor with keys `v` (key value), `p` (primary key)
+            and `r` (walk backwards), or None when no cursor was given.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            cursor = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+            if cursor["o"] != self.ordering_token:
+                raise ValueError("Cursor was issued for a different ordering.")
+            value = cursor["v"]
+            if value is not None:
+                value = self.key_field.to_python(value)
+            return {"v": value, "p": cursor["p"], "r": bool(cursor["r"])}
+        except (TypeError, ValueError, KeyError, UnicodeError, BinasciiError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        """
+        Return the page URL for a cursor positioned at the given row.
+
+        Args:
+            row (Model | dict): The boundary row of the current page.
+            reverse (bool): Whether the cursor walks backwards.
+
+        Returns:
+            str: The absolute URL carrying the encoded cursor.
+        """
+        value = self._get_value(row, self.key_field.attname)
+        if value is not None and not isinstance(value, (str, int, float)):
+            value = value.isoformat()
+        payload = {
+            "o": self.ordering_token,
+            "v": value,
+            "p": self._get_value(row, self.pk_name),
+            "r": int(reverse),
+        }
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Walked past the end; send the client back to the first page.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def _get_value(row, attname):
+        if isinstance(row, dict):
+            return row[attname]
+        return getattr(row, attname)
+
+
+COUNT_KEY = "pagination:count:{label}:{digest}"
+
+
+class EstimatedPage(Page):
+    """
+    A page of an `EstimatedCountPaginator` whose total count is an estimate.
+
+    Whether a next page exists is known from one extra row fetched past the end
+    of the page, not from the count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator replacing `COUNT(*)` over large querysets with a planner estimate.
+
+    The exact count of a query is cached for `COUNT_CACHE_TIMEOUT` seconds, keyed
+    on its SQL and parameters, so every page of the same filters shares it. On a
+    cache miss, PostgreSQL estimates the number of rows: `pg_class.reltuples` for
+    an unfiltered table, the row estimate of `EXPLAIN` otherwise. When the
+    estimate reaches `COUNT_ESTIMATE_THRESHOLD`, it is used as the count and
+    `count_is_approximate` is set; below the threshold, or on other databases,
+    the rows are counted exactly.
+
+    Pages past the last page of the count can still be requested, whether the
+    count is an estimate or a cached count the table has outgrown; only a page
+    without rows is rejected. Every page fetches one extra row, so `has_next()`
+    never depends on the count, and a cached count is never used to cut rows off
+    a page. Reaching the real last page turns the count exact, and caches it.
+
+    Attributes:
+        count_is_approximate (bool): Whether `count` is a planner estimate.
+    """
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        count, approximate = self.get_cached_or_estimated_count()
+        if count is None:
+            count = self.count_on_primary()
+        self.count_is_approximate = approximate
+        return count
+
+    async def acount(self):
+        """
+        Async version of `count`, counting exactly with the async ORM.
+
+        Returns:
+            int: The exact or estimated number of rows.
+        """
+        if "count" in self.__dict__:
+            return self.count
+        count, approximate = await sync_to_async(self.get_cached_or_estimated_count)()
+        if count is None:
+            with read_from_primary():
+                count = await self.object_list.acount()
+            await sync_to_async(self.cache_count)(count)
+        self.count_is_approximate = approximate
+        self.__dict__["count"] = count
+        return count
+
+    def get_count_key(self):
+        queryset = self.object_list.order_by()
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(repr((queryset.db, sql, params)).encode("utf-8"), usedforsecurity=False).hexdigest()
+        return COUNT_KEY.format(label=queryset.model._meta.label_lower, digest=digest)
+
+    def get_cached_or_estimated_count(self):
+        """
+        Return the cached exact count, or the planner estimate if it is large enough.
+
+        Returns:
+            tuple: The count, or None if the rows must be counted, and whether it is approximate.
+        """
+        if self.object_list.query.is_empty():
+            # `.none()` has no SQL to key or estimate, and no rows to count.
+            return 0, False
+        self.count_key = self.get_count_key()
+        cached = cache.get(self.count_key)
+        if cached is not None:
+            return cached, False
+        estimate = self.estimate_count()
+        if estimate is not None and estimate >= getattr(settings, "COUNT_ESTIMATE_THRESHOLD", 10000):
+            return estimate, True
+        return None, False
+
+    def count_on_primary(self):
+        """
+        Count the rows exactly on the primary and cache the count.
+
+        The count is shared by every request with the same query, so it is never
+        taken from a replica that may lag behind.
+
+        Returns:
+            int: The number of rows.
+        """
+        with read_from_primary():
+            count = self.object_list.count()
+        self.cache_count(count)
+        return count
+
+    def cache_count(self, count):
+        cache.set(self.count_key, count, timeout=getattr(settings, "COUNT_CACHE_TIMEOUT", 60))
+
+    def estimate_count(self):
+        """
+        Return the planner's estimate of the number of rows of the queryset.
+
+        Returns:
+            int | None: The estimate, or None when the database has no usable one.
+        """
+        queryset = self.object_list.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        query = queryset.query
+        with connection.cursor() as cursor:
+            if not query.where and not query.distinct and not query.is_sliced:
+                # Joins of an unfiltered catalog query are on non-null foreign keys.
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                # -1 until the table is first analyzed.
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def validate_number(self, number):
+        # Estimated and cached counts are both lower bounds: pages past the last
+        # page they give may still hold rows. `build_page` rejects empty ones.
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def get_bounds(self, number):
+        """
+        Return the slice of rows to fetch for a page.
+
+        Rows past the page are fetched whatever the count says: the count may be
+        an estimate, or a cached count the table has outgrown.
+
+        Args:
+            number (int): The validated page number.
+
+        Returns:
+            tuple: The bottom and top offsets.
+        """
+        bottom = (number - 1) * self.per_page
+        # One extra row tells whether a next page exists.
+        return bottom, bottom + self.per_page + self.orphans + 1
+
+    def build_page(self, rows, number):
+        """
+        Build the page from the rows fetched with `get_bounds`.
+
+        The rows correct the count when it is off: the last page gives the exact
+        count, and rows past the end of a cached count have it counted again.
+
+        Args:
+            rows (list): The fetched rows.
+            number (int): The validated page number.
+
+        Raises:
+            EmptyPage: If a page past the first has no rows.
+
+        Returns:
+            Page: The page.
+        """
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        bottom = (number - 1) * self.per_page
+        has_more = len(rows) > self.per_page + self.orphans
+        if not has_more:
+            # The last page: the exact count is now known.
+            count = bottom + len(rows)
+            # Only cached when read from the primary; see `count_on_primary`.
+            store = not reads_from_replica()
+        elif not self.count_is_approximate and bottom + len(rows) > self.count:
+            # Rows were added since the count was cached; recounted and cached.
+            count, store = self.count_on_primary(), False
+        else:
+            count = None
+        if count is not None and (self.count_is_approximate or count != self.count):
+            self.__dict__["count"] = count
+            self.__dict__.pop("num_pages", None)
+            self.count_is_approximate = False
+            if store:
+                self.cache_count(count)
+        return EstimatedPage(rows[:self.per_page] if has_more else rows, number, self, has_more)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom, top = self.get_bounds(number)
+        return self.build_page(list(self.object_list[bottom:top]), number)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination counting with `EstimatedCountPaginator`, sync or async.
+
+    Pages carry `count_is_approximate: true` when the count is an estimate. The
+    async read path (see books.async_views) calls `apaginate_queryset`, which
+    counts and fetches the page with the async ORM instead of in a thread.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of `paginate_queryset`, counting and fetching with the async ORM.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # The count is filled in before the paginator needs it, so it never counts
+        # synchronously. Like `paginate_queryset`, an empty page past the first is
+        # rejected without counting.
+        if request.query_params.get(self.page_query_param) in self.last_page_strings:
+            await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+            bottom, top = paginator.get_bounds(number)
+            rows = [row async for row in queryset[bottom:top]]
+            if rows or number == 1:
+                await paginator.acount()
+            self.page = await sync_to_async(paginator.build_page)(rows, number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.page.paginator.count,
+            "count_is_approximate": self.page.paginator.count_is_approximate,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "description": "Whether `count` is a database estimate rather than an exact count.",
+        }
+        return response_schema
+
+
+class CatalogPagination(EstimatedCountPagination):
+    """
+    Page number pagination with an opt-in keyset cursor mode.
+
+    Existing clients keep receiving `count`/`next`/`previous`/`results` pages.
+    Clients sending `?pagination=cursor` are paginated by `KeysetCursorPagination`
+    instead, following the `next`/`previous` links it returns. Large counts are
+    estimated by `EstimatedCountPaginator`; pages then carry
+    `count_is_approximate: true`.
+
+    Attributes:
+        pagination_query_param (str): Query parameter selecting the pagination mode.
+        cursor_pagination_value (str): The value of that parameter selecting cursor mode.
+        cursor_pagination_class (type): The pagination class used in cursor mode.
+    """
+    pagination_query_param = "pagination"
+    cursor_pagination_value = "cursor"
+    cursor_pagination_class = KeysetCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if request.query_params.get(self.pagination_query_param) == self.cursor_pagination_value:
+            self.cursor_paginator = self.cursor_pagination_class()
+            self.cursor_paginator.page_size = self.page_size
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if request.query_params.get(self.pagination_query_param) == self.cursor_pagination_value:
+            self.cursor_paginator = self.cursor_pagination_class()
+            self.cursor_paginator.page_size = self.page_size
+            page = await self.cursor_paginator.apaginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            "name": self.pagination_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Set to `cursor` for keyset pagination instead of page numbers.",
+            "schema": {"type": "string", "enum": [self.cursor_pagination_value]},
+        })
+        parameters.append({
+            "name": self.cursor_pagination_class.cursor_query_param,
+            "required": False,
+            "in": "query",
+            "description": "The pagination cursor value (cursor mode only).",
+            "schema": {"type": "string"},
+        })
+        return parameters
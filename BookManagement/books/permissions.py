@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .ownership import user_can_edit
+
 class IsOwner(permissions.BasePermission):
     """
     Custom permission to only allow owners of an object to edit it.
@@ -8,7 +10,8 @@ class IsOwner(permissions.BasePermission):
         return request.user.is_authenticated
     
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        # Compare keys so the check does not load the related user row.
+        return obj.user_id == request.user.pk
 
 
 class IsAdminOrOwnerOrReadOnly(permissions.BasePermission):
@@ -25,8 +28,9 @@ class IsAdminOrOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return request.user.is_staff or obj.created_by == request.user
-    
+        # Compares `created_by_id`, so the check does not load the related user row.
+        return user_can_edit(request.user, obj)
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -0,0 +1,132 @@
+from django.db.models import BigIntegerField, Case, Max, Min, Value, When
+
+from .models import ReadingLists
+
+
+# Distance between neighbouring reading list positions. A move places an entry
+# halfway between its new neighbours, so about log2(POSITION_GAP) moves into the
+# same slot are possible before the list has to be renumbered.
+POSITION_GAP = 1024
+
+
+def _user_entries(user_id):
+    return ReadingLists.objects.filter(user_id=user_id)
+
+
+def last_position(user_id):
+    """
+    Return the position that appends an entry to the bottom of a user's reading list.
+
+    Args:
+        user_id (int): The owner of the reading list.
+
+    Returns:
+        int: One gap below the current last entry.
+    """
+    current = _user_entries(user_id).aggregate(value=Max("position"))["value"]
+    return POSITION_GAP if current is None else current + POSITION_GAP
+
+
+def renumber(user_id, ordered_ids=None):
+    """
+    Reset the positions of a reading list to evenly spaced values in one `UPDATE`.
+
+    Args:
+        user_id (int): The owner of the reading list.
+        ordered_ids (list, optional): Entry ids in their new order. Defaults to the
+            current order of the list.
+
+    Returns:
+        int: The number of entries updated.
+    """
+    entries = _user_entries(user_id)
+    if ordered_ids is None:
+        ordered_ids = list(entries.order_by("position", "-date_added", "pk").values_list("pk", flat=True))
+    if not ordered_ids:
+        return 0
+    return entries.filter(pk__in=ordered_ids).update(
+        position=Case(
+            *(When(pk=pk, then=Value((index + 1) * POSITION_GAP)) for index, pk in enumerate(ordered_ids)),
+            default="position",
+            output_field=BigIntegerField(),
+        )
+    )
+
+
+def lock_entries(user_id):
+    """
+    Lock every entry of a user's reading list until the transaction ends.
+
+    Moves read the positions around their target before writing, so two
+    concurrent moves in the same list would otherwise pick the same midpoint or
+    renumber over each other. Must be called inside `transaction.atomic()`.
+
+    Args:
+        user_id (int): The owner of the reading list.
+
+    Returns:
+        dict: The current position of each entry, by id.
+    """
+    return dict(_user_entries(user_id).select_for_update().values_list("pk", "position"))
+
+
+def _target_position(entry, anchor, placement):
+    # Return the new position of `entry`, or None when the list must be renumbered first.
+    others = _user_entries(entry.user_id).exclude(pk=entry.pk)
+    if placement == "top":
+        current = others.aggregate(value=Min("position"))["value"]
+        return POSITION_GAP if current is None else current - POSITION_GAP
+    if placement == "bottom":
+        current = others.aggregate(value=Max("position"))["value"]
+        return POSITION_GAP if current is None else current + POSITION_GAP
+
+    # Entries sharing the anchor's position (e.g. set explicitly by a client) leave
+    # no room to slot in between, so they are spread out first.
+    if others.filter(position=anchor.position).exclude(pk=anchor.pk).exists():
+        return None
+    if placement == "before":
+        neighbour = others.filter(position__lt=anchor.position).aggregate(value=Max("position"))["value"]
+        step = -POSITION_GAP
+    else:
+        neighbour = others.filter(position__gt=anchor.position).aggregate(value=Min("position"))["value"]
+        step = POSITION_GAP
+    if neighbour is None:
+        return anchor.position + step
+    low, high = sorted((neighbour, anchor.position))
+    if high - low < 2:
+        return None
+    return (low + high) // 2
+
+
+def move_entry(entry, anchor=None, placement="before"):
+    """
+    Move a reading list entry by rewriting its own position only.
+
+    The entry is placed halfway between its new neighbours. When no integer is
+    left between them, the list is renumbered once and the move is retried, so
+    the cost of renumbering is spread over many moves. The list is locked with
+    `lock_entries` first, so this must run inside `transaction.atomic()`.
+
+    Args:
+        entry (ReadingLists): The entry to move.
+        anchor (ReadingLists, optional): The entry to move next to. Required for
+            the `before` and `after` placements.
+        placement (str): One of `before`, `after`, `top` or `bottom`.
+
+    Returns:
+        ReadingLists: The moved entry with its new position.
+    """
+    # Positions read before the lock may have been changed by another move since.
+    positions = lock_entries(entry.user_id)
+    entry.position = positions.get(entry.pk, entry.position)
+    if anchor is not None:
+        anchor.position = positions.get(anchor.pk, anchor.position)
+
+    position = _target_position(entry, anchor, placement)
+    if position is None:
+        renumber(entry.user_id)
+        anchor.refresh_from_db(fields=["position"])
+        position = _target_position(entry, anchor, placement)
+    entry.position = position
+    entry.save(update_fields=["position"])
+    return entry
@@ -0,0 +1,157 @@
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when an endpoint runs more SQL queries than its declared budget.
+
+    It subclasses `AssertionError` so that a budget overrun fails a test the same
+    way `assertNumQueries` does.
+    """
+
+
+class QueryCounter:
+    """
+    Count the SQL statements executed on every configured database connection.
+
+    The counter is installed through `connection.execute_wrapper`, so it works with
+    `DEBUG = False` and does not depend on `connection.queries`.
+
+    Attributes:
+        count (int): Number of statements executed while the counter was active.
+        statements (list): The SQL of every counted statement, used in error messages.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def install(self):
+        """
+        Install the counter on the connections of every database alias.
+
+        Connections are per thread, so `install` and `uninstall` must run in the
+        thread executing the queries.
+        """
+        self._wrappers = [connections[alias].execute_wrapper(self) for alias in connections]
+        for wrapper in self._wrappers:
+            wrapper.__enter__()
+
+    def uninstall(self):
+        """
+        Remove the counter installed by `install`.
+        """
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(None, None, None)
+        self._wrappers = []
+
+    @contextmanager
+    def capture(self):
+        """
+        Install the counter on every database alias for the duration of the block.
+        """
+        self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall()
+
+
+def check_query_budget(label, budget, counter):
+    """
+    Compare the number of executed queries against a budget.
+
+    When the budget is exceeded the overrun is always logged. If the
+    `QUERY_BUDGET_RAISE` setting is enabled (as it should be in tests) a
+    `QueryBudgetExceeded` error is raised as well.
+
+    Args:
+        label (str): A human readable name for the endpoint, used in messages.
+        budget (int | None): The maximum number of queries allowed, or None for no limit.
+        counter (QueryCounter): The counter holding the executed statements.
+
+    Raises:
+        QueryBudgetExceeded: If the budget is exceeded and `QUERY_BUDGET_RAISE` is enabled.
+    """
+    if budget is None or counter.count <= budget:
+        return
+
+    message = f"{label} ran {counter.count} queries, budget is {budget}"
+    logger.warning(message, extra={"queries": counter.statements})
+
+    if getattr(settings, "QUERY_BUDGET_RAISE", False):
+        raise QueryBudgetExceeded(
+            message + ":\n" + "\n".join(f"{i}. {sql}" for i, sql in enumerate(counter.statements, 1))
+        )
+
+
+def query_budget(budget):
+    """
+    Decorator enforcing a query budget on a view function or view method.
+
+    Args:
+        budget (int): The maximum number of queries the view may run.
+
+    Example:
+        @query_budget(3)
+        def get(self, request):
+            ...
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with QueryCounter().capture() as counter:
+                response = func(*args, **kwargs)
+            check_query_budget(func.__qualname__, budget, counter)
+            return response
+        return wrapper
+    return decorator
+
+
+class QueryBudgetMixin:
+    """
+    Viewset mixin enforcing a per-action SQL query budget.
+
+    Every request dispatched through the viewset is counted, including
+    authentication, permission checks, pagination and serialization.
+
+    Attributes:
+        query_budget (dict | int | None): Either a mapping of action name
+            (`list`, `retrieve`, ...) to the maximum number of queries, or a single
+            number applied to every action. Actions without an entry are not checked.
+    """
+    query_budget = None
+
+    def get_query_budget(self):
+        """
+        Return the query budget for the current action.
+
+        Returns:
+            int | None: The budget, or None if the action has no budget.
+        """
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(getattr(self, "action", None))
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        with QueryCounter().capture() as counter:
+            response = super().dispatch(request, *args, **kwargs)
+        check_query_budget(
+            f"{self.__class__.__name__}.{getattr(self, 'action', None)}",
+            self.get_query_budget(),
+            counter,
+        )
+        return response
@@ -0,0 +1,364 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connections, router
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Concat, Greatest
+from django.utils.module_loading import import_string
+
+from .models import Authors, Books
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text (str | None): The text to tokenize.
+
+    Returns:
+        list: The tokens, in order of appearance.
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+class BaseSearchBackend:
+    """
+    Interface shared by the book search backends.
+
+    A backend filters a `Books` queryset down to the rows matching a query and
+    annotates each row with a `search_rank` (higher is more relevant). It is also
+    told when books change so it can keep its index up to date.
+
+    Attributes:
+        process_local (bool): Whether the index lives in the memory of the process,
+            so updates made by other processes never reach it.
+    """
+    process_local = False
+
+    def search(self, queryset, query):
+        """
+        Filter and rank a queryset of books.
+
+        Args:
+            queryset (QuerySet): The books to search in.
+            query (str): The raw search string from the client.
+
+        Returns:
+            QuerySet: The matching books annotated with `search_rank`.
+        """
+        raise NotImplementedError
+
+    def index_books(self, queryset):
+        """
+        Refresh the index entries of the given books.
+
+        Args:
+            queryset (QuerySet): The books that were created or changed.
+        """
+
+    def remove_books(self, ids):
+        """
+        Drop the given books from the index.
+
+        Args:
+            ids (Iterable[int]): Primary keys of the deleted books.
+        """
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search over the `Books.search_vector` column.
+
+    The vector weights the title (A) above the subtitle and author name (B) and is
+    served by a GIN index. Every query term is matched as a prefix, so results
+    update on each keystroke. When the full-text query matches nothing, the
+    backend falls back to trigram word similarity on the title and author names,
+    which tolerates typos and is served by `gin_trgm_ops` indexes.
+
+    Attributes:
+        config (str): The text search configuration used for vectors and queries.
+        trigram_threshold (float): Minimum word similarity for fallback matches.
+    """
+
+    def __init__(self):
+        self.config = getattr(settings, "BOOK_SEARCH_CONFIG", "simple")
+        self.trigram_threshold = getattr(settings, "BOOK_SEARCH_TRIGRAM_THRESHOLD", 0.3)
+
+    def get_search_vector(self):
+        """
+        Return the expression computing a book's search vector.
+
+        The author name is read through a subquery so the expression can be used
+        in a single `UPDATE` over any number of books.
+
+        Returns:
+            SearchVector: The weighted search vector expression.
+        """
+        author_name = Subquery(
+            Authors.objects.filter(pk=OuterRef("author_id")).values(
+                full_name=Concat("first_name", Value(" "), "last_name")
+            )[:1]
+        )
+        return (
+            SearchVector("title", weight="A", config=self.config)
+            + SearchVector("subtitle", weight="B", config=self.config)
+            + SearchVector(author_name, weight="B", config=self.config)
+        )
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        # Terms are plain word tokens, so they are safe to splice into a raw tsquery.
+        ts_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms), search_type="raw", config=self.config
+        )
+        matches = queryset.filter(search_vector=ts_query).annotate(
+            search_rank=SearchRank(F("search_vector"), ts_query)
+        )
+        if matches.exists():
+            return matches
+
+        text = " ".join(terms)
+        return queryset.annotate(
+            search_rank=Greatest(
+                TrigramWordSimilarity(text, "title"),
+                TrigramWordSimilarity(text, "author__first_name"),
+                TrigramWordSimilarity(text, "author__last_name"),
+                output_field=FloatField(),
+            )
+        ).filter(
+            Q(title__trigram_word_similar=text)
+            | Q(author__first_name__trigram_word_similar=text)
+            | Q(author__last_name__trigram_word_similar=text),
+            search_rank__gte=self.trigram_threshold,
+        )
+
+    def index_books(self, queryset):
+        queryset.update(search_vector=self.get_search_vector())
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+    Pure-Python inverted index over book titles, subtitles and author names.
+
+    This backend needs no database support and exists for the test suite and
+    single-process SQLite development; it is not meant for production. The index
+    is process-local: it is built from the database on first use and kept current
+    through `index_books`/`remove_books` calls made in the same process, so other
+    workers never see those changes and each serves its own, possibly stale, copy.
+
+    Matching mirrors the Postgres backend: each query term must match a word of the
+    book either exactly, as a prefix, or (when neither matches any word in the
+    index) by trigram similarity.
+
+    Attributes:
+        field_weights (dict): Relevance weight of each indexed field.
+        prefix_weight (float): Score multiplier for prefix matches.
+        fuzzy_weight (float): Score multiplier for trigram matches.
+        trigram_threshold (float): Minimum trigram similarity for fuzzy matches.
+    """
+    process_local = True
+    field_weights = {"title": 1.0, "subtitle": 0.4, "author": 0.4}
+    prefix_weight = 0.8
+    fuzzy_weight = 0.5
+
+    def __init__(self):
+        self.trigram_threshold = getattr(settings, "BOOK_SEARCH_TRIGRAM_THRESHOLD", 0.3)
+        self._lock = threading.RLock()
+        self._built = False
+        self._documents = {}
+        self._postings = defaultdict(dict)
+        self._vocabulary = None
+        self._trigrams = None
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        scores = self.rank(terms)
+        if not scores:
+            return queryset.none()
+
+        # Every match is kept, so counts and later pages see the whole result set.
+        return queryset.filter(pk__in=list(scores)).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in scores.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+    def rank(self, terms):
+        """
+        Score every book matching all of the given terms.
+
+        Args:
+            terms (list): Lowercase query tokens.
+
+        Returns:
+            dict: Book primary key mapped to its relevance score.
+        """
+        with self._lock:
+            self._ensure_built()
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, multiplier in self._expand(term):
+                    for pk, weight in self._postings[token].items():
+                        score = weight * multiplier
+                        if score > term_scores.get(pk, 0.0):
+                            term_scores[pk] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pk: score + term_scores[pk] for pk, score in scores.items() if pk in term_scores}
+                if not scores:
+                    return {}
+            return scores
+
+    def index_books(self, queryset):
+        with self._lock:
+            if not self._built:
+                # The full build on first search will pick these books up.
+                return
+            for pk, fields in self._load(queryset):
+                self._remove(pk)
+                self._add(pk, fields)
+
+    def remove_books(self, ids):
+        with self._lock:
+            if not self._built:
+                return
+            for pk in ids:
+                self._remove(pk)
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        for pk, fields in self._load(Books.objects.all()):
+            self._add(pk, fields)
+        self._built = True
+
+    def _load(self, queryset):
+        rows = queryset.order_by().values_list(
+            "pk", "title", "subtitle", "author__first_name", "author__last_name"
+        )
+        for pk, title, subtitle, first_name, last_name in rows.iterator():
+            yield pk, {
+                "title": title,
+                "subtitle": subtitle,
+                "author": f"{first_name} {last_name}",
+            }
+
+    def _add(self, pk, fields):
+        document = {}
+        for field, text in fields.items():
+            weight = self.field_weights[field]
+            for token in tokenize(text):
+                if weight > document.get(token, 0.0):
+                    document[token] = weight
+        for token, weight in document.items():
+            if token not in self._postings:
+                self._vocabulary = self._trigrams = None
+            self._postings[token][pk] = weight
+        self._documents[pk] = document
+
+    def _remove(self, pk):
+        for token in self._documents.pop(pk, {}):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = self._trigrams = None
+
+    def _expand(self, term):
+        """
+        Yield the indexed tokens matching a query term with their score multiplier.
+        """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+
+        found = False
+        start = bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            found = True
+            yield token, 1.0 if token == term else self.prefix_weight
+
+        if not found:
+            for token, similarity in self._similar(term):
+                yield token, similarity * self.fuzzy_weight
+
+    def _similar(self, term):
+        if self._trigrams is None:
+            self._trigrams = defaultdict(set)
+            for token in self._postings:
+                for trigram in _trigrams(token):
+                    self._trigrams[trigram].add(token)
+
+        wanted = _trigrams(term)
+        candidates = set()
+        for trigram in wanted:
+            candidates |= self._trigrams.get(trigram, set())
+        for token in candidates:
+            other = _trigrams(token)
+            similarity = len(wanted & other) / len(wanted | other)
+            if similarity >= self.trigram_threshold:
+                yield token, similarity
+
+
+def _trigrams(token):
+    # Padded like pg_trgm so short words and word boundaries still produce trigrams.
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    """
+    Return the configured book search backend instance.
+
+    The `BOOK_SEARCH_BACKEND` setting holds the dotted path of the backend class.
+    When it is not set, the Postgres backend is used on PostgreSQL and the
+    in-memory backend on any other database.
+
+    Returns:
+        BaseSearchBackend: The shared backend instance.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "BOOK_SEARCH_BACKEND", None)
+                if path:
+                    backend_class = import_string(path)
+                elif connections[router.db_for_write(Books)].vendor == "postgresql":
+                    backend_class = PostgresSearchBackend
+                else:
+                    backend_class = InMemorySearchBackend
+                _backend = backend_class()
+    return _backend
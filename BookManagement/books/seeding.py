@@ -0,0 +1,451 @@
+import datetime
+import io
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from accounts.models import User
+
+from .cache import bump_version
+from .models import Authors, Books, Generes, ReadingLists
+from .positions import POSITION_GAP
+from .search import get_search_backend
+
+
+# Synthetic users are recognised (and removed) by this email domain.
+SEED_EMAIL_DOMAIN = "seed.invalid"
+SEED_PASSWORD = "Seed#Passw0rd"
+
+FIRST_NAMES = (
+    "Ada", "Alan", "Astrid", "Chinua", "Clarice", "Doris", "Elena", "Gabriel", "Haruki", "Isabel",
+    "Italo", "Jorge", "Kazuo", "Leo", "Margaret", "Naguib", "Octavia", "Orhan", "Toni", "Ursula",
+)
+LAST_NAMES = (
+    "Achebe", "Allende", "Atwood", "Borges", "Butler", "Calvino", "Ferrante", "Ishiguro", "Lessing", "Le Guin",
+    "Lindgren", "Lispector", "Mahfouz", "Marquez", "Morrison", "Murakami", "Pamuk", "Tolstoy", "Turing", "Lovelace",
+)
+GENRE_NAMES = (
+    "Fantasy", "Science Fiction", "Mystery", "Thriller", "Romance", "Horror", "Historical Fiction", "Biography",
+    "Poetry", "Philosophy", "History", "Science", "Travel", "Cooking", "Art", "Children", "Young Adult", "Drama",
+)
+LANGUAGES = ("English", "Spanish", "French", "German", "Italian", "Portuguese", "Japanese", "Turkish")
+WORDS = (
+    "shadow", "river", "garden", "empire", "winter", "glass", "silent", "house", "machine", "ocean",
+    "letters", "night", "mountain", "memory", "city", "stone", "light", "forest", "journey", "island",
+)
+
+# Field types whose Python values are passed to the database unchanged.
+PLAIN_FIELD_TYPES = {
+    "AutoField", "BigAutoField", "BigIntegerField", "BooleanField", "CharField", "ForeignKey", "IntegerField",
+    "TextField",
+}
+
+# A prime larger than any table, used to scatter popularity ranks over ids.
+SCATTER_PRIME = 2_654_435_761
+
+
+class Distribution:
+    """
+    Popularity distribution used to pick related rows.
+
+    `uniform` picks every row with the same probability. `zipf:<s>` picks the
+    row of rank `k` with a probability proportional to `1 / k**s`, sampled in
+    constant time from the continuous power law, so a few rows (prolific
+    authors, bestsellers, big genres) get most of the references. Ranks are
+    scattered over the rows so the popular ones are not simply the first ids.
+
+    Attributes:
+        kind (str): `uniform` or `zipf`.
+        exponent (float): The Zipf exponent `s`.
+    """
+
+    def __init__(self, kind="uniform", exponent=1.0):
+        if kind not in ("uniform", "zipf"):
+            raise ValueError(f"Unknown distribution {kind!r}; use 'uniform' or 'zipf:<exponent>'.")
+        if exponent <= 0:
+            raise ValueError("The Zipf exponent must be positive.")
+        self.kind = kind
+        self.exponent = exponent
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Build a distribution from `uniform`, `zipf` or `zipf:<exponent>`.
+
+        Raises:
+            ValueError: If the text is not a known distribution.
+        """
+        kind, _, exponent = text.partition(":")
+        try:
+            return cls(kind, float(exponent) if exponent else 1.0)
+        except ValueError as exc:
+            raise ValueError(f"Invalid distribution {text!r}: {exc}")
+
+    def __str__(self):
+        return self.kind if self.kind == "uniform" else f"zipf:{self.exponent:g}"
+
+    def sample(self, rng, n):
+        """
+        Return an index in `range(n)`.
+
+        Args:
+            rng (random.Random): The random generator.
+            n (int): Number of rows.
+
+        Returns:
+            int: The picked index.
+        """
+        if self.kind == "uniform" or n == 1:
+            return rng.randrange(n)
+        u = rng.random()
+        s = self.exponent
+        if s == 1:
+            rank = n ** u
+        else:
+            rank = ((n ** (1 - s) - 1) * u + 1) ** (1 / (1 - s))
+        return (min(int(rank), n) - 1) * SCATTER_PRIME % n
+
+
+class DatasetSeeder:
+    """
+    Generate a deterministic synthetic catalog with batched inserts in worker processes.
+
+    Rows are generated in fixed-size chunks, each from its own `random.Random`
+    seeded with `seed`, the table and the chunk number, and are given explicit
+    primary keys following the current maximum. The same arguments therefore
+    produce the same rows whatever the number of workers. Chunks are written in
+    parallel by `workers` processes, one transaction per chunk, with `COPY` on
+    PostgreSQL and multi-row `INSERT` statements elsewhere. Users share one password hash, books
+    and reading list entries pick their author, genre and book from the
+    configured distributions, and entries get gapped positions like
+    `books.positions` assigns. Timestamps are the time of the insert.
+
+    Attributes:
+        users (int): Number of synthetic users.
+        authors (int): Number of authors.
+        genres (int): Number of genres.
+        books (int): Number of books.
+        reading_lists_per_user (int): Mean number of reading list entries per user.
+        author_distribution (Distribution): How books pick their author.
+        genre_distribution (Distribution): How books pick their genre.
+        book_distribution (Distribution): How reading list entries pick their book.
+        seed (int): Seed of the random generators.
+        chunk_size (int): Rows per chunk, and per transaction.
+        workers (int): Worker processes; 1 writes from this process.
+        use_copy (bool): Whether PostgreSQL `COPY` is used.
+    """
+
+    def __init__(self, users=50, authors=500, genres=18, books=5000, reading_lists_per_user=20,
+                 author_distribution="zipf:1.1", genre_distribution="zipf:0.8", book_distribution="zipf:1.1",
+                 seed=0, chunk_size=20000, workers=None, use_copy=None):
+        self.users = users
+        self.authors = authors
+        self.genres = genres
+        self.books = books
+        self.reading_lists_per_user = reading_lists_per_user
+        self.author_distribution = Distribution.parse(str(author_distribution))
+        self.genre_distribution = Distribution.parse(str(genre_distribution))
+        self.book_distribution = Distribution.parse(str(book_distribution))
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.using = router.db_for_write(Books)
+        vendor = connections[self.using].vendor
+        # SQLite allows one writer at a time, so extra processes would only wait.
+        self.workers = workers or (os.cpu_count() if vendor == "postgresql" else 1)
+        self.use_copy = vendor == "postgresql" if use_copy is None else use_copy
+
+    def run(self, progress=None):
+        """
+        Write the whole dataset.
+
+        Args:
+            progress (Callable, optional): Called as `progress(table, rows, seconds)`
+                after each table is written.
+
+        Raises:
+            ValueError: If synthetic users already exist (`clear()` them first), or
+                if books or authors are requested without the rows they reference.
+
+        Returns:
+            dict: Number of rows written per table.
+        """
+        if self.books and not (self.users and self.authors and self.genres) or self.authors and not self.users:
+            raise ValueError("Books need users, authors and genres, and authors need users.")
+        if User.objects.filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}").exists():
+            raise ValueError("Synthetic data already exists; clear it first.")
+
+        self.password = make_password(SEED_PASSWORD)
+        self.genre_ids = self.seed_genres()
+        self.bases = {
+            model: (model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+            for model in (User, Authors, Books)
+        }
+
+        counts = {"genres": len(self.genre_ids)}
+        # Reading list chunks are ranges of users.
+        tables = (
+            ("users", self.users),
+            ("authors", self.authors),
+            ("books", self.books),
+            ("reading_lists", self.users),
+        )
+        for table, total in tables:
+            started = time.perf_counter()
+            chunk_size = self.get_chunk_size(table)
+            chunks = [(table, start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+            counts[table] = sum(self.map_chunks(chunks))
+            if progress:
+                progress(table, counts[table], time.perf_counter() - started)
+
+        self.reset_sequences()
+        backend = get_search_backend()
+        if backend.process_local:
+            # Indexing from the workers would only update their own copy of the index.
+            backend.index_books(Books.objects.using(self.using).filter(pk__gte=self.bases[Books]))
+        for model in (Books, Authors, Generes):
+            bump_version(model)
+        return counts
+
+    def get_chunk_size(self, table):
+        if table == "reading_lists":
+            return max(1, self.chunk_size // max(1, self.reading_lists_per_user))
+        return self.chunk_size
+
+    def map_chunks(self, chunks):
+        if self.workers == 1 or len(chunks) == 1:
+            return [self.write_chunk(*chunk) for chunk in chunks]
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker) as executor:
+            return list(executor.map(_write_chunk, [self] * len(chunks), chunks))
+
+    def write_chunk(self, table, start, stop):
+        """
+        Generate and insert rows `start` to `stop` of a table in one transaction.
+
+        Returns:
+            int: The number of rows written.
+        """
+        rng = random.Random(f"{self.seed}:{table}:{start}")
+        writer = {
+            "users": self.write_users,
+            "authors": self.write_authors,
+            "books": self.write_books,
+            "reading_lists": self.write_reading_lists,
+        }[table]
+        with transaction.atomic(using=self.using):
+            return writer(rng, start, stop)
+
+    @classmethod
+    def clear(cls):
+        """
+        Delete every synthetic user with their authors, books and reading lists.
+
+        The rows are removed with one `DELETE` per table instead of Django's
+        cascade collector, which would load every row first.
+        """
+        using = router.db_for_write(Books)
+        users = User.objects.using(using).filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}").values("pk")
+        books = Books.objects.using(using).filter(created_by__in=users).values("pk")
+        authors = Authors.objects.using(using).filter(created_by__in=users).values("pk")
+        with transaction.atomic(using=using):
+            # Querysets without signals or cascades are deleted with a single statement.
+            ReadingLists.objects.using(using).filter(book__in=books).delete()
+            ReadingLists.objects.using(using).filter(user__in=users).delete()
+            _delete_rows(using, Books, books)
+            _delete_rows(using, Authors, authors)
+            _delete_rows(using, User, users)
+        for model in (Books, Authors, Generes):
+            bump_version(model)
+
+    def seed_genres(self):
+        names = [
+            GENRE_NAMES[n] if n < len(GENRE_NAMES) else f"{GENRE_NAMES[n % len(GENRE_NAMES)]} {n // len(GENRE_NAMES)}"
+            for n in range(self.genres)
+        ]
+        Generes.objects.bulk_create((Generes(name=name) for name in names), ignore_conflicts=True)
+        by_name = dict(Generes.objects.filter(name__in=names).values_list("name", "pk"))
+        return [by_name[name] for name in names]
+
+    def write_users(self, rng, start, stop):
+        base = self.bases[User]
+        rows = [
+            {
+                "id": base + n,
+                "email": f"user{n}@{SEED_EMAIL_DOMAIN}",
+                "username": f"seed_user_{n}",
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "password": self.password,
+            }
+            for n in range(start, stop)
+        ]
+        return self.insert(User, rows)
+
+    def write_authors(self, rng, start, stop):
+        base, users = self.bases[Authors], self.bases[User]
+        rows = [
+            {
+                "id": base + n,
+                "first_name": rng.choice(FIRST_NAMES),
+                # The suffix keeps (first_name, last_name) unique at any volume.
+                "last_name": f"{rng.choice(LAST_NAMES)} {n}",
+                "date_of_birth": datetime.date(1800, 1, 1) + datetime.timedelta(days=rng.randrange(70000)),
+                "created_by_id": users + rng.randrange(self.users),
+            }
+            for n in range(start, stop)
+        ]
+        return self.insert(Authors, rows)
+
+    def write_books(self, rng, start, stop):
+        base, users, authors = self.bases[Books], self.bases[User], self.bases[Authors]
+        rows = []
+        for n in range(start, stop):
+            words = rng.sample(WORDS, 3)
+            rows.append({
+                "id": base + n,
+                "created_by_id": users + rng.randrange(self.users),
+                "title": f"The {words[0].title()} of {words[1].title()} {n}",
+                "subtitle": f"A {words[2]} story" if rng.random() < 0.3 else None,
+                "author_id": authors + self.author_distribution.sample(rng, self.authors),
+                "genre_id": self.genre_ids[self.genre_distribution.sample(rng, len(self.genre_ids))],
+                "language": rng.choice(LANGUAGES),
+                "description": " ".join(rng.choices(WORDS, k=40)),
+                "publication_date": datetime.date(1900, 1, 1) + datetime.timedelta(days=rng.randrange(45000)),
+            })
+        written = self.insert(Books, rows)
+        backend = get_search_backend()
+        if not backend.process_local:
+            backend.index_books(Books.objects.using(self.using).filter(pk__gte=base + start, pk__lt=base + stop))
+        return written
+
+    def write_reading_lists(self, rng, start, stop):
+        users, books = self.bases[User], self.bases[Books]
+        mean = self.reading_lists_per_user
+        rows = []
+        for n in range(start, stop):
+            count = min(rng.randint(0, 2 * mean), self.books)
+            picked = set()
+            while len(picked) < count:
+                picked.add(self.book_distribution.sample(rng, self.books))
+            ordered = sorted(picked)
+            rng.shuffle(ordered)
+            rows += [
+                {"user_id": users + n, "book_id": books + index, "position": position * POSITION_GAP}
+                for position, index in enumerate(ordered, start=1)
+            ]
+        return self.insert(ReadingLists, rows)
+
+    def insert(self, model, rows):
+        """
+        Insert rows given as dicts keyed by field attname.
+
+        Fields missing from a row get their default, or the current time for
+        `auto_now`/`auto_now_add` fields. Rows are sent with `COPY`, or as
+        multi-row `INSERT` statements without building model instances.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        if not rows:
+            return 0
+        connection = connections[self.using]
+        now = timezone.now()
+        fields = [
+            field for field in model._meta.concrete_fields
+            if field.attname in rows[0] or not field.primary_key
+        ]
+        # Missing values are the same for every row, so they are prepared once.
+        defaults = {
+            field.attname: field.get_db_prep_save(
+                now if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+                else field.get_default(),
+                connection,
+            )
+            for field in fields
+            if field.attname not in rows[0]
+        }
+        prepare = [
+            None if field.attname in defaults or field.get_internal_type() in PLAIN_FIELD_TYPES
+            else field.get_db_prep_save
+            for field in fields
+        ]
+        values = [
+            [
+                defaults[field.attname] if field.attname in defaults
+                else row[field.attname] if prep is None
+                else prep(row[field.attname], connection)
+                for field, prep in zip(fields, prepare)
+            ]
+            for row in rows
+        ]
+
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                copy_sql = f"COPY {table} ({columns}) FROM STDIN"
+                data = "".join("\t".join(map(_copy_value, row)) + "\n" for row in values)
+                if hasattr(cursor, "copy_expert"):
+                    cursor.copy_expert(copy_sql, io.StringIO(data))
+                else:
+                    with cursor.copy(copy_sql) as copy:
+                        copy.write(data)
+                return len(rows)
+
+            batch_size = max(1, connection.ops.bulk_batch_size(fields, values))
+            placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+            for start in range(0, len(values), batch_size):
+                batch = values[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholders] * len(batch))}",
+                    [value for row in batch for value in row],
+                )
+        return len(rows)
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, Authors, Books, ReadingLists])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+def _copy_value(value):
+    # COPY text format: \N is NULL; backslashes and separators are escaped.
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _delete_rows(using, model, pks):
+    quote = connections[using].ops.quote_name
+    sql, params = pks.query.sql_with_params()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})", params
+        )
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it set up.
+    django.setup()
+
+
+def _write_chunk(seeder, chunk):
+    return seeder.write_chunk(*chunk)
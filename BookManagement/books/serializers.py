@@ -1,7 +1,59 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import Books, ReadingLists, Authors, Generes
+from .fieldsets import SparseFieldsetSerializerMixin
+from .ownership import user_can_edit
 
-class AuthorSerializer(serializers.ModelSerializer):
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves ids from instances prefetched in the context.
+
+    Bulk endpoints put a `related_instances` mapping of model class to `{pk: instance}`
+    into the serializer context, so validating thousands of items resolves every
+    related object from one `IN` query per model instead of one query per item.
+    Without that mapping the field behaves like `PrimaryKeyRelatedField`.
+    """
+
+    def to_internal_value(self, data):
+        instances = self.context.get("related_instances", {}).get(self.queryset.model)
+        if instances is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = self.queryset.model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        instance = instances.get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class CanEditField(serializers.BooleanField):
+    """
+    Read-only flag telling whether the requesting user may edit the object.
+
+    It is read from the `can_edit` annotation of `CanEditAnnotationMixin`
+    querysets. Objects without it, such as newly created ones, are checked
+    against the request user with `user_can_edit`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if hasattr(instance, self.source):
+            return getattr(instance, self.source)
+        request = self.context.get("request")
+        return user_can_edit(getattr(request, "user", None), instance)
+
+
+class AuthorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Authors model.
 
@@ -9,18 +61,37 @@ class AuthorSerializer(serializers.ModelSerializer):
 
     Attributes:
         full_name (ReadOnlyField): A computed field that returns the full name of the author.
+        field_dependencies (dict): The columns `full_name` is computed from.
 
     Meta:
         model (Authors): The model associated with this serializer.
         fields (list): The fields to include in the serialized output.
     """
     full_name = serializers.ReadOnlyField()
+    field_dependencies = {"full_name": ("first_name", "last_name")}
 
     class Meta:
         model = Authors
         fields = ['id', 'first_name', 'last_name', 'date_of_birth', 'date_of_death', 'full_name']
 
-class GenreSerializer(serializers.ModelSerializer):
+class EditableAuthorSerializer(AuthorSerializer):
+    """
+    Author serializer of `AuthorViewSet`, with the requesting user's `can_edit` flag.
+
+    Nested authors use `AuthorSerializer`, as the flag is only annotated on the
+    rows of the viewset's own queryset.
+
+    Attributes:
+        can_edit (CanEditField): Whether the requesting user may edit the author.
+        annotated_fields (tuple): Fields read from queryset annotations.
+    """
+    can_edit = CanEditField()
+    annotated_fields = ("can_edit",)
+
+    class Meta(AuthorSerializer.Meta):
+        fields = AuthorSerializer.Meta.fields + ["can_edit"]
+
+class GenreSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Generes model.
 
@@ -34,7 +105,7 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Generes
         fields = '__all__'
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Books model.
 
@@ -44,8 +115,8 @@ class BookSerializer(serializers.ModelSerializer):
     Attributes:
         author (AuthorSerializer): A nested serializer for the author details (read-only).
         genre (GenreSerializer): A nested serializer for the genre details (read-only).
-        author_id (PrimaryKeyRelatedField): A field for specifying the author by ID (write-only).
-        genre_id (PrimaryKeyRelatedField): A field for specifying the genre by ID (write-only).
+        author_id (PrefetchedPrimaryKeyRelatedField): A field for specifying the author by ID (write-only).
+        genre_id (PrefetchedPrimaryKeyRelatedField): A field for specifying the genre by ID (write-only).
 
     Meta:
         model (Books): The model associated with this serializer.
@@ -53,10 +124,10 @@ class BookSerializer(serializers.ModelSerializer):
     """
     author = AuthorSerializer(read_only=True)
     genre = GenreSerializer(read_only=True)
-    author_id = serializers.PrimaryKeyRelatedField(
+    author_id = PrefetchedPrimaryKeyRelatedField(
         queryset=Authors.objects.all(), source="author", write_only=True
     )
-    genre_id = serializers.PrimaryKeyRelatedField(
+    genre_id = PrefetchedPrimaryKeyRelatedField(
         queryset=Generes.objects.all(), source="genre", write_only=True
     )
 
@@ -67,7 +138,24 @@ class BookSerializer(serializers.ModelSerializer):
             "publication_date", "thumbnail", "author", "author_id", "genre", "genre_id"
         ]
 
-class ReadingListSerializer(serializers.ModelSerializer):
+class EditableBookSerializer(BookSerializer):
+    """
+    Book serializer of `BookViewSet`, with the requesting user's `can_edit` flag.
+
+    Books nested in reading lists use `BookSerializer`, as the flag is only
+    annotated on the rows of the viewset's own queryset.
+
+    Attributes:
+        can_edit (CanEditField): Whether the requesting user may edit the book.
+        annotated_fields (tuple): Fields read from queryset annotations.
+    """
+    can_edit = CanEditField()
+    annotated_fields = ("can_edit",)
+
+    class Meta(BookSerializer.Meta):
+        fields = BookSerializer.Meta.fields + ["can_edit"]
+
+class ReadingListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the ReadingLists model.
 
@@ -90,3 +178,41 @@ class ReadingListSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReadingLists
         fields = ["id", "book", "book_id", "position", "date_added"]
+
+
+class ReadingListMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving one reading list entry.
+
+    Exactly one of the fields must be given: `before` or `after` place the entry
+    next to another entry of the same list, `position` moves it to the `top` or
+    `bottom` of the list.
+
+    Attributes:
+        before (IntegerField): Id of the entry to place this entry above.
+        after (IntegerField): Id of the entry to place this entry below.
+        position (ChoiceField): Either `top` or `bottom`.
+    """
+    before = serializers.IntegerField(required=False)
+    after = serializers.IntegerField(required=False)
+    position = serializers.ChoiceField(choices=["top", "bottom"], required=False)
+
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError("Provide exactly one of before, after or position.")
+        return attrs
+
+
+class ReadingListReorderSerializer(serializers.Serializer):
+    """
+    Serializer for applying a complete new order to a reading list.
+
+    Attributes:
+        ids (ListField): Every entry id of the reading list, in the new order.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Each entry may only be listed once.")
+        return value
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import Authors, Books, Generes
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Books)
+def index_saved_book(sender, instance, update_fields=None, **kwargs):
+    """
+    Refresh the search index entry of a created or updated book.
+    """
+    if update_fields is not None and set(update_fields) <= {"search_vector"}:
+        return
+    get_search_backend().index_books(Books.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Books)
+def unindex_deleted_book(sender, instance, **kwargs):
+    """
+    Drop a deleted book from the search index.
+    """
+    get_search_backend().remove_books([instance.pk])
+
+
+@receiver(post_save, sender=Authors)
+def reindex_author_books(sender, instance, created=False, **kwargs):
+    """
+    Refresh the search index entries of every book by a renamed author.
+    """
+    if created:
+        return
+    get_search_backend().index_books(Books.objects.filter(author_id=instance.pk))
+
+
+@receiver(post_save, sender=Books)
+@receiver(post_delete, sender=Books)
+@receiver(post_save, sender=Authors)
+@receiver(post_delete, sender=Authors)
+@receiver(post_save, sender=Generes)
+@receiver(post_delete, sender=Generes)
+def invalidate_catalog_responses(sender, **kwargs):
+    """
+    Bump the cache version of a catalog model so cached responses are rebuilt.
+
+    The bump waits for the transaction to commit: a response rebuilt under the
+    new version before that would not see the write.
+    """
+    transaction.on_commit(lambda: bump_version(sender))
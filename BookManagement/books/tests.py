@@ -1,3 +1,1259 @@
-from django.test import TestCase
+import copy
+import datetime
+import decimal
+import json
+import uuid
+import zoneinfo
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from BookManagement import db_router, instrumentation
+from BookManagement.renderers import ORJSONRenderer
+from .models import Authors, Books, Generes, ReadingLists
+from . import fastpath, positions, search, signals
+from .cache import get_cache_stats
+from .async_views import async_catalog_view
+from .facets import Facet
+from .pagination import CatalogPagination, EstimatedCountPagination, EstimatedCountPaginator
+from .query_budget import QueryBudgetExceeded, QueryCounter
+from .search import InMemorySearchBackend
+from .views import AuthorViewSet, BookViewSet, GenreViewSet, ReadingListViewSet
+
+
+class CatalogTestCase(APITestCase):
+    """
+    Base test case with a user, an author and a genre to create books with.
+
+    The cache is cleared before each test, so cached responses, counts and
+    throttle counters never leak between tests.
+
+    Attributes:
+        replicas (list): The database aliases reads are routed to; none by default.
+    """
+    replicas = []
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            first_name="Ada", last_name="Reader", username="reader", email="reader@example.com", password="x",
+        )
+        cls.author = Authors.objects.create(first_name="Jane", last_name="Austen", created_by=cls.user)
+        cls.genre = Generes.objects.create(name="Novel")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = mock.patch.object(db_router, "replica_aliases", return_value=self.replicas)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_books(self, count, **fields):
+        """
+        Create books by the test author, titled after their creation order.
+
+        Returns:
+            list: The created books.
+        """
+        start = Books.objects.count()
+        return [
+            Books.objects.create(
+                title=f"Book {start + index}", author=self.author, genre=self.genre, created_by=self.user, **fields
+            )
+            for index in range(count)
+        ]
+
+
+class EstimatedCountPaginationTests(CatalogTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_last_page_includes_rows_created_after_the_count_was_cached(self):
+        self.create_books(5)
+        self.assertEqual(self.client.get("/api/v1/books/").data["count"], 5)
+
+        self.create_books(1)
+        response = self.client.get("/api/v1/books/")
+
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(len(response.data["results"]), 6)
+
+    def test_next_page_is_reachable_when_rows_outgrow_the_cached_count(self):
+        self.create_books(4)
+        with mock.patch.object(CatalogPagination, "page_size", 2):
+            self.assertIsNone(self.client.get("/api/v1/books/?page=2").data["next"])
+
+            self.create_books(1)
+            response = self.client.get("/api/v1/books/?page=2")
+            self.assertEqual(response.data["count"], 5)
+            self.assertIsNotNone(response.data["next"])
+
+            response = self.client.get("/api/v1/books/?page=3")
+            self.assertEqual(len(response.data["results"]), 1)
+
+    def test_pages_past_the_cached_count_can_be_requested_directly(self):
+        self.create_books(4)
+        with mock.patch.object(CatalogPagination, "page_size", 2):
+            self.assertEqual(self.client.get("/api/v1/books/?page=2").data["count"], 4)
+
+            self.create_books(2)
+            response = self.client.get("/api/v1/books/?page=3")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["count"], 6)
+            self.assertEqual(len(response.data["results"]), 2)
+            self.assertIsNone(response.data["next"])
+
+            self.assertEqual(self.client.get("/api/v1/books/?page=4").status_code, 404)
+            self.assertEqual(self.client.get("/api/v1/books/?page=0").status_code, 404)
+
+    def test_reading_list_shows_entries_added_after_the_count_was_cached(self):
+        books = self.create_books(4)
+        for book in books[:3]:
+            ReadingLists.objects.create(user=self.user, book=book)
+        self.assertEqual(self.client.get("/api/v1/reading-list/").data["count"], 3)
+
+        ReadingLists.objects.create(user=self.user, book=books[3])
+        response = self.client.get("/api/v1/reading-list/")
+
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(len(response.data["results"]), 4)
+
+
+class KeysetCursorPaginationTests(CatalogTestCase):
+    """
+    `?pagination=cursor` walks every ordering forwards and backwards without
+    skipping or repeating rows, through tied and NULL keys.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(CatalogPagination, "page_size", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_catalog(self):
+        titles = ["B", "A", "B", "A", "C", "B", "A", "C"]
+        dates = [datetime.date(2000, 1, 1)] * 3 + [None, None, datetime.date(1990, 5, 5), datetime.date(2010, 1, 1)] + [None]
+        moments = [datetime.datetime(2024, 1, day % 3 + 1, tzinfo=datetime.timezone.utc) for day in range(8)]
+        for book, title, date, moment in zip(self.create_books(8), titles, dates, moments):
+            Books.objects.filter(pk=book.pk).update(title=title, publication_date=date, created_at=moment)
+
+    def walk(self, url):
+        """
+        Follow the `next` links from `url`, then the `previous` links back.
+
+        Returns:
+            tuple: The ids seen going forwards, and those seen going backwards in
+                forward order.
+        """
+        forwards, response = [], self.client.get(url)
+        while True:
+            self.assertEqual(response.status_code, 200, response.data)
+            ids = [row["id"] for row in response.data["results"]]
+            self.assertLessEqual(len(ids), 3)
+            forwards += ids
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        pages = [ids]
+        while response.data["previous"] is not None:
+            response = self.client.get(response.data["previous"])
+            self.assertEqual(response.status_code, 200, response.data)
+            pages.insert(0, [row["id"] for row in response.data["results"]])
+        return forwards, [pk for page in pages for pk in page]
+
+    def expected_order(self, model, term, **filters):
+        """
+        Return the ids in keyset order: the key then the id, NULL keys last.
+        """
+        name, descending = term.lstrip("-"), term.startswith("-")
+        rows = list(model.objects.filter(**filters).values_list(name, "pk"))
+        present = sorted((row for row in rows if row[0] is not None), reverse=descending)
+        missing = sorted((row for row in rows if row[0] is None), key=lambda row: row[1], reverse=descending)
+        return [pk for _, pk in present + missing]
+
+    def test_book_orderings(self):
+        self.create_catalog()
+        for name in BookViewSet.ordering_fields:
+            for term in (name, f"-{name}"):
+                with self.subTest(ordering=term):
+                    forwards, backwards = self.walk(f"/api/v1/books/?pagination=cursor&ordering={term}")
+                    self.assertEqual(forwards, self.expected_order(Books, term))
+                    self.assertEqual(backwards, forwards)
+
+    def test_default_book_ordering(self):
+        self.create_catalog()
+        forwards, backwards = self.walk("/api/v1/books/?pagination=cursor")
+
+        self.assertEqual(forwards, self.expected_order(Books, "-created_at"))
+        self.assertEqual(backwards, forwards)
+
+    def test_reading_list_orderings(self):
+        books = self.create_books(8)
+        for index, book in enumerate(books):
+            # Tied positions, as a list is before its first renumbering.
+            ReadingLists.objects.create(user=self.user, book=book, position=index // 3)
+        for name in ReadingListViewSet.ordering_fields:
+            for term in (name, f"-{name}"):
+                with self.subTest(ordering=term):
+                    forwards, backwards = self.walk(f"/api/v1/reading-list/?pagination=cursor&ordering={term}")
+                    self.assertEqual(forwards, self.expected_order(ReadingLists, term, user=self.user))
+                    self.assertEqual(backwards, forwards)
+
+    def test_tampered_cursors_are_rejected(self):
+        self.create_catalog()
+        next_link = self.client.get("/api/v1/books/?pagination=cursor&ordering=title").data["next"]
+        encoded = parse_qs(urlsplit(next_link).query)["cursor"][0]
+        cursor = json.loads(urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+
+        def encode(payload):
+            return urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+        tampered = [
+            "not-a-cursor!",
+            encode("a string"),
+            encode({**cursor, "o": "-title"}),
+            encode({key: value for key, value in cursor.items() if key != "p"}),
+            urlsafe_b64encode(b"{broken").decode(),
+        ]
+        for value in tampered:
+            with self.subTest(cursor=value):
+                params = {"pagination": "cursor", "ordering": "title", "cursor": value}
+                self.assertEqual(self.client.get("/api/v1/books/", params).status_code, 404)
+
+        response = self.client.get(
+            "/api/v1/books/", {"pagination": "cursor", "ordering": "publication_date", "cursor": encoded}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTests(CatalogTestCase):
+    """
+    Every catalog list and detail endpoint stays within its `query_budget`, with a
+    number of queries that does not grow with the number of rows on the page.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # A real token, so authentication is counted like in production.
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def count_queries(self, url):
+        with QueryCounter().capture() as counter:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return counter.count
+
+    def assert_constant_queries(self, url, add_rows):
+        """
+        Assert that a page of 2 rows and a page of 7 rows run the same queries.
+        """
+        add_rows(2)
+        self.client.get(url)  # Fill the caches a first request fills.
+        small = self.count_queries(url)
+        add_rows(5)
+        self.assertEqual(self.count_queries(url), small)
+
+    def add_authors(self, count):
+        start = Authors.objects.count()
+        Authors.objects.bulk_create(
+            Authors(first_name="Author", last_name=str(start + index), created_by=self.user) for index in range(count)
+        )
+
+    def add_reading_list_entries(self, count):
+        for position, book in enumerate(self.create_books(count), start=ReadingLists.objects.count()):
+            ReadingLists.objects.create(user=self.user, book=book, position=position)
+
+    def test_book_list(self):
+        self.assert_constant_queries("/api/v1/books/", self.create_books)
+
+    def test_book_list_with_sparse_fields(self):
+        self.assert_constant_queries("/api/v1/books/?fields=title,author&expand=author", self.create_books)
+
+    def test_author_list(self):
+        self.assert_constant_queries("/api/v1/authors/", self.add_authors)
+
+    def test_reading_list(self):
+        self.assert_constant_queries("/api/v1/reading-list/", self.add_reading_list_entries)
+
+    def test_details(self):
+        book = self.create_books(1)[0]
+        entry = ReadingLists.objects.create(user=self.user, book=book)
+        for url in (f"/api/v1/books/{book.pk}/", f"/api/v1/authors/{self.author.pk}/", f"/api/v1/reading-list/{entry.pk}/"):
+            with self.subTest(url=url):
+                self.count_queries(url)
+
+    def test_exceeding_the_budget_raises(self):
+        self.create_books(2)
+        entry = ReadingLists.objects.create(user=self.user, book=Books.objects.first())
+        cases = [
+            (BookViewSet, "list", "/api/v1/books/"),
+            (BookViewSet, "retrieve", f"/api/v1/books/{entry.book_id}/"),
+            (AuthorViewSet, "list", "/api/v1/authors/"),
+            (AuthorViewSet, "retrieve", f"/api/v1/authors/{self.author.pk}/"),
+            (ReadingListViewSet, "list", "/api/v1/reading-list/"),
+            (ReadingListViewSet, "retrieve", f"/api/v1/reading-list/{entry.pk}/"),
+        ]
+        for viewset, action, url in cases:
+            with self.subTest(url=url), mock.patch.object(viewset, "query_budget", {action: 0}):
+                with self.assertLogs("books.query_budget", "WARNING"), self.assertRaises(QueryBudgetExceeded):
+                    self.client.get(url)
+
+
+class BulkWriteTests(CatalogTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def book_payload(self, title, **fields):
+        return {"title": title, "author_id": self.author.pk, "genre_id": self.genre.pk, **fields}
+
+    def bulk_create(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/v1/books/", items, format="json")
+
+    def bulk_update(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch("/api/v1/books/bulk/", items, format="json")
+
+    def test_create_inserts_every_book(self):
+        response = self.bulk_create([self.book_payload("First"), self.book_payload("Second")])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([book["title"] for book in response.data], ["First", "Second"])
+        self.assertEqual(set(Books.objects.values_list("created_by", flat=True)), {self.user.pk})
+
+    def test_create_reports_errors_by_index_and_writes_nothing(self):
+        response = self.bulk_create([
+            self.book_payload("Valid"),
+            self.book_payload("", genre_id=999),
+            self.book_payload("Also valid"),
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1])
+        self.assertEqual(set(response.data["errors"][0]["errors"]), {"title", "genre_id"})
+        self.assertFalse(Books.objects.exists())
+
+    def test_create_inserts_in_batches(self):
+        items = [self.book_payload(f"Book {index}") for index in range(5)]
+        with override_settings(BOOKS_BULK_BATCH_SIZE=2), CaptureQueriesContext(connections["default"]) as queries:
+            response = self.bulk_create(items)
+
+        self.assertEqual(response.status_code, 201)
+        inserts = [query for query in queries if query["sql"].startswith('INSERT INTO "books_books"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Books.objects.count(), 5)
+
+    @override_settings(BOOKS_BULK_MAX_ITEMS=2)
+    def test_create_rejects_oversized_payloads(self):
+        response = self.bulk_create([self.book_payload(f"Book {index}") for index in range(3)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Books.objects.exists())
+
+    def test_update_accepts_numeric_string_ids(self):
+        first, second = self.create_books(2)
+        response = self.bulk_update([{"id": first.pk, "title": "One"}, {"id": str(second.pk), "title": "Two"}])
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(sorted(Books.objects.values_list("title", flat=True)), ["One", "Two"])
+
+    def test_update_rejects_duplicate_and_unknown_ids(self):
+        book = self.create_books(1)[0]
+        response = self.bulk_update([
+            {"id": book.pk, "title": "Changed"},
+            {"id": str(book.pk), "title": "Again"},
+            {"id": 999, "title": "Missing"},
+            {"id": "abc"},
+            {"title": "No id"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errors = {error["index"]: error["errors"]["id"] for error in response.data["errors"]}
+        self.assertEqual(errors, {
+            1: ["Duplicate book in this request."],
+            2: ["Book not found."],
+            3: ["Book not found."],
+            4: ["Book not found."],
+        })
+        book.refresh_from_db()
+        self.assertEqual(book.title, "Book 0")
+
+    def test_update_rolls_back_a_partly_invalid_payload(self):
+        first, second = self.create_books(2)
+        response = self.bulk_update([{"id": first.pk, "title": "Changed"}, {"id": second.pk, "genre_id": 999}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1])
+        self.assertEqual(sorted(Books.objects.values_list("title", flat=True)), ["Book 0", "Book 1"])
+
+    def test_update_denies_books_of_other_users(self):
+        own = self.create_books(1)[0]
+        stranger = User.objects.create_user(
+            first_name="Other", last_name="User", username="other", email="other@example.com", password="x",
+        )
+        foreign = Books.objects.create(title="Theirs", author=self.author, genre=self.genre, created_by=stranger)
+
+        response = self.bulk_update([{"id": own.pk, "title": "Mine"}, {"id": foreign.pk, "title": "Stolen"}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"], [
+            {"index": 1, "errors": {"id": ["You do not have permission to edit this book."]}},
+        ])
+        self.assertEqual(sorted(Books.objects.values_list("title", flat=True)), ["Book 0", "Theirs"])
+
+    def test_update_writes_in_batches_and_refreshes_the_cache(self):
+        books = self.create_books(5)
+        self.assertEqual(self.client_class().get("/api/v1/books/")["X-Cache"], "MISS")
+        items = [{"id": book.pk, "language": "French"} for book in books]
+        with override_settings(BOOKS_BULK_BATCH_SIZE=2), CaptureQueriesContext(connections["default"]) as queries:
+            response = self.bulk_update(items)
+
+        self.assertEqual(response.status_code, 200)
+        updates = [query for query in queries if query["sql"].startswith('UPDATE "books_books"')]
+        self.assertEqual(len(updates), 3)
+        # Anonymous responses are cached; the write made the cached page unreachable.
+        response = self.client_class().get("/api/v1/books/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual({book["language"] for book in response.data["results"]}, {"French"})
+
+
+class ReadingListOrderTests(CatalogTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.entries = [
+            ReadingLists.objects.create(user=self.user, book=book, position=(index + 1) * positions.POSITION_GAP)
+            for index, book in enumerate(self.create_books(4))
+        ]
+
+    def order(self):
+        return list(ReadingLists.objects.filter(user=self.user).order_by("position").values_list("pk", flat=True))
+
+    def move(self, entry, **data):
+        return self.client.post(f"/api/v1/reading-list/{entry.pk}/move/", data, format="json")
+
+    def test_moves(self):
+        first, second, third, fourth = (entry.pk for entry in self.entries)
+        cases = [
+            (self.entries[3], {"before": second}, [first, fourth, second, third]),
+            (self.entries[0], {"after": third}, [fourth, second, third, first]),
+            (self.entries[2], {"position": "top"}, [third, fourth, second, first]),
+            (self.entries[3], {"position": "bottom"}, [third, second, first, fourth]),
+        ]
+        for entry, data, expected in cases:
+            with self.subTest(data=data):
+                response = self.move(entry, **data)
+                self.assertEqual(response.status_code, 200, response.data)
+                self.assertEqual(self.order(), expected)
+
+    def test_only_the_moved_entry_is_written_while_there_is_room(self):
+        before = dict(ReadingLists.objects.values_list("pk", "position"))
+        self.move(self.entries[3], before=self.entries[1].pk)
+
+        after = dict(ReadingLists.objects.values_list("pk", "position"))
+        changed = {pk for pk in before if before[pk] != after[pk]}
+        self.assertEqual(changed, {self.entries[3].pk})
+        self.assertEqual(after[self.entries[3].pk], (before[self.entries[0].pk] + before[self.entries[1].pk]) // 2)
+
+    def test_list_is_renumbered_when_the_gap_runs_out(self):
+        ReadingLists.objects.filter(pk=self.entries[1].pk).update(position=positions.POSITION_GAP + 1)
+
+        response = self.move(self.entries[3], after=self.entries[0].pk)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        first, second, third, fourth = (entry.pk for entry in self.entries)
+        self.assertEqual(self.order(), [first, fourth, second, third])
+        spread = sorted(ReadingLists.objects.values_list("position", flat=True))
+        self.assertTrue(all(high - low > 1 for low, high in zip(spread, spread[1:])))
+
+    def test_entries_sharing_a_position_are_spread_before_moving(self):
+        ReadingLists.objects.filter(pk__in=[self.entries[1].pk, self.entries[2].pk]).update(position=5000)
+
+        self.assertEqual(self.move(self.entries[0], before=self.entries[2].pk).status_code, 200)
+
+        order = self.order()
+        self.assertEqual(order.index(self.entries[0].pk) + 1, order.index(self.entries[2].pk))
+        self.assertEqual(len(set(ReadingLists.objects.values_list("position", flat=True))), 4)
+
+    def test_moves_lock_the_list(self):
+        with mock.patch.object(positions, "lock_entries", wraps=positions.lock_entries) as lock:
+            response = self.move(self.entries[0], after=self.entries[1].pk)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        lock.assert_called_once_with(self.user.pk)
+
+    def test_moves_use_the_positions_read_under_the_lock(self):
+        entry, anchor = self.entries[0], self.entries[1]
+        # Another move has put the anchor at the bottom since it was loaded.
+        ReadingLists.objects.filter(pk=anchor.pk).update(position=10 * positions.POSITION_GAP)
+
+        with transaction.atomic():
+            positions.move_entry(entry, anchor, "after")
+
+        self.assertEqual(self.order()[-2:], [anchor.pk, entry.pk])
+
+    def test_invalid_moves_are_rejected(self):
+        stranger = User.objects.create_user(
+            first_name="Other", last_name="User", username="other", email="other@example.com", password="x",
+        )
+        foreign = ReadingLists.objects.create(user=stranger, book=self.entries[0].book)
+        cases = [
+            {"before": foreign.pk},
+            {"after": self.entries[0].pk},
+            {"before": self.entries[1].pk, "position": "top"},
+            {},
+            {"position": "middle"},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                self.assertEqual(self.move(self.entries[0], **data).status_code, 400)
+        self.assertEqual(self.order(), [entry.pk for entry in self.entries])
+
+    def test_reorder(self):
+        ids = [entry.pk for entry in reversed(self.entries)]
+        response = self.client.post("/api/v1/reading-list/reorder/", {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.order(), ids)
+
+    def test_reorder_must_list_every_own_entry_once(self):
+        stranger = User.objects.create_user(
+            first_name="Other", last_name="User", username="other", email="other@example.com", password="x",
+        )
+        foreign = ReadingLists.objects.create(user=stranger, book=self.entries[0].book)
+        ids = [entry.pk for entry in self.entries]
+        cases = {
+            "missing": ids[1:],
+            "foreign": ids[1:] + [foreign.pk],
+            "extra": ids + [foreign.pk],
+            "duplicate": ids + [ids[0]],
+            "empty": [],
+        }
+        for label, value in cases.items():
+            with self.subTest(label):
+                response = self.client.post("/api/v1/reading-list/reorder/", {"ids": value}, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.order(), ids)
+
+
+class SparseFieldsetTests(CatalogTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.create_books(1)
+
+    def get_books(self, **params):
+        return self.client.get("/api/v1/books/", params)
+
+    def test_dotted_paths_select_fields_of_expanded_objects(self):
+        response = self.get_books(fields="title,author.full_name", expand="author")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0], {"title": "Book 0", "author": {"full_name": "Jane Austen"}})
+
+    def test_invalid_selections_are_rejected(self):
+        cases = [
+            ({"fields": "title,nope"}, "Unknown field: nope."),
+            ({"fields": "title.foo"}, "Unknown field: title.foo."),
+            ({"fields": "author.nope"}, "Cannot select author.nope without expanding author."),
+            ({"fields": "author.full_name"}, "Cannot select author.full_name without expanding author."),
+            ({"fields": "author.nope", "expand": "author"}, "Unknown field: nope."),
+            ({"expand": "title"}, "Cannot expand field: title."),
+        ]
+        for params, message in cases:
+            with self.subTest(params=params):
+                response = self.get_books(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, str(response.data))
+
+
+class FastPathParityTests(CatalogTestCase):
+    """
+    List responses are byte-identical with and without the fast path renderer.
+    """
+    # Requests whose responses must be identical with and without the fast path.
+    PARITY_CASES = (
+        ("books", {}),
+        ("books", {"ordering": "title"}),
+        ("books", {"pagination": "cursor", "ordering": "-publication_date"}),
+        ("books", {"fields": "id,title,author"}),
+        ("books", {"fields": "title,author.full_name", "expand": "author,genre"}),
+        ("books", {"expand": "author", "mine": "true"}),
+        ("reading-list", {}),
+        ("reading-list", {"expand": "book.author", "fields": "position,book.title,book.author"}),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.author.date_of_birth = datetime.date(1775, 12, 16)
+        cls.author.date_of_death = datetime.date(1817, 7, 18)
+        cls.author.save()
+        # No date of death, and a full name built around an empty first name.
+        mononym = Authors.objects.create(first_name="", last_name="Ḥāfeẓ \"Shīrāzī\"", created_by=cls.user)
+        stranger = User.objects.create_user(
+            first_name="Other", last_name="User", username="other", email="other@example.com", password="x",
+        )
+        books = [
+            Books.objects.create(
+                title="Emma", subtitle=None, author=cls.author, genre=cls.genre, created_by=cls.user,
+                publication_date=datetime.date(1815, 12, 23), description="Handsome, clever & rich.",
+            ),
+            Books.objects.create(
+                title="Divan", subtitle="", author=mononym, genre=cls.genre, created_by=stranger,
+                book_url="https://example.com/divan", language="Persian",
+            ),
+            Books.objects.create(
+                title="Persuasion", subtitle="A novel", author=cls.author, genre=cls.genre, created_by=cls.user,
+                publication_date=datetime.date(1817, 12, 20),
+            ),
+        ]
+        for position, book in enumerate(books):
+            ReadingLists.objects.create(user=cls.user, book=book, position=position * 1024)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def get_list(self, basename, params, fast_path):
+        cache.clear()
+        with override_settings(FAST_PATH_LIST_ENABLED=fast_path):
+            response = self.client.get(f"/api/v1/{basename}/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_fast_path_matches_the_serializers(self):
+        for basename, params in self.PARITY_CASES:
+            with self.subTest(basename=basename, params=params):
+                self.assertEqual(self.get_list(basename, params, True), self.get_list(basename, params, False))
+
+    def test_plans_are_keyed_on_the_rendered_shape(self):
+        fastpath._plans.clear()
+        spellings = ["title,id", "id,title", "id,title,title", " title , id ", "id,title&expand=author"]
+        for fields in spellings:
+            self.assertEqual(self.client.get(f"/api/v1/books/?fields={fields}").status_code, 200)
+        for index in range(20):
+            self.assertEqual(self.client.get(f"/api/v1/books/?fields=title.x{index}").status_code, 400)
+
+        self.assertEqual(len(fastpath._plans), 1)
+
+    def test_plan_cache_is_bounded(self):
+        fastpath._plans.clear()
+        with mock.patch.object(fastpath, "PLAN_CACHE_SIZE", 2):
+            for fields in ("id", "title", "subtitle"):
+                self.client.get("/api/v1/books/", {"fields": fields})
+
+        self.assertEqual(len(fastpath._plans), 2)
+
+    def test_fast_path_handles_nulls_and_full_names(self):
+        with override_settings(FAST_PATH_LIST_ENABLED=True):
+            results = self.client.get("/api/v1/books/", {"expand": "author", "ordering": "title"}).data["results"]
+
+        divan, emma = results[0], results[1]
+        self.assertEqual(divan["author"]["full_name"], " Ḥāfeẓ \"Shīrāzī\"")
+        self.assertIsNone(divan["author"]["date_of_death"])
+        self.assertIsNone(emma["subtitle"])
+        self.assertEqual(emma["author"]["date_of_death"], "1817-07-18")
+
+
+class AsyncReadTests(CatalogTestCase):
+    """
+    The async read path of books.async_views against the sync viewsets.
+
+    The async views are called directly: `ASYNC_CATALOG_READS` only adds them to
+    the URLs when those are loaded.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for index in range(2):
+            Authors.objects.create(first_name="Emily", last_name=f"Bronte {index}", created_by=self.user)
+            Generes.objects.create(name=f"Genre {index}")
+        self.create_books(3)
+        patcher = mock.patch.object(EstimatedCountPagination, "page_size", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, viewset, path, pk=None, asynchronous=False):
+        """
+        GET a catalog URL with the sync viewset or its async view, from a cold cache.
+
+        Returns:
+            tuple: The response, its decoded body and the number of SQL queries it ran.
+        """
+        cache.clear()
+        with CaptureQueriesContext(connections["default"]) as queries:
+            if asynchronous:
+                action = "list" if pk is None else "retrieve"
+                view = async_catalog_view(viewset, {"get": action}, detail=pk is not None)
+                kwargs = {} if pk is None else {"pk": str(pk)}
+                response = async_to_sync(view)(AsyncRequestFactory().get(path), **kwargs)
+                response.render()
+            else:
+                response = self.client.get(path)
+        return response, json.loads(response.content), len(queries)
+
+    def assert_same_as_sync(self, viewset, path, pk=None):
+        response, data, queries = self.fetch(viewset, path, pk, asynchronous=True)
+        sync_response, sync_data, sync_queries = self.fetch(viewset, path, pk)
+        self.assertEqual(response.status_code, sync_response.status_code)
+        self.assertEqual(data, sync_data)
+        self.assertEqual(queries, sync_queries)
+
+    def test_list_matches_the_sync_viewset(self):
+        for viewset, prefix in ((AuthorViewSet, "authors"), (GenreViewSet, "genres"), (BookViewSet, "books")):
+            for query in ("", "?page=2", "?page=last", "?page=9"):
+                with self.subTest(prefix, query=query):
+                    self.assert_same_as_sync(viewset, f"/api/v1/{prefix}/{query}")
+
+    def test_retrieve_matches_the_sync_viewset(self):
+        book = Books.objects.first()
+        for viewset, prefix, obj in (
+            (AuthorViewSet, "authors", self.author), (GenreViewSet, "genres", self.genre), (BookViewSet, "books", book),
+        ):
+            for pk in (obj.pk, 0):
+                with self.subTest(prefix, pk=pk):
+                    self.assert_same_as_sync(viewset, f"/api/v1/{prefix}/{pk}/", pk=pk)
+
+    def test_pages_are_counted_and_fetched_with_the_async_orm(self):
+        with mock.patch.object(PageNumberPagination, "paginate_queryset", side_effect=AssertionError):
+            for viewset, prefix in ((AuthorViewSet, "authors"), (GenreViewSet, "genres"), (BookViewSet, "books")):
+                with self.subTest(prefix):
+                    response, data, _ = self.fetch(viewset, f"/api/v1/{prefix}/", asynchronous=True)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(data["count"], 3)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_query_budget_is_enforced(self):
+        with mock.patch.object(AuthorViewSet, "query_budget", {"list": 1}):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "AuthorViewSet.list ran 2 queries, budget is 1"):
+                self.fetch(AuthorViewSet, "/api/v1/authors/", asynchronous=True)
+
+    def test_phases_and_queries_are_instrumented(self):
+        timings = instrumentation.RequestTimings()
+        token = instrumentation._current.set(timings)
+        try:
+            _, _, queries = self.fetch(GenreViewSet, "/api/v1/genres/", asynchronous=True)
+        finally:
+            instrumentation._current.reset(token)
+
+        self.assertLessEqual({"auth", "serialize"}, set(timings.phases))
+        self.assertEqual(timings.queries, queries)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """
+    `ORJSONRenderer` output is byte-identical to DRF's `JSONRenderer`.
+    """
+
+    def assert_same_output(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_raw_dates_and_times(self):
+        moment = datetime.datetime(2024, 3, 1, 12, 30, 15, 123456)
+        data = {
+            "utc": moment.replace(tzinfo=datetime.timezone.utc),
+            "london": moment.replace(tzinfo=zoneinfo.ZoneInfo("Europe/London")),
+            "naive": moment,
+            "whole_seconds": moment.replace(microsecond=0),
+            "paris": moment.replace(tzinfo=zoneinfo.ZoneInfo("Europe/Paris")),
+            "date": moment.date(),
+            "time": moment.time(),
+            "nested": [{"at": moment}],
+        }
+        self.assert_same_output(data)
+
+        # Encoded by orjson itself, not by DRF's encoder.
+        encode = DRFJSONEncoder.default
+        with mock.patch.object(DRFJSONEncoder, "default", autospec=True, side_effect=encode) as default:
+            ORJSONRenderer().render(data)
+        default.assert_not_called()
+
+    def test_other_values(self):
+        self.assert_same_output({
+            "text": "caf\u00e9 \u2028 \U0001f4da",
+            "numbers": [1, 2.5, -0.0, 10 ** 12, 1e15],
+            "decimal": decimal.Decimal("1.10"),
+            "uuid": uuid.UUID(int=1),
+            "missing": None,
+            1: "non-string key",
+        })
+
+    def test_aware_times_are_rejected_like_drf(self):
+        value = {"at": datetime.time(12, 0, tzinfo=datetime.timezone.utc), "date": datetime.date(2024, 3, 1)}
+        with self.assertRaisesMessage(ValueError, "JSON can't represent timezone-aware times."):
+            JSONRenderer().render(value)
+        with self.assertRaisesMessage(ValueError, "JSON can't represent timezone-aware times."):
+            ORJSONRenderer().render(value)
+
+    def test_float_exponents_and_sub_minute_offsets_differ(self):
+        data = {
+            "floats": [1e16, 1e-7, 1.5e300],
+            "lmt": datetime.datetime(1850, 1, 1, tzinfo=zoneinfo.ZoneInfo("Europe/Amsterdam")),
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data), b'{"floats":[1e16,1e-7,1.5e300],"lmt":"1850-01-01T00:00:00+00:20"}'
+        )
+        self.assertEqual(
+            JSONRenderer().render(data), b'{"floats":[1e+16,1e-07,1.5e+300],"lmt":"1850-01-01T00:00:00+00:19:32"}'
+        )
+        self.assertEqual(json.loads(ORJSONRenderer().render(data))["floats"], data["floats"])
+
+
+class MetricsViewTests(SimpleTestCase):
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_open_without_a_token_in_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="s3cret", DEBUG=True)
+    def test_token_is_required_once_set(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code, 403)
+        response = self.client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+
+class InMemorySearchTests(CatalogTestCase):
+    """
+    `?search=` on the book list, served by a fresh `InMemorySearchBackend`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(search, "_backend", InMemorySearchBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_book(self, title, subtitle=None, author=None):
+        return Books.objects.create(
+            title=title, subtitle=subtitle, author=author or self.author, genre=self.genre, created_by=self.user,
+        )
+
+    def search_titles(self, query):
+        return [book["title"] for book in self.client.get("/api/v1/books/", {"search": query}).data["results"]]
+
+    def test_title_matches_rank_above_subtitle_and_author_matches(self):
+        other = Authors.objects.create(first_name="Emma", last_name="Woodhouse", created_by=self.user)
+        self.create_book("Persuasion", subtitle="Emma revisited")
+        self.create_book("Sense and Sensibility", author=other)
+        self.create_book("Emma")
+
+        self.assertEqual(self.search_titles("emma")[0], "Emma")
+        self.assertCountEqual(self.search_titles("emma"), ["Emma", "Persuasion", "Sense and Sensibility"])
+
+    def test_terms_match_word_prefixes_and_all_must_match(self):
+        self.create_book("Pride and Prejudice")
+        self.create_book("Prince Caspian")
+        self.create_book("Mansfield Park")
+
+        self.assertCountEqual(self.search_titles("pri"), ["Pride and Prejudice", "Prince Caspian"])
+        self.assertEqual(self.search_titles("pri prej"), ["Pride and Prejudice"])
+        # Exact words rank above longer words they prefix.
+        self.create_book("Pri")
+        self.assertEqual(self.search_titles("pri")[0], "Pri")
+
+    def test_misspelled_terms_fall_back_to_similar_words(self):
+        self.create_book("Northanger Abbey")
+        self.create_book("Emma")
+
+        self.assertEqual(self.search_titles("northangr"), ["Northanger Abbey"])
+        self.assertEqual(self.search_titles("xyzzy"), [])
+
+    def test_index_follows_changes_to_books(self):
+        book = self.create_book("Lady Susan")
+        self.assertEqual(self.search_titles("susan"), ["Lady Susan"])
+
+        book.title = "The Watsons"
+        book.save()
+        self.assertEqual(self.search_titles("watsons"), ["The Watsons"])
+        self.assertEqual(self.search_titles("susan"), [])
+
+        book.delete()
+        self.assertEqual(self.search_titles("watsons"), [])
+
+    def test_broad_queries_are_not_truncated(self):
+        Books.objects.bulk_create(
+            Books(title=f"Volume {index}", author=self.author, genre=self.genre, created_by=self.user)
+            for index in range(1100)
+        )
+        response = self.client.get("/api/v1/books/", {"search": "volume"})
+        self.assertEqual(response.data["count"], 1100)
+
+
+class ResponseCacheTests(CatalogTestCase):
+    """
+    The anonymous response cache of the catalog viewsets.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.book = self.create_books(1)[0]
+
+    def test_anonymous_reads_are_served_from_the_cache(self):
+        for url, label in (("/api/v1/books/", "books.list"), (f"/api/v1/books/{self.book.pk}/", "books.retrieve")):
+            with self.subTest(url):
+                first = self.client.get(url)
+                self.assertEqual(first["X-Cache"], "MISS")
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second["X-Cache"], "HIT")
+                self.assertEqual(second.data, first.data)
+                self.assertEqual(get_cache_stats([label])[label], {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_query_string_is_part_of_the_key(self):
+        self.assertEqual(self.client.get("/api/v1/books/")["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/api/v1/books/?ordering=title")["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/api/v1/books/?ordering=title")["X-Cache"], "HIT")
+
+    def test_failed_responses_are_not_cached(self):
+        self.assertEqual(self.client.get("/api/v1/books/0/").status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/books/0/").status_code, 404)
+        self.assertEqual(get_cache_stats(["books.retrieve"])["books.retrieve"]["misses"], 2)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        url = f"/api/v1/books/{self.book.pk}/"
+        self.assertIs(self.client.get(url).data["can_edit"], False)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url)
+        self.assertNotIn("X-Cache", response)
+        self.assertIs(response.data["can_edit"], True)
+
+        # The owner's response was not stored for anonymous readers.
+        self.client.force_authenticate(None)
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertIs(response.data["can_edit"], False)
+
+    def test_writes_bump_the_version_of_their_model(self):
+        self.assertEqual(self.client.get("/api/v1/books/").data["count"], 1)
+        self.assertEqual(self.client.get("/api/v1/genres/")["X-Cache"], "MISS")
+
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(signals, "bump_version", wraps=signals.bump_version) as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/v1/books/", {"title": "New", "author_id": self.author.pk, "genre_id": self.genre.pk},
+                    format="json",
+                )
+        self.assertEqual(response.status_code, 201)
+        bump.assert_called_once_with(Books)
+
+        self.client.force_authenticate(None)
+        response = self.client.get("/api/v1/books/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 2)
+        # Other models keep their cached responses.
+        self.assertEqual(self.client.get("/api/v1/genres/")["X-Cache"], "HIT")
+
+
+class OwnershipTests(CatalogTestCase):
+    """
+    The `can_edit` flag and the `?mine=` filter of books and authors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user(
+            first_name="Ben", last_name="Other", username="other", email="other@example.com", password="x",
+        )
+        cls.staff = User.objects.create_user(
+            first_name="Sam", last_name="Staff", username="staff", email="staff@example.com", password="x",
+            is_staff=True,
+        )
+        cls.other_author = Authors.objects.create(first_name="Mary", last_name="Shelley", created_by=cls.other)
+        cls.book = Books.objects.create(title="Emma", author=cls.author, genre=cls.genre, created_by=cls.user)
+        cls.other_book = Books.objects.create(
+            title="Frankenstein", author=cls.other_author, genre=cls.genre, created_by=cls.other,
+        )
+
+    def get_flags(self, user, url):
+        """
+        GET a list or detail URL as a user, or anonymously.
+
+        Returns:
+            dict: The `can_edit` flag of each returned row, by primary key.
+        """
+        self.client.force_authenticate(user)
+        data = self.client.get(url).data
+        rows = data["results"] if "results" in data else [data]
+        return {row["id"]: row["can_edit"] for row in rows}
+
+    def test_can_edit_by_user(self):
+        cases = {
+            "anonymous": (None, False, False),
+            "owner": (self.user, True, False),
+            "non-owner": (self.other, False, True),
+            "staff": (self.staff, True, True),
+        }
+        for case, (user, mine, others) in cases.items():
+            with self.subTest(case):
+                self.assertEqual(
+                    self.get_flags(user, "/api/v1/books/"), {self.book.pk: mine, self.other_book.pk: others},
+                )
+                self.assertEqual(self.get_flags(user, f"/api/v1/books/{self.book.pk}/"), {self.book.pk: mine})
+                self.assertEqual(
+                    self.get_flags(user, "/api/v1/authors/"), {self.author.pk: mine, self.other_author.pk: others},
+                )
+                self.assertEqual(
+                    self.get_flags(user, f"/api/v1/authors/{self.other_author.pk}/"), {self.other_author.pk: others},
+                )
+
+    def test_created_objects_are_editable_by_their_creator(self):
+        self.client.force_authenticate(self.other)
+        response = self.client.post("/api/v1/authors/", {"first_name": "Ann", "last_name": "Radcliffe"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIs(response.data["can_edit"], True)
+
+    def test_mine_filter(self):
+        self.client.force_authenticate(self.user)
+        for url, own, others in (
+            ("/api/v1/books/", self.book, self.other_book), ("/api/v1/authors/", self.author, self.other_author),
+        ):
+            with self.subTest(url):
+                response = self.client.get(url, {"mine": "true"})
+                self.assertEqual([row["id"] for row in response.data["results"]], [own.pk])
+                response = self.client.get(url, {"mine": "false"})
+                self.assertEqual([row["id"] for row in response.data["results"]], [others.pk])
+
+    def test_anonymous_users_own_nothing(self):
+        for url in ("/api/v1/books/", "/api/v1/authors/"):
+            with self.subTest(url):
+                self.assertEqual(self.client.get(url, {"mine": "true"}).data["results"], [])
+                self.assertEqual(self.client.get(url, {"mine": "false"}).data["count"], 2)
+
+
+class FacetTests(CatalogTestCase):
+    """
+    `?facets=` counts on the book list.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(search, "_backend", InMemorySearchBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.poetry = Generes.objects.create(name="Poetry")
+        self.create_books(3)
+        for title, language in (("Ballades", "French"), ("Odes", "French"), ("Whale song", "English")):
+            Books.objects.create(
+                title=title, language=language, author=self.author, genre=self.poetry, created_by=self.user,
+            )
+
+    def genre_counts(self, response):
+        return [(row["name"], row["count"]) for row in response.data["facets"]["genre"]]
+
+    def test_unknown_facets_are_rejected(self):
+        response = self.client.get("/api/v1/books/", {"facets": "genre,colour"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown facet: colour.", response.data["facets"][0])
+
+    def test_counts_cover_every_page_of_the_filters(self):
+        with mock.patch.object(CatalogPagination, "page_size", 2):
+            response = self.client.get("/api/v1/books/", {"facets": "genre,language", "language": "English"})
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(self.genre_counts(response), [("Novel", 3), ("Poetry", 1)])
+        self.assertEqual(response.data["facets"]["language"], [{"value": "English", "count": 4}])
+
+    def test_counts_follow_the_search(self):
+        response = self.client.get("/api/v1/books/", {"facets": "genre", "search": "whale"})
+
+        self.assertEqual(response.data["facets"]["genre"], [{"id": self.poetry.pk, "name": "Poetry", "count": 1}])
+
+    @override_settings(BOOK_FACETS_LIMIT=1)
+    def test_counts_are_limited_to_the_most_frequent_values(self):
+        response = self.client.get("/api/v1/books/", {"facets": "genre,language"})
+
+        self.assertEqual(self.genre_counts(response), [("Novel", 3)])
+        self.assertEqual(response.data["facets"]["language"], [{"value": "English", "count": 4}])
+
+    def test_book_writes_invalidate_cached_counts(self):
+        with mock.patch.object(Facet, "count", autospec=True, side_effect=Facet.count) as count:
+            response = self.client.get("/api/v1/books/?facets=genre")
+            self.assertEqual(self.genre_counts(response), [("Novel", 3), ("Poetry", 3)])
+            # Another page and ordering of the same filters share the cached counts.
+            self.client.get("/api/v1/books/?facets=genre&ordering=title")
+            self.assertEqual(count.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/v1/books/", {"title": "New", "author_id": self.author.pk, "genre_id": self.poetry.pk},
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 201)
+
+            response = self.client.get("/api/v1/books/?facets=genre")
+            self.assertEqual(count.call_count, 2)
+        self.assertEqual(self.genre_counts(response), [("Poetry", 4), ("Novel", 3)])
+
+
+REPLICA = "replica_test"
+
+
+class ReplicaRoutingTests(CatalogTestCase):
+    """
+    Routing between the primary and a replica, with a second SQLite database
+    standing in for a replica that has not caught up: it only holds the rows
+    copied to it with `replicate`.
+
+    The stand-in is only declared while these tests run, so no other test can
+    route reads to it. It is left out of the class' `databases`, which the test
+    runner reads before any test runs, and added by `setUpClass`.
+    """
+    replicas = [REPLICA]
+
+    @classmethod
+    def setUpClass(cls):
+        # Declared before `super().setUpClass()`, which checks `databases` against the settings.
+        # `connections.settings` is `settings.DATABASES`, so both see the alias.
+        settings.DATABASES[REPLICA] = connections.configure_settings({
+            **connections.settings,
+            REPLICA: {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:", "TEST": {"MIGRATE": False}},
+        })[REPLICA]
+        cls.addClassCleanup(cls.remove_replica)
+        cls.databases = {"default", REPLICA}
+        # The router only migrates the primary; the stand-in replica needs the same tables.
+        with mock.patch.object(db_router.PrimaryReplicaRouter, "allow_migrate", return_value=True):
+            call_command("migrate", database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @staticmethod
+    def remove_replica():
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del settings.DATABASES[REPLICA]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.replicate(cls.user, cls.author, cls.genre)
+
+    @staticmethod
+    def replicate(*objects):
+        """
+        Copy rows of the primary to the replica, as replication eventually does.
+        """
+        for obj in objects:
+            type(obj).objects.using(REPLICA).bulk_create([copy.copy(obj)])
+
+    def setUp(self):
+        super().setUp()
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def create_book_on_primary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.create_books(1)[0]
+
+    def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        book = self.create_book_on_primary()
+        self.replicate(book)
+        Books.objects.using(REPLICA).filter(pk=book.pk).update(title="On the replica")
+
+        response = self.client.get(f"/api/v1/books/{book.pk}/", **self.auth)
+        self.assertEqual(response.data["title"], "On the replica")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/books/",
+                {"title": "New", "author_id": self.author.pk, "genre_id": self.genre.pk},
+                format="json", **self.auth,
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Books.objects.using("default").filter(pk=response.data["id"]).exists())
+        self.assertFalse(Books.objects.using(REPLICA).filter(pk=response.data["id"]).exists())
+
+    def test_writer_reads_from_the_primary_after_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/books/",
+                {"title": "Mine", "author_id": self.author.pk, "genre_id": self.genre.pk},
+                format="json", **self.auth,
+            )
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.client.get(f"/api/v1/books/{response.data['id']}/", **self.auth).status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/books/", **self.auth).data["count"], 1)
+
+        # Other readers are not pinned and still see the lagging replica.
+        cache.delete(db_router.PIN_KEY.format(user_id=self.user.pk))
+        self.assertEqual(self.client.get("/api/v1/books/", **self.auth).data["count"], 0)
+
+    def test_cached_responses_are_built_from_the_primary(self):
+        self.assertEqual(self.client.get("/api/v1/books/").data["count"], 0)
+
+        # Written on the primary; the replica has not caught up.
+        self.create_book_on_primary()
+        response = self.client.get("/api/v1/books/?facets=genre")
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["facets"]["genre"][0]["count"], 1)
+        self.assertEqual(self.client.get("/api/v1/books/?facets=genre").data, response.data)
+
+    def test_counts_read_from_the_replica_are_not_cached(self):
+        self.create_book_on_primary()
+        with mock.patch.object(EstimatedCountPaginator, "cache_count", autospec=True) as cache_count:
+            response = self.client.get("/api/v1/books/", **self.auth)
+
+        # The page comes from the replica, which does not have the book yet...
+        self.assertEqual(response.data["results"], [])
+        # ...but only the primary's count is cached.
+        self.assertEqual([call.args[1] for call in cache_count.call_args_list], [1])
+
+    def test_export_streams_from_the_replica_of_the_request(self):
+        book = self.create_book_on_primary()
+        self.replicate(book)
+        Books.objects.using(REPLICA).filter(pk=book.pk).update(title="On the replica")
+
+        response = self.client.get("/api/v1/books/export/?format=ndjson", **self.auth)
+        # The rows are only read while the body streams, after the request is done.
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertIn('"title":"On the replica"', content)
+
+    def test_access_token_is_decoded_once_per_request(self):
+        validate = JWTAuthentication.get_validated_token
+        with mock.patch.object(JWTAuthentication, "get_validated_token", autospec=True, side_effect=validate) as spy:
+            response = self.client.get("/api/v1/reading-list/", **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(spy.call_count, 1)
@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.urls import re_path
 from rest_framework.routers import DefaultRouter
 from .views import BookViewSet, ReadingListViewSet, AuthorViewSet, GenreViewSet
+from .async_views import async_catalog_view
 
 router = DefaultRouter()
 router.register("books", BookViewSet, basename="books")
@@ -9,3 +12,30 @@ router.register("genres", GenreViewSet, basename="genres")
 
 
 urlpatterns = router.urls
+
+if settings.ASYNC_CATALOG_READS:
+    # Serve catalog list/retrieve requests with the async ORM (see books.async_views).
+    # Other methods and routes still fall through to the viewsets.
+    async_patterns = []
+    for prefix, viewset, basename in router.registry:
+        if viewset not in (BookViewSet, AuthorViewSet, GenreViewSet):
+            continue
+        async_patterns += [
+            re_path(
+                rf"^{prefix}/$",
+                async_catalog_view(viewset, {"get": "list", "post": "create"}, basename=basename, detail=False),
+                name=f"{basename}-list",
+            ),
+            # Catalog keys are integers; other segments (`export`, `bulk`) are extra actions.
+            re_path(
+                rf"^{prefix}/(?P<pk>[0-9]+)/$",
+                async_catalog_view(
+                    viewset,
+                    {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+                    basename=basename,
+                    detail=True,
+                ),
+                name=f"{basename}-detail",
+            ),
+        ]
+    urlpatterns = async_patterns + urlpatterns
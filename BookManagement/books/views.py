@@ -1,40 +1,295 @@
-from rest_framework import viewsets, filters
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend       
+from BookManagement.instrumentation import InstrumentedViewMixin
 from .models import Books, ReadingLists, Authors, Generes
-from .serializers import BookSerializer, ReadingListSerializer, AuthorSerializer, GenreSerializer
+from .serializers import (
+    EditableBookSerializer, ReadingListSerializer, EditableAuthorSerializer, GenreSerializer,
+    ReadingListMoveSerializer, ReadingListReorderSerializer,
+)
 from .permissions import IsOwner, IsAdminOrOwnerOrReadOnly, IsAdminOrReadOnly
+from .query_budget import QueryBudgetMixin
+from .pagination import CatalogPagination, EstimatedCountPagination
+from .filters import AuthorFilterSet, BookFilterSet, BookSearchFilter, RankedOrderingFilter
+from .cache import CachedResponseMixin
+from .facets import Facet, FacetedListMixin
+from .fieldsets import SparseFieldsetViewMixin
+from .fastpath import FastPathListMixin
+from .ownership import CanEditAnnotationMixin, user_can_edit
+from .bulk import (
+    books_written_in_bulk,
+    get_bulk_batch_size,
+    get_bulk_max_items,
+    prefetch_related_instances,
+    to_pk,
+)
+from .export import CSVExportRenderer, NDJSONExportRenderer, get_export_rows, iter_export
+from .positions import last_position, lock_entries, move_entry, renumber
 
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    InstrumentedViewMixin, QueryBudgetMixin, CachedResponseMixin, FacetedListMixin, SparseFieldsetViewMixin,
+    FastPathListMixin, CanEditAnnotationMixin, viewsets.ModelViewSet
+):
     """
     API endpoint for managing books.
 
     This viewset provides CRUD operations for books, including filtering, searching, 
     and ordering. Users can view all books, but only admins or the creator of a book 
-    can modify or delete it.
+    can modify or delete it. Searches go through the configured search backend and
+    are ordered by relevance unless an explicit ordering is requested. Anonymous
+    reads are served from the versioned response cache.
+
+    Books can also be created and partially updated in bulk: `POST` a list of books
+    to the collection, or `PATCH` a list of books with their `id` to `bulk/`.
+    The whole filtered catalog can be streamed as NDJSON or CSV from `export/`.
+    Reads accept `?fields=` and `?expand=` to narrow the response (see books.fieldsets).
+    Lists are rendered from `.values()` rows by a precompiled plan (see books.fastpath).
+    Lists accept `?facets=genre,language,author` to add the number of matching books
+    per value of each facet to the page (see books.facets).
+    Each book carries a `can_edit` flag for the requesting user, computed in SQL,
+    and `?mine=true` narrows the list to the books the user created.
 
     Attributes:
-        queryset (QuerySet): The queryset of all books.
-        serializer_class (BookSerializer): The serializer used for book data.
+        queryset (QuerySet): The queryset of all books, joined with their author and genre.
+        serializer_class (EditableBookSerializer): The serializer used for book data.
         permission_classes (list): Permissions required to access this viewset.
         filter_backends (list): Backends for filtering, searching, and ordering.
-        filterset_fields (list): Fields available for exact match filtering.
-        search_fields (list): Fields available for search functionality.
+        filterset_class (BookFilterSet): Fields available for exact match filtering, and `mine`.
+        search_fields (list): Fields covered by the search index (see books.search).
         ordering_fields (list): Fields available for ordering results.
         ordering (list): Default ordering for the queryset.
+        pagination_class (CatalogPagination): Page number pagination, or keyset
+            pagination when the request has `?pagination=cursor`.
+        query_budget (dict): Maximum number of SQL queries per action. Searching
+            may run one extra query (a match probe, or the in-memory index build).
+        cache_dependencies (tuple): Models whose changes invalidate cached responses.
+        bulk_related_fields (dict): Payload keys resolved in bulk, mapped to their model.
+        facets (dict): Facets available through `?facets=`.
 
     Methods:
+        create(request): Creates one book, or a list of books in bulk.
+        bulk_create(request): Validates and inserts a list of books in batches.
+        bulk_update(request): Validates and partially updates a list of books in batches.
+        export(request): Streams the filtered catalog as NDJSON or CSV.
         perform_create(serializer): Saves the book with the current user as the creator.
     """
-    queryset = Books.objects.all()
-    serializer_class = BookSerializer
+    queryset = Books.objects.select_related("author", "genre").defer("search_vector")
+    serializer_class = EditableBookSerializer
     permission_classes = [IsAdminOrOwnerOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['genre', 'author', 'language']
+    filter_backends = [DjangoFilterBackend, BookSearchFilter, RankedOrderingFilter]
+    filterset_class = BookFilterSet
     search_fields = ['title', 'subtitle', 'author__first_name', 'author__last_name']
     ordering_fields = ['publication_date', 'created_at', 'title']
     ordering = ['-created_at']
+    pagination_class = CatalogPagination
+    query_budget = {"list": 4, "retrieve": 2}
+    cache_dependencies = (Books, Authors, Generes)
+
+    bulk_related_fields = {"author_id": Authors, "genre_id": Generes}
+    facets = {
+        "genre": Facet("genre_id", "genre__name", output=("id", "name")),
+        "language": Facet("language", output=("value",)),
+        "author": Facet("author_id", "author__first_name", "author__last_name", output=("id", "first_name", "last_name")),
+    }
+
+    def get_query_budget(self):
+        budget = super().get_query_budget()
+        if budget is not None and self.action == "list":
+            # One grouped count per requested facet when it is not cached.
+            budget += len([name for name in self.request.query_params.get(self.facets_query_param, "").split(",") if name])
+        return budget
+
+    def get_filter_signature(self):
+        signature = super().get_filter_signature()
+        if "mine" in self.request.query_params:
+            # `?mine=` counts differ per user.
+            signature.append(("user", [self.request.user.pk]))
+        return signature
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create a single book, or a list of books when the payload is a list.
+
+        Args:
+            request (Request): The HTTP request object containing book data.
+
+        Returns:
+            Response: The created book or books with a status of 201.
+        """
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def get_bulk_items(self, request):
+        """
+        Return the list payload of a bulk request after checking its size.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Raises:
+            ValidationError: If the payload is not a non-empty list within the size limit.
+
+        Returns:
+            list: The payload items.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list of books."]})
+        if len(items) > get_bulk_max_items():
+            raise ValidationError(
+                {"non_field_errors": [f"A bulk request accepts at most {get_bulk_max_items()} books."]}
+            )
+        return items
+
+    def get_bulk_serializer_context(self, items):
+        """
+        Return the serializer context with every referenced author and genre prefetched.
+
+        Args:
+            items (list): The payload items.
+
+        Returns:
+            dict: The serializer context.
+        """
+        context = self.get_serializer_context()
+        context["related_instances"] = prefetch_related_instances(items, self.bulk_related_fields)
+        return context
+
+    def bulk_create(self, request):
+        """
+        Validate and insert a list of books.
+
+        Every author and genre is resolved with one `IN` query per model and the
+        books are inserted with `bulk_create` in `BOOKS_BULK_BATCH_SIZE` batches.
+        Nothing is written unless every item is valid.
+
+        Args:
+            request (Request): The HTTP request object containing a list of books.
+
+        Returns:
+            Response: The created books with a status of 201, or the errors of the
+                      invalid items, by index, with a status of 400.
+        """
+        items = self.get_bulk_items(request)
+        context = self.get_bulk_serializer_context(items)
+
+        serializers = [self.get_serializer_class()(data=item, context=context) for item in items]
+        errors = [
+            {"index": index, "errors": serializer.errors}
+            for index, serializer in enumerate(serializers)
+            if not serializer.is_valid()
+        ]
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        books = [
+            Books(**serializer.validated_data, created_by=request.user)
+            for serializer in serializers
+        ]
+        with transaction.atomic():
+            Books.objects.bulk_create(books, batch_size=get_bulk_batch_size())
+            transaction.on_commit(lambda: books_written_in_bulk([book.pk for book in books]))
+
+        data = self.get_serializer(books, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        Validate and partially update a list of books.
+
+        Each item must carry the `id` of a book the user may edit. The books, their
+        new authors and genres are loaded with one query per model and written
+        with `bulk_update` in `BOOKS_BULK_BATCH_SIZE` batches. Nothing is written
+        unless every item is valid.
+
+        Args:
+            request (Request): The HTTP request object containing a list of partial books.
+
+        Returns:
+            Response: The updated books with a status of 200, or the errors of the
+                      invalid items, by index, with a status of 400.
+        """
+        items = self.get_bulk_items(request)
+        # Ids are coerced like the detail routes do, so `"5"` finds book 5.
+        ids = [to_pk(Books, item.get("id")) if isinstance(item, dict) else None for item in items]
+        instances = self.get_queryset().in_bulk({pk for pk in ids if pk is not None})
+        context = self.get_bulk_serializer_context(items)
+
+        errors, books, fields, seen = [], [], set(), set()
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            book = instances.get(pk)
+            if book is None:
+                errors.append({"index": index, "errors": {"id": ["Book not found."]}})
+                continue
+            if book.pk in seen:
+                errors.append({"index": index, "errors": {"id": ["Duplicate book in this request."]}})
+                continue
+            seen.add(book.pk)
+            if not user_can_edit(request.user, book):
+                errors.append({"index": index, "errors": {"id": ["You do not have permission to edit this book."]}})
+                continue
+
+            serializer = self.get_serializer_class()(book, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            for attr, value in serializer.validated_data.items():
+                setattr(book, attr, value)
+                fields.add(attr)
+            books.append(book)
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_update() does not run auto_now.
+        now = timezone.now()
+        for book in books:
+            book.updated_at = now
+        fields.add("updated_at")
+
+        with transaction.atomic():
+            Books.objects.bulk_update(books, sorted(fields), batch_size=get_bulk_batch_size())
+            transaction.on_commit(lambda: books_written_in_bulk([book.pk for book in books]))
+
+        return Response(self.get_serializer(books, many=True).data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        renderer_classes=[NDJSONExportRenderer, CSVExportRenderer],
+    )
+    def export(self, request):
+        """
+        Stream every book matching the filters, joined with its author and genre.
+
+        The format is negotiated from the `Accept` header or `?format=ndjson|csv`
+        (NDJSON by default). Rows are read through a server-side cursor and sent as
+        they are encoded, so memory use does not grow with the catalog size.
+
+        Args:
+            request (Request): The HTTP request object with optional `genre`,
+                               `author`, `language` and `mine` filters.
+
+        Returns:
+            StreamingHttpResponse: The export as an attachment.
+        """
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            iter_export(get_export_rows(request.query_params, request), renderer.format),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="books.{renderer.format}"'
+        return response
 
     def perform_create(self, serializer):
         """
@@ -46,12 +301,16 @@ class BookViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class ReadingListViewSet(viewsets.ModelViewSet):
+class ReadingListViewSet(InstrumentedViewMixin, QueryBudgetMixin, SparseFieldsetViewMixin, FastPathListMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing reading lists.
 
     This viewset allows users to create, view, update, and delete their reading lists.
-    Each user can only access their own reading list.
+    Each user can only access their own reading list. New entries are appended to
+    the bottom of the list. An entry is moved with `move/`, which only rewrites its
+    own position, and a whole new order is applied with `reorder/` in one statement.
+    Reads accept `?fields=` and `?expand=` to narrow the response (see books.fieldsets).
+    Lists are rendered from `.values()` rows by a precompiled plan (see books.fastpath).
 
     Attributes:
         serializer_class (ReadingListSerializer): The serializer used for reading list data.
@@ -61,10 +320,18 @@ class ReadingListViewSet(viewsets.ModelViewSet):
         search_fields (list): Fields available for search functionality.
         ordering_fields (list): Fields available for ordering results.
         ordering (list): Default ordering for the queryset.
+        pagination_class (CatalogPagination): Page number pagination, or keyset
+            pagination when the request has `?pagination=cursor`.
+        query_budget (dict): Maximum number of SQL queries per action. The `move`
+            budget covers the occasional renumbering of the list.
+        always_loaded_fields (tuple): Fields loaded for every `?fields=` selection;
+            `user` is read by the `IsOwner` permission.
 
     Methods:
         get_queryset(): Returns the reading list for the current user.
         perform_create(serializer): Saves the reading list with the current user as the owner.
+        move(request, pk): Moves one entry before or after another, or to the top or bottom.
+        reorder(request): Applies a complete new order to the reading list.
     """
     serializer_class = ReadingListSerializer
     permission_classes = [IsOwner]
@@ -73,44 +340,129 @@ class ReadingListViewSet(viewsets.ModelViewSet):
     search_fields = ['book__title', 'book__author__first_name', 'book__author__last_name']
     ordering_fields = ['position', 'date_added']
     ordering = ['position']
+    pagination_class = CatalogPagination
+    query_budget = {"list": 3, "retrieve": 2, "move": 11, "reorder": 3}
+    always_loaded_fields = ("user",)
 
     def get_queryset(self):
         """
         Retrieve the reading list for the authenticated user.
 
         Returns:
-            QuerySet: The reading list for the current user.
+            QuerySet: The reading list for the current user, joined with each book's
+            author and genre.
         """
-        return ReadingLists.objects.filter(user=self.request.user)
+        return ReadingLists.objects.filter(user=self.request.user).select_related(
+            "book__author", "book__genre"
+        ).defer("book__search_vector")
 
     def perform_create(self, serializer):
         """
         Save the reading list instance with the current user as the owner.
 
+        Entries without an explicit position are appended to the bottom of the list.
+
         Args:
             serializer (Serializer): The serializer instance containing validated data.
         """
-        serializer.save(user=self.request.user)
+        if "position" in serializer.validated_data:
+            serializer.save(user=self.request.user)
+            return
+        with transaction.atomic():
+            serializer.save(user=self.request.user, position=last_position(self.request.user.pk))
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        """
+        Move an entry before or after another entry, or to the top or bottom of the list.
+
+        Only the moved entry is written, unless its new neighbours have no free
+        position left between them, in which case the list is renumbered first.
+
+        Args:
+            request (Request): The request with one of `before`, `after` or `position`.
+            pk (str): The id of the entry to move.
+
+        Returns:
+            Response: The moved entry.
+        """
+        entry = self.get_object()
+        serializer = ReadingListMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        placement, value = next(iter(serializer.validated_data.items()))
+
+        with transaction.atomic():
+            anchor = None
+            if placement == "position":
+                placement = value
+            else:
+                anchor = ReadingLists.objects.filter(user=request.user, pk=value).only(
+                    "pk", "user_id", "position"
+                ).first()
+                if anchor is None:
+                    raise ValidationError({placement: ["Reading list entry not found."]})
+                if anchor.pk == entry.pk:
+                    raise ValidationError({placement: ["An entry cannot be moved next to itself."]})
+            move_entry(entry, anchor, placement)
+
+        return Response(self.get_serializer(entry).data)
+
+    @action(detail=False, methods=["post"])
+    def reorder(self, request):
+        """
+        Apply a complete new order to the reading list with a single `UPDATE`.
+
+        Args:
+            request (Request): The request with `ids`, every entry id in the new order.
+
+        Returns:
+            Response: An empty 204 response.
+        """
+        serializer = ReadingListReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        with transaction.atomic():
+            existing = set(lock_entries(request.user.pk))
+            if set(ids) != existing:
+                raise ValidationError({"ids": ["Must list every entry of the reading list exactly once."]})
+            renumber(request.user.pk, ids)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class AuthorViewSet(viewsets.ModelViewSet):
+class AuthorViewSet(
+    InstrumentedViewMixin, QueryBudgetMixin, CachedResponseMixin, CanEditAnnotationMixin, viewsets.ModelViewSet
+):
     """
     API endpoint for managing authors.
 
     This viewset provides CRUD operations for authors. Only admins or the user who 
-    created an author can modify or delete it. All users can view authors.
+    created an author can modify or delete it. All users can view authors, and
+    anonymous reads are served from the versioned response cache. Each author
+    carries a `can_edit` flag for the requesting user, computed in SQL, and
+    `?mine=true` narrows the list to the authors the user created.
 
     Attributes:
         queryset (QuerySet): The queryset of all authors.
-        serializer_class (AuthorSerializer): The serializer used for author data.
+        serializer_class (EditableAuthorSerializer): The serializer used for author data.
         permission_classes (list): Permissions required to access this viewset.
+        filterset_class (AuthorFilterSet): The `mine` filter.
+        pagination_class (EstimatedCountPagination): Page number pagination, also
+            used by the async read path.
+        query_budget (dict): Maximum number of SQL queries per action.
+        cache_dependencies (tuple): Models whose changes invalidate cached responses.
 
     Methods:
         perform_create(serializer): Saves the author with the current user as the creator.
     """
     queryset = Authors.objects.all()
-    serializer_class = AuthorSerializer
+    serializer_class = EditableAuthorSerializer
     permission_classes = [IsAdminOrOwnerOrReadOnly]
+    filterset_class = AuthorFilterSet
+    pagination_class = EstimatedCountPagination
+    query_budget = {"list": 3, "retrieve": 2}
+    cache_dependencies = (Authors,)
 
     def perform_create(self, serializer):
         """
@@ -122,19 +474,27 @@ class AuthorViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(InstrumentedViewMixin, QueryBudgetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing genres.
 
     This viewset provides CRUD operations for genres. Only admins can create, update, 
-    or delete genres. All users can view genres.
+    or delete genres. All users can view genres, and anonymous reads are served from
+    the versioned response cache.
 
     Attributes:
         queryset (QuerySet): The queryset of all genres.
         serializer_class (GenreSerializer): The serializer used for genre data.
         permission_classes (list): Permissions required to access this viewset.
+        pagination_class (EstimatedCountPagination): Page number pagination, also
+            used by the async read path.
+        query_budget (dict): Maximum number of SQL queries per action.
+        cache_dependencies (tuple): Models whose changes invalidate cached responses.
     """
     queryset = Generes.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = EstimatedCountPagination
+    query_budget = {"list": 3, "retrieve": 2}
+    cache_dependencies = (Generes,)
 